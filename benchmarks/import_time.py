@@ -0,0 +1,46 @@
+"""Measure how long ``import pynative_mobile`` (or another module) takes.
+
+Runs a fresh interpreter with ``-X importtime`` and prints the slowest
+imports it pulled in::
+
+    python benchmarks/import_time.py [module] [--top N]
+"""
+import argparse
+import subprocess
+import sys
+from typing import List, Tuple
+
+
+def import_times(module: str) -> List[Tuple[str, int, int]]:
+    """Return ``(name, self_us, cumulative_us)`` for every module imported."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue  # header row
+        rows.append((name.strip(), int(self_us), int(cumulative)))
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("module", nargs="?", default="pynative_mobile")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+    rows = import_times(args.module)
+    total = next(c for name, _, c in reversed(rows) if name == args.module)
+    print(f"import {args.module}: {total / 1000:.1f}ms cumulative, {len(rows)} modules")
+    for name, self_us, _ in sorted(rows, key=lambda r: -r[1])[: args.top]:
+        print(f"  {self_us / 1000:7.2f}ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Memory and serialization time of a large tree: Component objects vs NodeStore.
+
+    PYTHONPATH=. python benchmarks/node_store.py [rows]
+"""
+import gc
+import sys
+import time
+import tracemalloc
+
+from pynative_mobile.layouts import Column, Row
+from pynative_mobile.nodestore import NodeStore
+from pynative_mobile.widgets import Text
+
+
+def build_components(rows: int) -> Column:
+    return Column(children=[
+        Row(children=[Text(f"Row {i}", size=14), Text("detail", size=12)]) for i in range(rows)
+    ])
+
+
+def build_store(rows: int) -> NodeStore:
+    store = NodeStore()
+    root = store.add("Column", {"spacing": 10}, container=True)
+    for i in range(rows):
+        row = store.add("Row", {"spacing": 10}, root, container=True)
+        store.add("Text", {"value": f"Row {i}", "size": 14}, row)
+        store.add("Text", {"value": "detail", "size": 12}, row)
+    return store
+
+
+def measure(label: str, build, rows: int) -> None:
+    gc.collect()
+    started = time.perf_counter()
+    tree = build(rows)
+    built = time.perf_counter() - started
+    del tree
+    gc.collect()
+    tracemalloc.start()
+    tree = build(rows)
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    started = time.perf_counter()
+    tree.to_dict()
+    serialized = time.perf_counter() - started
+    nodes = 1 + 3 * rows
+    print(f"{label:<12} {held / nodes:8.0f} B/node  build {built * 1000:8.1f}ms  to_dict {serialized * 1000:8.1f}ms")
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 33_333
+    print(f"{1 + 3 * rows} nodes")
+    measure("Component", build_components, rows)
+    measure("NodeStore", build_store, rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Patch bytes and diff+encode time for growing props, ``update`` vs ``delta``.
+
+    PYTHONPATH=. python benchmarks/prop_deltas.py [steps]
+"""
+import json
+import sys
+import time
+
+from pynative_mobile import diff
+from pynative_mobile.layouts import Column
+from pynative_mobile.widgets import Text
+
+
+def scenarios(steps: int):
+    # props are assigned directly: _update_prop would print every change
+    log = Text("")
+
+    def append_line(i):
+        log.props["value"] += f"[{i:05d}] request handled in {i % 97}ms\n"
+
+    yield "log Text, one line appended", log, append_line
+    feed = Column(items=[])
+
+    def append_item(i):
+        feed.props["items"] = feed.props["items"] + [{"id": i, "title": f"Item {i}", "read": False}]
+
+    yield "list prop, one item appended", feed, append_item
+    rows = Column(items=[{"id": i, "title": f"Item {i}", "read": False} for i in range(steps)])
+
+    def mark_read(i):
+        items = [dict(item) for item in rows.props["items"]]
+        items[i]["read"] = True
+        rows.props["items"] = items
+
+    yield "list of dicts, one field edited", rows, mark_read
+
+
+def run(steps: int, threshold):
+    diff.DELTA_MIN_BYTES = threshold
+    results = []
+    for name, comp, step in scenarios(steps):
+        total = 0
+        took = 0.0
+        old = comp.to_dict()
+        for i in range(steps):
+            step(i)
+            new = comp.to_dict()
+            started = time.perf_counter()
+            encoded = json.dumps(diff.diff_trees(old, new), separators=(",", ":"))
+            took += time.perf_counter() - started
+            total += len(encoded)
+            old = new
+        results.append((name, total, took))
+    return results
+
+
+def main() -> None:
+    steps = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    default = diff.DELTA_MIN_BYTES
+    full = run(steps, None)
+    delta = run(steps, default)
+    print(f"{steps} updates each, DELTA_MIN_BYTES={default}")
+    for (name, f_bytes, f_time), (_, d_bytes, d_time) in zip(full, delta):
+        print(f"  {name:32s} full {f_bytes:11,d} B {f_time * 1000:7.1f}ms   "
+              f"delta {d_bytes:9,d} B {d_time * 1000:7.1f}ms   {f_bytes / d_bytes:6.1f}x smaller")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Bytes per node for a list-heavy screen, with and without string interning.
+
+    PYTHONPATH=. python benchmarks/wire_size.py [rows]
+"""
+import json
+import sys
+
+from pynative_mobile.interning import StringTable
+from pynative_mobile.layouts import Column, Row, Screen
+from pynative_mobile.widgets import Button, Image, Text, TextInput
+
+
+def build_screen(rows: int) -> Screen:
+    return Screen(title="Inbox", children=[
+        Column(children=[
+            Row(children=[
+                Image(f"avatars/{i % 20}.png", width=40, height=40),
+                Column(children=[Text(f"Sender {i}", size=18), Text(f"Subject line number {i}", size=14)]),
+                Button(label="Open", on_press=lambda: None),
+            ])
+            for i in range(rows)
+        ] + [TextInput(name="reply", placeholder="Reply...")]),
+    ])
+
+
+def count_nodes(node: dict) -> int:
+    return 1 + sum(count_nodes(c) for c in node.get("children", []))
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    tree = build_screen(rows).to_dict()
+    nodes = count_nodes(tree)
+    table = StringTable()
+    interned = table.dumps({"tree": tree})
+    interned = table.with_header(interned, 0, len(table))
+    sizes = {
+        "indent=4 (current)": len(json.dumps({"tree": tree}, indent=4)),
+        "compact": len(json.dumps({"tree": tree}, separators=(",", ":"))),
+        "interned, incl. table": len(interned),
+    }
+    print(f"{nodes} nodes, {len(table)} table entries")
+    for name, size in sizes.items():
+        print(f"  {name:24s} {size:9,d} bytes  {size / nodes:6.1f} bytes/node")
+
+
+if __name__ == "__main__":
+    main()
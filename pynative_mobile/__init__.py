@@ -1,8 +1,8 @@
 from .engine import PyNativeApp  # noqa: F401
-from .layouts import Screen, Column, Row  # noqa: F401
+from .layouts import Screen, Column, Row, ListView  # noqa: F401
 from .widgets import Text, Button, Image, TextInput, Form  # noqa: F401
 from .theme import Theme  # noqa: F401
 from .hardware import Hardware  # noqa: F401
-from .storage import Storage  # noqa: F401
-from .network import fetch  # noqa: F401
-from .ai import generate_ui  # noqa: F401
+from .storage import Storage, PersistentState  # noqa: F401
+from .network import fetch, fetch_stream, Paginator  # noqa: F401
+from .ai import generate_ui, stream_ui  # noqa: F401
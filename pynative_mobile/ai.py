@@ -1,15 +1,245 @@
+import abc
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from . import layouts, widgets
+from .base import Component, Container
 from .layouts import Screen, Column  # noqa: F401
-from .widgets import Text, Button
+from .widgets import Text, Button  # noqa: F401
+
+Spec = Dict[str, Any]
+Actions = Dict[str, Callable[..., Any]]
+
+# component types a generator may emit, and which of them hold children
+_TYPES = {
+    name: issubclass(cls, Container)
+    for module in (widgets, layouts)
+    for name, cls in vars(module).items()
+    if isinstance(cls, type) and issubclass(cls, Component) and cls.__module__ == module.__name__
+}
+
+
+class Generator(abc.ABC):
+    """Turns a prompt into component specs.
+
+    ``generate`` yields the screen's top-level components one at a time as
+    ``{"type": ..., "props": {...}, "children": [...], "events": {...}}``
+    specs (``events`` maps handler names to action names, see
+    ``build_component``).  It may first yield a ``Screen`` spec without
+    children to set the screen's props.  ``name`` and ``version`` are part of
+    the cache key, so bump ``version`` when the output for a prompt changes.
+    """
+
+    name = "generator"
+    version = "1"
+    # slow generators (models) are cached on disk; instant ones need not be
+    cache = True
+
+    @abc.abstractmethod
+    def generate(self, prompt: str, theme: Dict[str, Any]) -> Iterator[Spec]:
+        ...
+
+
+class LocalGenerator(Generator):
+    """Deterministic keyword-based stand-in for a model.
+
+    ``delay`` seconds are slept before every component to imitate a model
+    streaming its answer.
+    """
+
+    name = "local"
+    cache = False
+
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+
+    def generate(self, prompt: str, theme: Dict[str, Any]) -> Iterator[Spec]:
+        words = prompt.lower()
+        yield {"type": "Screen", "props": {"title": "AI Generated"}}
+        specs: List[Spec] = [{"type": "Text", "props": {"value": f"Prompt: {prompt}", "size": 20}}]
+        if any(w in words for w in ("login", "sign in", "register")):
+            specs.append({"type": "TextInput", "props": {"name": "email", "placeholder": "Email"}})
+            specs.append({"type": "TextInput", "props": {"name": "password", "placeholder": "Password"}})
+        if "search" in words:
+            specs.append({"type": "TextInput", "props": {"name": "query", "placeholder": "Search..."}})
+        if any(w in words for w in ("list", "feed", "inbox")):
+            specs.append({"type": "Column", "props": {"spacing": 8}, "children": [
+                {"type": "Row", "props": {"key": f"item-{i}"}, "children": [
+                    {"type": "Text", "props": {"value": f"Item {i}"}},
+                ]}
+                for i in range(1, 4)
+            ]})
+        # colors stay theme tokens, so the client resolves them and a theme
+        # change restyles generated screens too
+        specs.append({"type": "Button", "props": {"label": "OK", "color": "theme.primary"}, "events": {"on_press": "ok"}})
+        for spec in specs:
+            if self.delay:
+                time.sleep(self.delay)
+            yield spec
+
+
+def build_component(spec: Spec, actions: Optional[Actions] = None) -> Component:
+    """Build a component tree from a generator spec.
+
+    Nodes keep the spec's ``type`` and ``props`` as-is.  Handlers named in
+    ``events`` are looked up in ``actions``; names with no action are left
+    out, since generated specs cannot carry code.
+    """
+    def make(node: Spec) -> Component:
+        kind = node.get("type")
+        if kind not in _TYPES:
+            raise ValueError(f"generator produced unknown component type {kind!r}")
+        handlers = {
+            event: actions[name]
+            for event, name in (node.get("events") or {}).items()
+            if actions and name in actions
+        }
+        props = {**(node.get("props") or {}), **handlers}
+        holds_children = _TYPES[kind] or "children" in node
+        comp: Component = Container(**props) if holds_children else Component(**props)
+        comp.type = kind
+        return comp
+
+    root = make(spec)
+    stack = [(root, spec)]
+    while stack:
+        comp, node = stack.pop()
+        for child_spec in node.get("children") or []:
+            child = make(child_spec)
+            comp.children.append(child)  # type: ignore[attr-defined]
+            stack.append((child, child_spec))
+    return root
+
+
+class UICache:
+    """Content-addressed store of generator output.
+
+    Entries are named by the sha256 of (prompt, generator name and version,
+    theme) and hold the complete list of specs, written only once a
+    generation finished.
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = path or os.path.join(os.getcwd(), ".pynative_cache", "ai")
+
+    def key(self, prompt: str, generator: Generator, theme: Dict[str, Any]) -> str:
+        material = json.dumps([prompt, generator.name, generator.version, theme], sort_keys=True)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.path, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[List[Spec]]:
+        try:
+            with open(self._file(key), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, specs: List[Spec]) -> None:
+        dest = self._file(key)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        tmp = f"{dest}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(specs, f, separators=(",", ":"))
+        os.replace(tmp, dest)
+
+
+def _specs(prompt: str, generator: Generator, theme: Any, cache: Optional[UICache]) -> Iterable[Spec]:
+    theme_dict = (theme or _default_theme()).to_dict()
+    if cache is None and generator.cache:
+        cache = UICache()
+    if cache is None:
+        yield from generator.generate(prompt, theme_dict)
+        return
+    key = cache.key(prompt, generator, theme_dict)
+    cached = cache.get(key)
+    if cached is not None:
+        yield from cached
+        return
+    produced = []
+    for spec in generator.generate(prompt, theme_dict):
+        produced.append(spec)
+        yield spec
+    cache.put(key, produced)
+
+
+def _default_theme() -> Any:
+    from .theme import default_theme
+
+    return default_theme
+
+
+def _fill(screen: Container, specs: Iterable[Spec], actions: Optional[Actions], on_add: Callable[[], None]) -> None:
+    for spec in specs:
+        if spec.get("type") == "Screen" and not spec.get("children"):
+            if isinstance(screen, Screen):
+                screen.props.update(spec.get("props") or {})
+            continue
+        screen.children.append(build_component(spec, actions))
+        on_add()
+
+
+def generate_ui(
+    prompt: str,
+    generator: Optional[Generator] = None,
+    theme: Any = None,
+    cache: Optional[UICache] = None,
+    actions: Optional[Actions] = None,
+) -> Screen:
+    """Generate a ``Screen`` for ``prompt`` and wait for all of it.
+
+    Output of cacheable generators is stored in ``cache`` (by default
+    ``.pynative_cache/ai/`` in the working directory), so a repeated
+    (prompt, generator, theme) is served from disk.
+    """
+    screen = Screen(title="AI Generated")
+    _fill(screen, _specs(prompt, generator or LocalGenerator(), theme, cache), actions, lambda: None)
+    return screen
+
+
+def stream_ui(
+    app: Any,
+    prompt: str,
+    generator: Optional[Generator] = None,
+    into: Optional[Container] = None,
+    cache: Optional[UICache] = None,
+    actions: Optional[Actions] = None,
+) -> Any:
+    """Generate UI on a background thread, showing components as they arrive.
+
+    Components are appended to ``into`` (a container already on screen) or
+    to a new ``Screen`` pushed on ``app`` right away.  Every component is
+    published on its own, so the device receives one ``add`` patch per
+    component while generation continues.  The container carries a
+    ``generating`` prop until the generator is done.  Returns a ``Future``
+    resolving to the filled container.
+    """
+    from concurrent.futures import Future
 
+    target: Container = into if into is not None else Screen(title="AI Generated")
+    target.props["generating"] = True
+    if into is None:
+        app.push(target)
+    future: Future = Future()
 
+    def run() -> None:
+        error: Optional[Exception] = None
+        try:
+            specs = _specs(prompt, generator or LocalGenerator(), app.theme, cache)
+            _fill(target, specs, actions, app.notify_bridge)
+        except Exception as e:
+            error = e
+        target.props["generating"] = False
+        app.notify_bridge()
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(target)
 
-def generate_ui(prompt: str) -> Screen:
-    return Screen(
-        title="AI Generated",
-        children=[
-            Column(children=[
-                Text(f"Prompt: {prompt}"),
-                Button(label="OK"),
-            ]),
-        ],
-    )
+    threading.Thread(target=run, name="pynative-generate", daemon=True).start()
+    return future
@@ -1,26 +1,125 @@
 import base64
 import os
-from typing import Any, Dict
+from typing import Any, Dict, List, Tuple
+
+from .images import ImagePipeline
+
+_MIME = {".jpg": "image/jpeg", ".jpeg": "image/jpeg", ".png": "image/png", ".webp": "image/webp"}
 
 
 class AssetManager:
-    def __init__(self, base_path: str | None = None) -> None:
+    def __init__(self, base_path: str | None = None, images: ImagePipeline | None = None) -> None:
         self.base_path = base_path or os.getcwd()
+        self._digests: Dict[str, Tuple[float, int, str]] = {}
+        # resizes images to their declared width/height (needs Pillow)
+        self.images = images or ImagePipeline(os.path.join(self.base_path, ".pynative_cache", "images"))
 
-    def resolve(self, value: Any) -> Any:
+    def locate(self, value: Any) -> str | None:
+        """Return the local file a ``src`` value points at, or ``None``."""
         if not isinstance(value, str):
-            return value
+            return None
         if value.startswith("data:") or value.startswith("http"):
-            return value
+            return None
         candidate = os.path.join(self.base_path, value)
         if os.path.isfile(candidate):
+            return candidate
+        return None
+
+    def digest(self, path: str) -> str:
+        """sha256 of a file, streamed and memoised by (mtime, size)."""
+        st = os.stat(path)
+        cached = self._digests.get(path)
+        if cached and cached[:2] == (st.st_mtime, st.st_size):
+            return cached[2]
+        import hashlib
+
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 16), b""):
+                h.update(block)
+        self._digests[path] = (st.st_mtime, st.st_size, h.hexdigest())
+        return h.hexdigest()
+
+    def index(self) -> Dict[str, List[Any]]:
+        """Memoised digests, to persist across restarts (see ``load_index``)."""
+        return {path: list(entry) for path, entry in self._digests.items()}
+
+    def load_index(self, index: Dict[str, List[Any]]) -> None:
+        # entries are still checked against (mtime, size) before use
+        for path, entry in index.items():
+            self._digests.setdefault(path, (entry[0], entry[1], entry[2]))
+
+    def variant(self, path: str, width: Any = None, height: Any = None, wait: bool = False) -> str | None:
+        """Cached resized variant of ``path`` for the declared size, if any.
+
+        A missing variant is queued on the image pool; with ``wait`` the call
+        blocks for it, otherwise the caller ships the original this time.
+        """
+        size = self.images.target(width, height) if self.images else None
+        if size is None or not self.images.available:
+            return None
+        digest = self.digest(path)
+        cached = self.images.cached(path, digest, size)
+        if cached:
+            return cached
+        future = self.images.submit(path, digest, size)
+        return future.result() if wait else None
+
+    def source_file(self, props: Dict[str, Any], wait: bool = False) -> str | None:
+        """The file to ship for a node's ``src``: its variant or the original."""
+        path = self.locate(props.get("src"))
+        if path is None:
+            return None
+        return self.variant(path, props.get("width"), props.get("height"), wait) or path
+
+    def resolve(self, value: Any, width: Any = None, height: Any = None, wait: bool = False) -> Any:
+        candidate = self.locate(value)
+        if candidate:
+            variant = self.variant(candidate, width, height, wait)
+            mime = ""
+            if variant:
+                candidate = variant
+                mime = _MIME.get(os.path.splitext(variant)[1], "")
             with open(candidate, "rb") as f:
                 data = base64.b64encode(f.read()).decode("ascii")
-            return f"data:;base64,{data}"
+            return f"data:{mime};base64,{data}"
         return value
 
+    def resolve_tree(self, node: Dict[str, Any]) -> Dict[str, Any]:
+        """Like ``walk_tree`` but copies changed nodes instead of mutating them."""
+        # post-order without recursion: a node is rebuilt after its children
+        resolved: Dict[int, Dict[str, Any]] = {}
+        stack = [(node, False)]
+        while stack:
+            current, expanded = stack.pop()
+            children = current.get("children")
+            if children and not expanded:
+                stack.append((current, True))
+                stack.extend((c, False) for c in children)
+                continue
+            out = current
+            props = current.get("props", {})
+            if "src" in props:
+                src = self.resolve(props["src"], props.get("width"), props.get("height"))
+                if src is not props["src"]:
+                    out = dict(current, props=dict(props, src=src))
+            if children:
+                kids = [resolved[id(c)] for c in children]
+                if any(a is not b for a, b in zip(kids, children)):
+                    out = dict(out, children=kids)
+            resolved[id(current)] = out
+        return resolved[id(node)]
+
     def walk_tree(self, node: Dict[str, Any]) -> None:
-        if "props" in node and "src" in node["props"]:
-            node["props"]["src"] = self.resolve(node["props"]["src"])
-        for child in node.get("children", []):
-            self.walk_tree(child)
+        # queue every variant first so they are resized in parallel
+        found: List[Dict[str, Any]] = []
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            props = current.get("props")
+            if props and "src" in props:
+                found.append(props)
+                self.source_file(props)
+            stack.extend(current.get("children", []))
+        for props in found:
+            props["src"] = self.resolve(props["src"], props.get("width"), props.get("height"), wait=True)
@@ -1,11 +1,21 @@
 import uuid
-from typing import Any, Callable, Dict, List
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 from .state import State
+from .events import RateLimiter, normalize_policy
 
 PROP_UPDATE_LISTENERS: List[Callable[["Component", str, Any], None]] = []
 
 class Component:
     _event_registry: Dict[str, Callable[..., Any]] = {}
+    # bumped on every bound prop change; lets caches of serialized trees
+    # tell whether anything changed since they were taken
+    _mutations = 0
+    # (path, params) of screens built by Router.build(), so they can be
+    # snapshotted and rebuilt; tree and mutation count of a prefetched
+    # serialization (see PyNativeApp._take_serialized())
+    _route: Optional[Tuple[str, Dict[str, Any]]] = None
+    _serialized: Optional[Dict[str, Any]] = None
+    _serialized_at: Optional[int] = None
 
     @classmethod
     def set_event_registry(cls, registry: Dict[str, Callable[..., Any]]) -> None:
@@ -17,11 +27,20 @@ class Component:
         self.type: str = self.__class__.__name__
         self.props: Dict[str, Any] = {}
         self.events: Dict[str, str] = {}
+        self.event_policies: Dict[str, Dict[str, float]] = {}
         self._states: List[State] = []
+        # props whose value comes from a bound State
+        self._bound_props: Set[str] = set()
+        self._prop_listeners: List[Callable[[str, Any], None]] = []
 
         self.on_init: Any = None
         self.on_destroy: Any = None
 
+        handlers = [k for k, v in kwargs.items() if callable(v) and k not in ("on_init", "on_destroy")]
+        for mode in ("debounce", "throttle"):
+            for name, interval in normalize_policy(kwargs.pop(mode, None), handlers).items():
+                self.event_policies.setdefault(name, {})[mode] = interval
+
         for key, value in kwargs.items():
             if key == "on_init" and callable(value):
                 self.on_init = value
@@ -32,32 +51,50 @@ class Component:
 
             if callable(value):
                 event_id = f"event_{str(uuid.uuid4())[:8]}"
+                policy = self.event_policies.get(key)
+                if policy:
+                    value = RateLimiter(value, **policy)
                 self._event_registry[event_id] = value
                 self.events[key] = event_id
             elif hasattr(value, "bind"):
                 self.props[key] = value.value
                 self._states.append(value)
+                self._bound_props.add(key)
                 value.bind(lambda v, k=key: self._update_prop(k, v))
             else:
                 self.props[key] = value
 
     def _update_prop(self, key: str, value: Any) -> None:
         self.props[key] = value
+        Component._mutations += 1
         print(
             f">>> UI Update: Properti '{key}' pada {self.type} ({self.id}) "
             f"berubah jadi '{value}'",
         )
 
+        for callback in list(self._prop_listeners):
+            callback(key, value)
         for listener in PROP_UPDATE_LISTENERS:
             listener(self, key, value)
 
+    def bind_props(self, callback: Callable[[str, Any], None]) -> Callable[[], None]:
+        """Call ``callback(key, value)`` whenever a bound prop of this component changes."""
+        self._prop_listeners.append(callback)
+        def _unbind() -> None:
+            if callback in self._prop_listeners:
+                self._prop_listeners.remove(callback)
+        return _unbind
+
     def to_dict(self) -> Dict[str, Any]:
-        return {
+        data = {
             "id": self.id,
             "type": self.type,
             "props": dict(self.props),
             "events": dict(self.events),
         }
+        if self.event_policies:
+            data["event_policies"] = {k: dict(v) for k, v in self.event_policies.items()}
+        return data
 
 
 class Container(Component):
@@ -66,7 +103,57 @@ class Container(Component):
         self.children: List[Component] = children or []
 
     def to_dict(self) -> Dict[str, Any]:
-
+        # explicit stack instead of recursion so deep trees serialize too;
+        # components with their own to_dict() still serialize themselves
         data = super().to_dict()
-        data["children"] = [child.to_dict() for child in self.children]
+        data["children"] = []
+        stack: List[Any] = [(self, data)]
+        while stack:
+            comp, out = stack.pop()
+            for child in comp.children:
+                if isinstance(child, Container) and type(child).to_dict is Container.to_dict:
+                    node = Component.to_dict(child)
+                    node["children"] = []
+                    stack.append((child, node))
+                else:
+                    node = child.to_dict()
+                out["children"].append(node)
         return data
+
+
+def adopt_ids(component: Component, tree: Dict[str, Any], registry: Dict[str, Callable[..., Any]]) -> None:
+    """Give a rebuilt component tree the ids of an earlier serialization.
+
+    Nodes are matched by position and type.  Event handlers are re-registered
+    under the old event ids, so a device holding the old tree keeps working
+    and diffing against it yields only real changes.
+    """
+    stack = [(component, tree)]
+    while stack:
+        comp, node = stack.pop()
+        if comp.type != node.get("type"):
+            continue
+        comp.id = node["id"]
+        for name, old_eid in node.get("events", {}).items():
+            new_eid = comp.events.get(name)
+            if new_eid and new_eid != old_eid and new_eid in registry:
+                registry[old_eid] = registry.pop(new_eid)
+                comp.events[name] = old_eid
+        stack.extend(zip(getattr(comp, "children", None) or [], node.get("children", [])))
+
+
+def restore_props(component: Component, tree: Dict[str, Any]) -> None:
+    """Copy prop values of an earlier serialization onto a rebuilt tree.
+
+    Nodes are matched like in ``adopt_ids``.  Props bound to a ``State``
+    keep the state's current value.
+    """
+    stack = [(component, tree)]
+    while stack:
+        comp, node = stack.pop()
+        if comp.type != node.get("type"):
+            continue
+        for key, value in node.get("props", {}).items():
+            if key not in comp._bound_props:
+                comp.props[key] = value
+        stack.extend(zip(getattr(comp, "children", None) or [], node.get("children", [])))
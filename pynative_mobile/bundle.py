@@ -0,0 +1,125 @@
+import json
+import os
+import shutil
+import time
+import zlib
+from typing import Any, BinaryIO, Dict, List
+
+COMPRESSION = ("gzip", "zlib")
+_CHUNK = 1 << 16
+
+
+class _ChunkWriter:
+    """Buffers small encoder chunks and optionally deflates them on the way out."""
+
+    def __init__(self, f: BinaryIO, compress: str | None) -> None:
+        self.f = f
+        self.raw_bytes = 0
+        self._buf: List[bytes] = []
+        self._size = 0
+        self._z = None
+        if compress == "gzip":
+            self._z = zlib.compressobj(9, zlib.DEFLATED, 31)
+        elif compress == "zlib":
+            self._z = zlib.compressobj(9)
+
+    def write(self, text: str) -> None:
+        data = text.encode("utf-8")
+        self.raw_bytes += len(data)
+        self._buf.append(data)
+        self._size += len(data)
+        if self._size >= _CHUNK:
+            self._drain()
+
+    def _drain(self) -> None:
+        data = b"".join(self._buf)
+        self._buf, self._size = [], 0
+        self.f.write(self._z.compress(data) if self._z else data)
+
+    def close(self) -> None:
+        self._drain()
+        if self._z:
+            self.f.write(self._z.flush())
+
+
+def _externalize_assets(app: Any, tree: Dict[str, Any], assets_dir: str, report: Dict[str, Any]) -> Dict[str, int]:
+    """Copy each referenced file (or its resized variant) once into
+    ``assets_dir`` under its content hash.
+
+    ``src`` props are rewritten to ``asset:<name>``; the returned manifest maps
+    those names to byte sizes.
+    """
+    manifest: Dict[str, int] = {}
+    found = []
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        props = node.get("props", {})
+        if app.assets.source_file(props):  # queues resized variants in parallel
+            found.append(props)
+        stack.extend(node.get("children", []))
+    for props in found:
+        path = app.assets.source_file(props, wait=True)
+        if path:
+            name = app.assets.digest(path) + os.path.splitext(path)[1].lower()
+            if name in manifest:
+                report["deduplicated"] += 1
+            else:
+                os.makedirs(assets_dir, exist_ok=True)
+                target = os.path.join(assets_dir, name)
+                if not os.path.exists(target):
+                    shutil.copyfile(path, target)
+                manifest[name] = os.path.getsize(target)
+            props["src"] = f"asset:{name}"
+    report["assets"] = len(manifest)
+    report["asset_bytes"] = sum(manifest.values())
+    return manifest
+
+
+def write_bundle(app: Any, out_path: str, compress: str | None = None, assets_dir: str | None = None) -> Dict[str, Any]:
+    """Write a minified production bundle and return a size/timing report.
+
+    Assets are stored beside the bundle (``main.assets/`` for ``main.bundle.json``) instead
+    of being inlined, and the JSON is streamed to disk through
+    ``JSONEncoder.iterencode`` so the encoded bundle is never held in memory.
+    """
+    if compress not in (None,) + COMPRESSION:
+        raise ValueError(f"unsupported compression {compress!r}")
+    if assets_dir is None:
+        head, tail = os.path.split(out_path)
+        assets_dir = os.path.join(head, tail.split(".", 1)[0] + ".assets")
+    report: Dict[str, Any] = {"path": out_path, "assets_dir": assets_dir, "deduplicated": 0, "timings": {}}
+
+    started = time.perf_counter()
+    payload = app.snapshot()
+    report["timings"]["snapshot"] = time.perf_counter() - started
+
+    mark = time.perf_counter()
+    payload["assets"] = _externalize_assets(app, payload["tree"], assets_dir, report)
+    report["timings"]["assets"] = time.perf_counter() - mark
+
+    mark = time.perf_counter()
+    encoder = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+    with open(out_path, "wb") as f:
+        writer = _ChunkWriter(f, compress)
+        for chunk in encoder.iterencode(payload):
+            writer.write(chunk)
+        writer.close()
+    report["timings"]["write"] = time.perf_counter() - mark
+
+    report["raw_bytes"] = writer.raw_bytes
+    report["bytes"] = os.path.getsize(out_path)
+    report["seconds"] = time.perf_counter() - started
+    return report
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [
+        f"Wrote bundle to {report['path']}",
+        f"  bundle: {report['bytes']:,} bytes ({report['raw_bytes']:,} bytes of JSON)",
+        f"  assets: {report['assets']} files, {report['asset_bytes']:,} bytes in {report['assets_dir']}"
+        f" ({report['deduplicated']} duplicate references)",
+    ]
+    phases = ", ".join(f"{k} {v * 1000:.1f}ms" for k, v in report["timings"].items())
+    lines.append(f"  time: {report['seconds'] * 1000:.1f}ms ({phases})")
+    return "\n".join(lines)
@@ -1,15 +1,10 @@
 import argparse
 import os
-import sys  # noqa: F401
+import sys
 import socket
 import importlib.util
 from typing import Optional  # noqa: F401
 
-try:
-    import qrcode
-except ImportError:  
-    qrcode = None 
-
 
 def get_local_ip() -> str:
     s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
@@ -29,6 +24,8 @@ def load_app(path: str) -> object:
     spec = importlib.util.spec_from_file_location("pynative_main", path)
     module = importlib.util.module_from_spec(spec)
     assert spec and spec.loader
+    # registered like an imported module, so `pynative profile` can find its States
+    sys.modules[spec.name] = module
     spec.loader.exec_module(module)
     if not hasattr(module, "app"):
         raise AttributeError("main.py must define an 'app' variable")
@@ -36,7 +33,9 @@ def load_app(path: str) -> object:
 
 
 def print_qr(text: str) -> None:
-    if qrcode is None:
+    try:
+        import qrcode
+    except ImportError:
         print(f"Scan this URL: {text}")
         return
     img = qrcode.make(text)
@@ -56,9 +55,14 @@ def main() -> None:
     run_parser.add_argument("--port", type=int, default=8000)
     run_parser.add_argument("--socketio", action="store_true", help="use socket.io transport")
     run_parser.add_argument("--no-watch", dest="watch", action="store_false", help="disable hot-reload watcher")
+    run_parser.add_argument("--record", metavar="FILE", help="append every packet and event to FILE for `loadtest`")
+    run_parser.add_argument("--no-snapshot", dest="snapshot", action="store_false",
+                            help="do not serve or update the cached snapshot (.pynative_cache/snapshot.json)")
 
     preview_parser = sub.add_parser("preview", help="open web preview page in browser")
-    preview_parser.add_argument("--file", default="web_preview.html", help="path to preview HTML file")
+    preview_parser.add_argument("--host", default="localhost", help="host of a running `pynative run` bridge")
+    preview_parser.add_argument("--port", type=int, default=8000)
+    preview_parser.add_argument("--file", default=None, help="open a custom preview HTML file instead")
 
     doctor_parser = sub.add_parser("doctor", help="check for required dependencies and environment")
         # parser variable is unused but kept for API consistency
@@ -67,19 +71,64 @@ def main() -> None:
 
     build_parser = sub.add_parser("build", help="build a JSON bundle for deployment")
     build_parser.add_argument("path", nargs="?", default="main.py")
+    build_parser.add_argument("--release", action="store_true", help="minified bundle with assets stored by content hash")
+    build_parser.add_argument("--compress", choices=["gzip", "zlib"], help="compress the release bundle")
+    build_parser.add_argument("--out", help="bundle output path")
     
+    load_parser = sub.add_parser("loadtest", help="replay a recording from simulated devices on localhost")
+    load_parser.add_argument("recording", help="file written by `run --record`")
+    load_parser.add_argument("--host", default="127.0.0.1")
+    load_parser.add_argument("--port", type=int, default=8000)
+    load_parser.add_argument("--devices", type=int, default=10)
+    load_parser.add_argument("--rate", type=float, default=5.0, help="events per second per device (0 = recorded timing)")
+    load_parser.add_argument("--duration", type=float, help="seconds to run (default: replay the recording once)")
+
+    profile_parser = sub.add_parser("profile", help="profile a scripted interaction with the app")
+    profile_parser.add_argument("script", help="JSON list of steps (events, state changes, navigation)")
+    profile_parser.add_argument("path", nargs="?", default="main.py")
+    profile_parser.add_argument("--collapsed", metavar="FILE", help="write sampled stacks for flamegraph.pl/speedscope")
+    profile_parser.add_argument("--interval", type=float, default=1.0, help="sampling interval in ms")
+    profile_parser.add_argument("--top", type=int, default=10, help="rows per report section")
+    profile_parser.add_argument("--no-memory", dest="memory", action="store_false", help="skip tracemalloc")
+
     init_parser = sub.add_parser("init", help="initialize a fresh PyNative project structure")
     init_parser.add_argument("directory", nargs="?", default=".")
 
     args = parser.parse_args()
     if args.command == "run":
+        import threading
+        import time
+        started = time.perf_counter()
+        cache = early = None
+        if args.snapshot and not args.socketio:
+            from .snapshot import SnapshotCache, SnapshotHandler
+            cache = SnapshotCache(os.path.dirname(os.path.abspath(args.path)) or ".")
+            cached = cache.load()
+            if cached is not None:
+                # devices get the last snapshot while main.py is still loading
+                early = SnapshotHandler(cached, started)
+                early.start(host=args.host, port=args.port)
+                print("Serving cached snapshot while the app loads...")
         app = load_app(args.path)
         print("Starting PyNative application...")
         # type of app is Any because loader returns object; cast for mypy
         from typing import cast
         from .engine import PyNativeApp as _AppType
         app = cast(_AppType, app)
-        app.start_bridge(host=args.host, port=args.port, socketio=args.socketio)
+        if early is not None:
+            early.hand_over(app)
+        else:
+            app.start_bridge(host=args.host, port=args.port, socketio=args.socketio)
+        print(f"App loaded in {(time.perf_counter() - started) * 1000:.0f}ms")
+        if cache is not None:
+            threading.Thread(target=cache.save, args=(app,), daemon=True).start()
+        if args.record:
+            from .recorder import Recorder
+            if args.socketio or app.bridge is None:
+                print("--record is only supported by the websocket bridge")
+            else:
+                app.bridge.recorder = Recorder(args.record)
+                print(f"Recording traffic to {args.record}")
         if args.watch:
             app._start_watcher(os.path.dirname(os.path.abspath(args.path)) or ".")
         ip = get_local_ip()
@@ -92,8 +141,21 @@ def main() -> None:
                 pass
         except KeyboardInterrupt:
             print("Shutting down")
+            app.storage.flush()
+            if cache is not None:
+                cache.save(app)
+            recorder = getattr(app.bridge, "recorder", None)
+            if recorder is not None:
+                recorder.close()
+            app.close()
     elif args.command == "preview":
         import webbrowser
+        if args.file is None:
+            # the bridge serves the incremental preview client itself
+            url = f"http://{args.host}:{args.port}/"
+            print(f"Opening web preview: {url}")
+            webbrowser.open(url)
+            return
         path = os.path.abspath(args.file)
         if not os.path.isfile(path):
             print(f"Preview file not found: {path}")
@@ -105,9 +167,8 @@ def main() -> None:
         print("Checking PyNative environment...")
         missing = []
         for pkg in ["fastapi", "uvicorn", "watchdog", "socketio", "qrcode", "httpx"]:
-            try:
-                __import__(pkg)
-            except ImportError:
+            # find_spec locates the package without paying for importing it
+            if importlib.util.find_spec(pkg) is None:
                 missing.append(pkg)
         if missing:
             print("Missing packages:", ", ".join(missing))
@@ -134,11 +195,37 @@ def main() -> None:
         from typing import cast
         from .engine import PyNativeApp as _AppType
         app = cast(_AppType, app)
-        bundle = app.build()
-        out = os.path.splitext(args.path)[0] + ".json"
-        with open(out, "w") as f:
-            f.write(bundle)
-        print(f"Wrote bundle to {out}")
+        if args.release:
+            from . import bundle as _bundle
+            suffix = {"gzip": ".gz", "zlib": ".zz"}.get(args.compress, "")
+            out = args.out or os.path.splitext(args.path)[0] + ".bundle.json" + suffix
+            print(_bundle.format_report(_bundle.write_bundle(app, out, compress=args.compress)))
+        else:
+            bundle = app.build()
+            out = args.out or os.path.splitext(args.path)[0] + ".json"
+            with open(out, "w") as f:
+                f.write(bundle)
+            print(f"Wrote bundle to {out}")
+
+    elif args.command == "loadtest":
+        import asyncio
+        from . import loadtest as _loadtest
+        report = asyncio.run(_loadtest.run_loadtest(
+            args.recording, host=args.host, port=args.port,
+            devices=args.devices, rate=args.rate, duration=args.duration,
+        ))
+        print(_loadtest.format_report(report))
+
+    elif args.command == "profile":
+        from . import profiler as _profiler
+        steps = _profiler.load_script(args.script)
+        app = load_app(args.path)
+        report = _profiler.profile_app(app, steps, interval=args.interval / 1000, memory=args.memory)
+        print(_profiler.format_report(report, top=args.top))
+        if args.collapsed:
+            with open(args.collapsed, "w") as f:
+                f.write(report["collapsed"])
+            print(f"Wrote collapsed stacks to {args.collapsed}")
 
     elif args.command == "init":
         dest = os.path.abspath(args.directory)
@@ -0,0 +1,282 @@
+import json
+from typing import Any, Dict, List, Optional, Sequence
+
+# props whose new value serializes to fewer bytes than this are always sent
+# whole; None turns prop deltas off
+DELTA_MIN_BYTES: Optional[int] = 256
+
+Path = List[Any]
+
+
+def _size(value: Any) -> int:
+    return len(json.dumps(value, separators=(",", ":"), default=str))
+
+
+def _common_prefix(a: Sequence[Any], b: Sequence[Any]) -> int:
+    # binary search over slice comparisons, so long strings are compared in C
+    lo, hi = 0, min(len(a), len(b))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[:mid] == b[:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _common_suffix(a: Sequence[Any], b: Sequence[Any], limit: int) -> int:
+    lo, hi = 0, limit
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[len(a) - mid:] == b[len(b) - mid:]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _units(text: str) -> int:
+    # string offsets are UTF-16 code units, which is what JS strings index by
+    return len(text.encode("utf-16-le")) // 2
+
+
+def _nested(old: Any, new: Any) -> bool:
+    return type(old) is type(new) and isinstance(new, (str, list, dict))
+
+
+def _delta_ops(old: Any, new: Any, path: Path, ops: List[Dict[str, Any]]) -> None:
+    if isinstance(new, dict):
+        for k, v in new.items():
+            if k not in old:
+                ops.append({"op": "set", "path": path + [k], "value": v})
+            elif old[k] != v:
+                if _nested(old[k], v):
+                    _delta_ops(old[k], v, path + [k], ops)
+                else:
+                    ops.append({"op": "set", "path": path + [k], "value": v})
+        for k in old:
+            if k not in new:
+                ops.append({"op": "unset", "path": path + [k]})
+        return
+    start = _common_prefix(old, new)
+    end = _common_suffix(old, new, min(len(old), len(new)) - start)
+    o_mid = old[start:len(old) - end]
+    n_mid = new[start:len(new) - end]
+    if isinstance(new, str):
+        splice = {"op": "splice", "path": path, "at": _units(old[:start]), "delete": _units(o_mid), "insert": n_mid}
+    else:
+        splice = {"op": "splice", "path": path, "at": start, "delete": len(o_mid), "insert": n_mid}
+    if isinstance(new, list):
+        # items paired by position (edited in place) plus a splice for the
+        # length difference, if that beats replacing the whole middle
+        paired: List[Dict[str, Any]] = []
+        common = min(len(o_mid), len(n_mid))
+        for i, (o, n) in enumerate(zip(o_mid, n_mid)):
+            if o == n:
+                continue
+            if _nested(o, n):
+                _delta_ops(o, n, path + [start + i], paired)
+            else:
+                paired.append({"op": "set", "path": path + [start + i], "value": n})
+        if len(o_mid) != len(n_mid):
+            paired.append({"op": "splice", "path": path, "at": start + common,
+                           "delete": len(o_mid) - common, "insert": n_mid[common:]})
+        if _size(paired) < _size(splice):
+            ops.extend(paired)
+            return
+    ops.append(splice)
+
+
+def prop_delta(old: Any, new: Any) -> Optional[List[Dict[str, Any]]]:
+    """Ops turning ``old`` into ``new`` if they are smaller than ``new`` itself.
+
+    Strings and lists change by ``splice`` (``at``/``delete``/``insert``,
+    which covers appends; string offsets count UTF-16 code units, as in JS),
+    dict entries and list items by ``set``/``unset``.
+    Every op has a ``path`` of keys and list indexes to the value it changes,
+    so edited items inside a list of dicts are patched in place.  Returns ``None``
+    when the value should be sent whole: different types, values under
+    ``DELTA_MIN_BYTES`` or ops that would not save anything.
+    """
+    if DELTA_MIN_BYTES is None or not _nested(old, new):
+        return None
+    full = _size(new)
+    if full < DELTA_MIN_BYTES:
+        return None
+    ops: List[Dict[str, Any]] = []
+    _delta_ops(old, new, [], ops)
+    return ops if _size(ops) < full else None
+
+
+def _apply_op(target: Any, path: Path, op: Dict[str, Any]) -> Any:
+    if op["op"] == "splice" and not path:
+        at, end = op["at"], op["at"] + op["delete"]
+        if isinstance(target, str):
+            units = target.encode("utf-16-le")
+            return units[:2 * at].decode("utf-16-le") + op["insert"] + units[2 * end:].decode("utf-16-le")
+        target[at:end] = op["insert"]
+    elif op["op"] != "splice" and len(path) == 1:
+        if op["op"] == "set":
+            target[path[0]] = op["value"]
+        else:
+            del target[path[0]]
+    else:
+        target[path[0]] = _apply_op(target[path[0]], path[1:], op)
+    return target
+
+
+def apply_delta(value: Any, ops: List[Dict[str, Any]]) -> Any:
+    """Apply ``prop_delta`` ops; lists and dicts are changed in place."""
+    for op in ops:
+        value = _apply_op(value, op["path"], op)
+    return value
+
+
+def diff_trees(old: Dict[str, Any], new: Dict[str, Any]) -> List[Dict[str, Any]]:
+    patches: List[Dict[str, Any]] = []
+    # work items are (old, new) pairs still to diff or ready patches; pushing
+    # a node's follow-up items in reverse keeps the recursive patch order
+    stack: List[Any] = [(old, new)]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, dict):
+            patches.append(item)
+            continue
+        old, new = item
+
+        if old.get("id") != new.get("id") or old.get("type") != new.get("type"):
+            patches.append({"action": "replace", "old": old, "new": new})
+            continue
+
+        old_props = old.get("props", {})
+        new_props = new.get("props", {})
+
+        for k, v in new_props.items():
+            if k not in old_props:
+                patches.append({"action": "update", "id": new["id"], "prop": k, "value": v})
+            elif old_props[k] != v:
+                ops = prop_delta(old_props[k], v)
+                if ops is None:
+                    patches.append({"action": "update", "id": new["id"], "prop": k, "value": v})
+                else:
+                    patches.append({"action": "delta", "id": new["id"], "prop": k, "ops": ops})
+
+        for k in old_props:
+            if k not in new_props:
+                patches.append({"action": "remove_prop", "id": new["id"], "prop": k})
+
+        o_children = old.get("children", [])
+        n_children = new.get("children", [])
+        follow: List[Any] = []
+
+        o_map = {c.get("props", {}).get("key"): c for c in o_children if c.get("props", {}).get("key")}
+        n_map = {c.get("props", {}).get("key"): c for c in n_children if c.get("props", {}).get("key")}
+        if o_map and n_map:
+            for key, nnode in n_map.items():
+                onode = o_map.get(key)
+                if onode:
+                    follow.append((onode, nnode))
+                else:
+                    follow.append({"action": "add", "parent": new["id"], "component": nnode})
+            for key, onode in o_map.items():
+                if key not in n_map:
+                    follow.append({"action": "remove", "id": onode["id"]})
+        else:
+            follow.extend(zip(o_children, n_children))
+
+            if len(n_children) > len(o_children):
+                for c in n_children[len(o_children) :]:
+                    follow.append({"action": "add", "parent": new["id"], "component": c})
+
+            if len(o_children) > len(n_children):
+                for o in o_children[len(n_children) :]:
+                    follow.append({"action": "remove", "id": o["id"]})
+
+        stack.extend(reversed(follow))
+
+    return patches
+
+
+def diff_theme(old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """``[{"action": "theme", "tokens": {token: value}}]`` for changed tokens, if any.
+
+    Removed tokens are sent with a ``None`` value.
+    """
+    o_tokens = (old or {}).get("tokens", {})
+    n_tokens = (new or {}).get("tokens", {})
+    if o_tokens == n_tokens:
+        return []
+    changed = {k: v for k, v in n_tokens.items() if o_tokens.get(k) != v}
+    changed.update((k, None) for k in o_tokens if k not in n_tokens)
+    return [{"action": "theme", "tokens": changed}]
+
+
+def diff_views(old: Dict[str, Any], new: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Diff two navigation views.
+
+    A view is ``{"tree": visible tree, "stack": [screen ids], "screens": {id:
+    last tree seen for that screen}, "theme": theme dict}``; a theme change
+    leads the patches as a ``theme`` patch.  When the visible screen changes the
+    result starts with a ``push``/``pop``/``switch`` patch; if the device
+    already holds the target screen only its id is sent, followed by the diff
+    since that screen was last visible, instead of both full trees.
+    """
+    o_root = old["tree"].get("id")
+    n_root = new["tree"].get("id")
+    if o_root == n_root:
+        patches = diff_trees(old["tree"], new["tree"])
+        popped: List[str] = []
+    else:
+        if n_root in old["stack"]:
+            nav: Dict[str, Any] = {"action": "pop", "to": n_root}
+            popped = old["stack"][old["stack"].index(n_root) + 1:]
+        else:
+            nav = {"action": "push" if len(new["stack"]) > len(old["stack"]) else "switch"}
+            popped = []
+        cached = old["screens"].get(n_root)
+        if cached is not None:
+            if nav["action"] != "pop":
+                nav["id"] = n_root
+            patches = [nav] + diff_trees(cached, new["tree"])
+        else:
+            nav["screen"] = new["tree"]
+            patches = [nav]
+    dropped = [i for i in old["screens"] if i not in new["screens"] and i not in popped]
+    if dropped:
+        patches.append({"action": "drop", "ids": dropped})
+    if "theme" in new:
+        patches[:0] = diff_theme(old.get("theme"), new["theme"])
+    return patches
+
+
+def find_regions(tree: Dict[str, Any], selectors: Sequence[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+    """Map each selector to the subtree whose id or ``region`` prop matches it."""
+    wanted = set(selectors)
+    found: Dict[str, Optional[Dict[str, Any]]] = dict.fromkeys(selectors)
+    stack = [tree]
+    while stack and wanted:
+        node = stack.pop()
+        for sel in (node.get("id"), node.get("props", {}).get("region")):
+            if sel in wanted:
+                found[sel] = node
+                wanted.discard(sel)
+        stack.extend(node.get("children", []))
+    return found
+
+
+def diff_regions(old: Dict[str, Any], new: Dict[str, Any], selectors: Sequence[str]) -> List[Dict[str, Any]]:
+    """Diff only the subtrees named by ``selectors`` in two visible trees.
+
+    A region that appears, disappears or is replaced by a different node is
+    sent whole as ``{"action": "region", "name": sel, "tree": subtree|None}``.
+    """
+    o_regions = find_regions(old, selectors)
+    n_regions = find_regions(new, selectors)
+    patches: List[Dict[str, Any]] = []
+    for sel in selectors:
+        o, n = o_regions[sel], n_regions[sel]
+        if o is not None and n is not None and o.get("id") == n.get("id"):
+            patches.extend(diff_trees(o, n))
+        elif o is not n:
+            patches.append({"action": "region", "name": sel, "tree": n})
+    return patches
@@ -1,14 +1,28 @@
 import json
-from typing import Any, Callable, Dict, List  # noqa: F401
+import contextvars
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Tuple  # noqa: F401
 from .theme import default_theme
-from .base import Component, Container, PROP_UPDATE_LISTENERS
+from .base import Component, Container, PROP_UPDATE_LISTENERS, adopt_ids, restore_props
 from .assets import AssetManager
-from .transport import BridgeServer
-from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
+from .diff import diff_regions, diff_theme, diff_trees, diff_views, find_regions
+from collections import OrderedDict
+from .sync import ClientSync
+from .interning import StringTable
+from .recorder import locate_event
+from .nodestore import dumps
 import os
 import threading
+import zlib
 
+if TYPE_CHECKING:
+    # the web stack (FastAPI/uvicorn) and watchdog are imported only when a
+    # bridge or the hot-reload watcher is actually started
+    from .transport import BridgeServer
+
+# id of the device whose event is currently being handled
+_current_client: contextvars.ContextVar[str | None] = contextvars.ContextVar(
+    "pynative_current_client", default=None
+)
 
 
 class Config:
@@ -31,20 +45,132 @@ class Config:
 
 
 class Router:
-    """Simple router that maps paths to components and parameters."""
+    """Simple router that maps paths to components and parameters.
+
+    A route may be a ``Component`` or a factory returning one; factories are
+    only called when the route is navigated to.  ``prefetch`` names routes
+    likely to be visited next, which are then built and serialized in the
+    background right after this one is shown.  Prefetched screens are kept
+    only while the screen that hinted them is the last one navigated to, at
+    most ``max_prefetched`` at a time; a prefetched screen that is dropped
+    or bypassed (navigating with params builds a fresh one) has its event
+    handlers unregistered.
+    """
+
+    max_prefetched = 4
 
     def __init__(self):
         self.routes = {}
+        self._prefetch: Dict[str, List[str]] = {}
+        self._ready: Dict[str, Any] = {}
+        self._executor: Any = None
 
-    def add(self, path: str, component: Component):
+    def add(self, path: str, component: Any, prefetch: List[str] | None = None):
         self.routes[path] = component
-
-    def navigate(self, app: "PyNativeApp", path: str) -> None:
-        comp = self.routes.get(path)
-        if comp:
-            app.push(comp)
-        else:
+        self._discard(path)
+        if prefetch:
+            self._prefetch[path] = list(prefetch)
+
+    def _discard(self, path: str) -> None:
+        future = self._ready.pop(path, None)
+        if future is not None and not future.cancel():
+            future.add_done_callback(_unregister_prefetched)
+
+    def build(self, path: str, **params: Any) -> Component:
+        target = self.routes.get(path)
+        if target is None:
             raise KeyError(f"route {path} not found")
+        if isinstance(target, Component):
+            return target
+        if params:
+            self._discard(path)
+        ready = None if params else self._ready.pop(path, None)
+        if ready is not None:
+            comp, tree, mutations = ready.result()
+            if mutations == Component._mutations:
+                comp._serialized = tree
+        else:
+            comp = target(**params)
+        comp._route = (path, params)
+        return comp
+
+    def navigate(self, app: "PyNativeApp", path: str, **params: Any) -> None:
+        app.push(self.build(path, **params))
+        hints = self._prefetch.get(path, [])
+        for stale in [p for p in self._ready if p not in hints]:
+            self._discard(stale)
+        for nxt in hints:
+            self.prefetch(nxt)
+
+    def prefetch(self, path: str) -> None:
+        """Build and serialize a factory route in the background."""
+        factory = self.routes.get(path)
+        if factory is None or isinstance(factory, Component) or path in self._ready:
+            return
+        if self._executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pynative-prefetch")
+
+        def _build() -> Any:
+            mutations = Component._mutations
+            comp = factory()
+            return comp, comp.to_dict(), mutations
+
+        self._ready[path] = self._executor.submit(_build)
+        while len(self._ready) > self.max_prefetched:
+            self._discard(next(iter(self._ready)))
+
+
+def _unregister_prefetched(future: Any) -> None:
+    # a prefetched screen that will never be shown
+    if future.exception() is None:
+        _, tree, _ = future.result()
+        for event_id in _event_ids(tree):
+            Component._event_registry.pop(event_id, None)
+
+
+class ScreenSnapshot:
+    """Compact stand-in for a deep stack entry, rebuilt from its route on pop.
+
+    The rebuilt screen gets the snapshot's ids, event ids and props back, so
+    the device sees no change; props bound to a ``State`` show its current
+    value.
+    """
+
+    def __init__(self, component: Component) -> None:
+        self.id = component.id
+        self.type = component.type
+        if component._route is None:
+            raise ValueError("only screens built by the router can be snapshotted")
+        self.route = component._route
+        tree = component.to_dict()
+        self.events = _event_ids(tree)
+        self.data = zlib.compress(dumps(tree, separators=(",", ":")).encode("utf-8"))
+
+    def tree(self) -> Dict[str, Any]:
+        return json.loads(zlib.decompress(self.data))
+
+
+def _event_ids(tree: Dict[str, Any]) -> List[str]:
+    ids: List[str] = []
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        ids.extend(node.get("events", {}).values())
+        stack.extend(node.get("children", []))
+    return ids
+
+
+def _use_props(tree: Dict[str, Any], props: Dict[str, Dict[str, Any]]) -> None:
+    # replace live prop values of serialized nodes by copies taken earlier
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        copied = props.get(node["id"])
+        if copied:
+            node["props"].update(copied)
+        stack.extend(node.get("children", []))
 
 
 class PyNativeApp:
@@ -54,6 +180,9 @@ class PyNativeApp:
         theme: Any = None,
         start_server: bool = False,
         watch_path: str | None = None,
+        pipeline: str | None = None,
+        intern_strings: bool = False,
+        storage: Any = None,
     ) -> None:
         self.config = Config()
         self.stack: List[Component] = [root]
@@ -72,61 +201,220 @@ class PyNativeApp:
         from .storage import Storage
 
         self.hardware = Hardware(self)
-        self.storage = Storage()
-        self.bridge: BridgeServer | None = None
+        self.storage = storage or Storage()
+        self.bridge: "BridgeServer | None" = None
         self.store: Dict[str, Any] = {}
         self._reducers: Dict[str, Callable[[Any, Any], Any]] = {}
         self.router = Router()
         self._middleware: List[Callable[[Dict[str, Any]], None]] = []
-
+        # app-wide string dictionary for compact packets (clients
+        # must resolve "t"/"s"/"n" references, see interning.StringTable)
+        self.strings = StringTable() if intern_strings else None
+        self._sync = ClientSync(strings=self.strings)
+        # notify_bridge() may be called from any thread (background work,
+        # bridge callbacks): one reconcile at a time serializes, diffs and
+        # commits the view
+        self._publish_lock = threading.RLock()
+        # set while changes happen with nobody connected; the tree is only
+        # serialized once a device connects (see _reconcile())
+        self._dirty = True
+        # last serialized tree of every screen the device still holds: the
+        # navigation stack plus screens switched away from (see switch())
+        self._screens: Dict[str, Dict[str, Any]] = {}
+        self._parked: "OrderedDict[str, Component]" = OrderedDict()
+        self.max_parked_screens = 8
+        # stack entries deeper than this are kept as compressed snapshots
+        # (only screens built from router factories can be rebuilt)
+        self.max_live_screens: int | None = None
+        self._pipeline = None
+        self._closed = False
+        if pipeline:
+            from .pipeline import ReconcilePipeline
+
+            self._pipeline = ReconcilePipeline(self, pipeline)
 
         if start_server:
             self.start_bridge()
         if watch_path:
             self._start_watcher(watch_path)
-        PROP_UPDATE_LISTENERS.append(lambda *_: self.notify_bridge())
+        self._prop_listener: Callable[..., None] = lambda component, *_: self.notify_bridge(component)
+        PROP_UPDATE_LISTENERS.append(self._prop_listener)
+        # theme.set() is published as a small "theme" patch, not a snapshot
+        self._unbind_theme = self.theme.bind(lambda _: self.notify_bridge())
         self._setup_state_listeners(root)
+        self._track(root)
 
-    def build(self) -> str:
-        payload = {
+    def snapshot(self) -> Dict[str, Any]:
+        """The ``build()`` payload as a dict, with asset paths left unresolved."""
+        return {
             "metadata": {"version": "0.1.0", "engine": "PyNative-Core"},
             "theme": self.theme.to_dict(),
             "tree": self.root.to_dict(),
         }
+
+    def build(self) -> str:
+        payload = self.snapshot()
         self.assets.walk_tree(payload["tree"])
-        return json.dumps(payload, indent=4)
+        return dumps(payload, indent=4)
 
     def _setup_state_listeners(self, component: Component) -> None:
-        if hasattr(component, "_states"):
-            for state in component._states:
-                # specify types for lambda
-                state.bind(lambda _, s=state: self.notify_bridge())  # type: ignore[misc]
-        if isinstance(component, Container):
-            for child in component.children:
-                self._setup_state_listeners(child)
-
-    def notify_bridge(self) -> None:
-        for mw in self._middleware:
+        stack = [component]
+        while stack:
+            component = stack.pop()
+            if hasattr(component, "_states"):
+                for state in component._states:
+                    # specify types for lambda
+                    state.bind(lambda _, s=state: self.notify_bridge())  # type: ignore[misc]
+            if isinstance(component, Container):
+                stack.extend(component.children)
+
+    def notify_bridge(self, component: Component | None = None) -> None:
+        """Publish changes; ``component`` is the one whose bound prop just changed."""
+        if self._closed:
+            return
+        if self._pipeline is not None:
+            self._pipeline.submit(component)
+            return
+        self._reconcile()
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Wait until pipelined updates have been published (no-op otherwise)."""
+        if self._pipeline is None:
+            return True
+        return self._pipeline.flush(timeout)
+
+    def close(self) -> None:
+        """Publish pending updates, then stop the pipeline worker and prefetch threads.
+
+        The app also stops listening to prop and theme changes; later changes
+        are no longer published.
+        """
+        self._closed = True
+        if self._prop_listener in PROP_UPDATE_LISTENERS:
+            PROP_UPDATE_LISTENERS.remove(self._prop_listener)
+        self._unbind_theme()
+        if self._pipeline is not None:
+            self._pipeline.close()
+            self._pipeline = None
+        if self.router._executor is not None:
+            self.router._executor.shutdown()
+            self.router._executor = None
+
+    def _reconcile(self, props: Dict[str, Dict[str, Any]] | None = None) -> None:
+        with self._publish_lock:
+            targets = self._targets()
+            if not targets:
+                # nobody to send to: only remember the change; middleware,
+                # serializing and diffing run once a device connects
+                self._dirty = True
+                return
+            print("\n[PyNative Bridge] Sinyal Perubahan Diterima!")
+            self._publish(targets, props)
+
+    def _publish(self, targets: List[str], props: Dict[str, Dict[str, Any]] | None = None) -> None:
+        with self._publish_lock:
+            self._dirty = False
+            for mw in self._middleware:
+                try:
+                    mw(self)  # type: ignore[arg-type]
+                except Exception as e:
+                    print(f"[Middleware error] {e}")
+            view = self._view(props)
+            # a change can be announced several times (prop and state listeners);
+            # only a different view becomes a new version
+            old = self._sync.tree()
             try:
-                mw(self)  # type: ignore[arg-type]
-            except Exception as e:
-                print(f"[Middleware error] {e}")
-
-        print("\n[PyNative Bridge] Sinyal Perubahan Diterima!")
-        new_tree = self.get_tree()
-        packet = None
-
-        if getattr(self, "_last_tree", None) is None:
-            packet = self.build()
+                changed = view != old
+            except RecursionError:
+                # nested deeper than == can compare; the diff walks iteratively
+                changed = old is None or bool(diff_views(old, view))
+            if changed:
+                self._sync.commit(view)
+
+            print("[PyNative Bridge] Mengirim data terbaru ke HP...")
+            for client_id in targets:
+                self._sync_client(client_id)
+
+    def _view(self, props: Dict[str, Dict[str, Any]] | None = None) -> Dict[str, Any]:
+        tree = self._take_serialized(self.root) or self.get_tree()
+        if props:
+            # pipeline passes: changed components as their handlers left them
+            _use_props(tree, props)
+        stack = [c.id for c in self.stack]
+        retained = set(stack) | set(self._parked)
+        self._screens = {i: t for i, t in self._screens.items() if i in retained}
+        self._screens[self.root.id] = tree
+        return {"tree": tree, "stack": stack, "screens": dict(self._screens), "theme": self.theme.to_dict()}
+
+    def _targets(self) -> List[str]:
+        if self.bridge is None:
+            return []
+        if not hasattr(self.bridge, "clients"):
+            # broadcast-only bridge: one shared stream, tracked as client "*"
+            self._sync.connect("*")
+            return ["*"]
+        return self.bridge.clients()
+
+    def _encode_full(
+        self, view: Dict[str, Any], version: int, table: StringTable | None = None, regions: Tuple[str, ...] | None = None
+    ) -> str:
+        tree = view["tree"]
+        payload: Dict[str, Any] = {
+            "metadata": {"version": "0.1.0", "engine": "PyNative-Core"},
+            "theme": view.get("theme") or self.theme.to_dict(),
+            "version": version,
+        }
+        if regions:
+            # subscribed clients only ever see their subtrees
+            payload["regions"] = {
+                sel: None if node is None else self.assets.resolve_tree(node)
+                for sel, node in find_regions(tree, regions).items()
+            }
+            return table.dumps(payload) if table is not None else dumps(payload, indent=4)
+        payload["tree"] = self.assets.resolve_tree(tree)
+        hidden = {i: t for i, t in view["screens"].items() if i != tree["id"]}
+        if hidden:
+            # screens the device can navigate back/switch to without a resend
+            payload["stack"] = view["stack"]
+            payload["screens"] = hidden
+        if table is not None:
+            return table.dumps(payload)
+        return dumps(payload, indent=4)
+
+    def _encode_patches(
+        self,
+        old: Dict[str, Any],
+        new: Dict[str, Any],
+        base: int,
+        version: int,
+        table: StringTable | None = None,
+        regions: Tuple[str, ...] | None = None,
+    ) -> str | None:
+        extra = {"version": version, "base": base}
+        if regions:
+            patches = diff_theme(old.get("theme"), new.get("theme")) + diff_regions(old["tree"], new["tree"], regions)
+        elif self._pipeline is not None and table is None:
+            return self._pipeline.diff_and_encode(old, new, extra)
         else:
-            patches = self._diff_trees(self._last_tree, new_tree)
-            if patches:
-                packet = json.dumps({"patches": patches}, indent=4)
-        self._last_tree = new_tree
-
-        print("[PyNative Bridge] Mengirim data terbaru ke HP...")
-        if packet and self.bridge:
-            self.bridge.broadcast(packet)
+            patches = self._pipeline.diff(old, new) if self._pipeline is not None else diff_views(old, new)
+        if not patches:
+            return None
+        if table is not None:
+            return table.dumps({"patches": patches, **extra})
+        return dumps({"patches": patches, **extra}, indent=4)
+
+    def _sync_client(self, client_id: str) -> None:
+        """Send ``client_id`` whatever it needs to reach the newest version."""
+        bridge = self.bridge
+        if bridge is None:
+            return
+        packet = self._sync.packet_for(client_id, self._encode_full, self._encode_patches)
+        if packet is None:
+            return
+        if client_id == "*":
+            bridge.broadcast(packet)
+        else:
+            bridge.send(client_id, packet)
 
     def dispatch(self, action: str, payload: Any) -> None:
         """Dispatch an action to update the global store via reducers."""
@@ -143,51 +431,7 @@ class PyNativeApp:
         return self.root.to_dict()
 
     def _diff_trees(self, old: Dict[str, Any], new: Dict[str, Any]) -> List[Dict[str, Any]]:
-        patches: List[Dict[str, Any]] = []
-
-        if old.get("id") != new.get("id") or old.get("type") != new.get("type"):
-            patches.append({"action": "replace", "old": old, "new": new})
-            return patches
-
-        old_props = old.get("props", {})
-        new_props = new.get("props", {})
-
-        for k, v in new_props.items():
-            if k not in old_props or old_props[k] != v:
-                patches.append({"action": "update", "id": new["id"], "prop": k, "value": v})
-
-        for k in old_props:
-            if k not in new_props:
-                patches.append({"action": "remove_prop", "id": new["id"], "prop": k})
-
-        o_children = old.get("children", [])
-        n_children = new.get("children", [])
-
-        o_map = {c.get("props", {}).get("key"): c for c in o_children if c.get("props", {}).get("key")}
-        n_map = {c.get("props", {}).get("key"): c for c in n_children if c.get("props", {}).get("key")}
-        if o_map and n_map:
-            for key, nnode in n_map.items():
-                onode = o_map.get(key)
-                if onode:
-                    patches.extend(self._diff_trees(onode, nnode))
-                else:
-                    patches.append({"action": "add", "parent": new["id"], "component": nnode})
-            for key, onode in o_map.items():
-                if key not in n_map:
-                    patches.append({"action": "remove", "id": onode["id"]})
-        else:
-            for i, (o, n) in enumerate(zip(o_children, n_children)):
-                patches.extend(self._diff_trees(o, n))
-
-            if len(n_children) > len(o_children):
-                for c in n_children[len(o_children) :]:
-                    patches.append({"action": "add", "parent": new["id"], "component": c})
-
-            if len(o_children) > len(n_children):
-                for o in o_children[len(n_children) :]:
-                    patches.append({"action": "remove", "id": o["id"]})
-
-        return patches
+        return diff_trees(old, new)
 
     def start_bridge(self, host: str = "0.0.0.0", port: int = 8000, *,
                      socketio: bool = False) -> None:
@@ -200,15 +444,146 @@ class PyNativeApp:
             from .transport import BridgeServer
 
             self.bridge = BridgeServer(host=host, port=port)
+        self.attach_bridge(self.bridge)
         self.bridge.start()
 
+    def attach_bridge(self, bridge: Any) -> None:
+        """Use ``bridge`` for outgoing packets and receive its client callbacks."""
+        self.bridge = bridge
+        bridge.handler = self
+
+    @property
+    def current_client(self) -> str | None:
+        """Client id of the device that sent the event being handled, if any."""
+        return _current_client.get()
+
+    def client_connected(self, client_id: str) -> None:
+        print(f"[PyNative Bridge] Device {client_id} terhubung")
+        self._sync.connect(client_id, interned=True)
+        with self._publish_lock:
+            if self._dirty:
+                # first subscriber after idle changes: build one snapshot now
+                self._publish([client_id])
+            else:
+                self._sync_client(client_id)
+
+    def export_snapshot(self) -> Dict[str, Any]:
+        """The current view and its full packet at version 1, for ``SnapshotCache``."""
+        with self._publish_lock:
+            view = self._sync.tree() or self._view()
+        return {"view": view, "packet": self._encode_full(view, 1)}
+
+    def resume(self, snapshot: Dict[str, Any], clients: Dict[str, bool]) -> None:
+        """Take over devices that were painted from a cached ``snapshot``.
+
+        ``clients`` maps the connected client ids to whether they acked the
+        cached packet (version 1).  The live tree adopts the cached ids and
+        event ids, the cached view becomes version 1 and each device gets
+        one reconciling diff instead of a second full snapshot.
+        """
+        view = snapshot["view"]
+        root = view.get("screens", {}).get(view["stack"][0], view["tree"]) if view.get("stack") else view["tree"]
+        adopt_ids(self.root, root, self.event_registry)
+        with self._sync._lock:
+            # if the app already published on its own, devices get a full packet
+            base = self._sync.commit(view) if self._sync.version == 0 else None
+            for client_id, acked in clients.items():
+                client = self._sync.connect(client_id, interned=True)
+                if base is not None:
+                    client.sent = base
+                    if acked:
+                        client.acking = True
+                        client.acked = base
+        if clients:
+            self._publish(list(clients))
+
+    def client_message(self, client_id: str, msg: Dict[str, Any]) -> None:
+        if "event" in msg:
+            before = self._sync.version if self._pipeline is None else self._pipeline.requested
+            self.handle_event(msg["event"], msg.get("data"), client_id=client_id)
+            if "seq" in msg:
+                after = self._sync.version if self._pipeline is None else self._pipeline.requested
+                self._after_publish(lambda: self._send_handled(client_id, msg["seq"], after != before))
+        elif msg.get("type") == "ack":
+            self._sync.ack(client_id, int(msg.get("version", 0)))
+            self._sync_client(client_id)
+        elif msg.get("type") == "subscribe":
+            # {"type": "subscribe", "ids": [...], "regions": [...]}; empty = whole tree
+            self._sync.subscribe(client_id, list(msg.get("ids") or []) + list(msg.get("regions") or []))
+            self._sync_client(client_id)
+
+    def _after_publish(self, callback: Callable[[], None]) -> None:
+        # run once every change made so far has been committed
+        if self._pipeline is not None:
+            self._pipeline.then(callback)
+        else:
+            callback()
+
+    def _send_handled(self, client_id: str, seq: Any, changed: bool) -> None:
+        """Tell a client its event ``seq`` was handled and which version shows it.
+
+        Lets a client (e.g. a loadtest device) tell the update caused by its
+        own event from updates caused by other devices.  ``version`` is
+        ``null`` if the event changed nothing.
+        """
+        if self.bridge is None or not hasattr(self.bridge, "send"):
+            return
+        version = self._sync.version if changed else None
+        self.bridge.send(client_id, json.dumps({"type": "handled", "seq": seq, "version": version}))
+
+    def locate_event(self, event_id: str) -> Tuple[List[int], str] | None:
+        """Position of ``event_id`` in the visible tree, used to record replayable events."""
+        view = self._sync.tree()
+        return locate_event(view["tree"], event_id) if view else None
+
+    def client_disconnected(self, client_id: str) -> None:
+        self._sync.disconnect(client_id)
+        self.hardware.client_disconnected(client_id)
+
+    def _take_serialized(self, component: Component) -> Dict[str, Any] | None:
+        # tree pre-serialized by Router.prefetch, valid only for the first
+        # synchronous reconcile and only if no bound prop changed since
+        tree = component.__dict__.pop("_serialized", None)
+        if tree is None or self._pipeline is not None or component.on_init:
+            return None
+        if component.__dict__.pop("_serialized_at", None) != Component._mutations:
+            return None
+        return tree
+
+    def _compact_stack(self) -> None:
+        if self.max_live_screens is None:
+            return
+        for i, entry in enumerate(self.stack[: -self.max_live_screens or None]):
+            if isinstance(entry, Component) and getattr(entry, "_route", None):
+                snapshot = ScreenSnapshot(entry)
+                for eid in snapshot.events:
+                    self.event_registry.pop(eid, None)
+                self.stack[i] = snapshot  # type: ignore[call-overload]
+
+    def _restore(self, snapshot: ScreenSnapshot) -> Component:
+        path, params = snapshot.route
+        component = self.router.build(path, **params)
+        tree = snapshot.tree()
+        adopt_ids(component, tree, self.event_registry)
+        restore_props(component, tree)
+        return component
+
+    def _track(self, screen: Component) -> None:
+        # pipeline passes serialize bound props from copies (see ReconcilePipeline)
+        if self._pipeline is not None:
+            self._pipeline.track(screen)
+
     def push(self, component: Component) -> None:
         if hasattr(self.root, "on_destroy") and callable(self.root.on_destroy):
             self.root.on_destroy()
         self.stack.append(component)
         self.root = component
+        self._track(component)
+        if "_serialized" in component.__dict__:
+            component._serialized_at = Component._mutations
         if hasattr(component, "on_init") and callable(component.on_init):
             component.on_init()
+        self._compact_stack()
         self.notify_bridge()
 
     def pop(self) -> None:
@@ -216,24 +591,48 @@ class PyNativeApp:
             if hasattr(self.root, "on_destroy") and callable(self.root.on_destroy):
                 self.root.on_destroy()
             self.stack.pop()
+            if isinstance(self.stack[-1], ScreenSnapshot):
+                self.stack[-1] = self._restore(self.stack[-1])  # type: ignore[arg-type]
             self.root = self.stack[-1]
+            self._track(self.root)
             if hasattr(self.root, "on_init") and callable(self.root.on_init):
                 self.root.on_init()
             self.notify_bridge()
 
-    class _ReloadHandler(FileSystemEventHandler):
-        def __init__(self, callback: Callable[[], None]) -> None:
-            super().__init__()
-            self.callback = callback
-
-        def on_modified(self, event):
-            if event.src_path.endswith(".py"):
-                print(f"[HotReload] Detected change in {event.src_path}")
-                self.callback()
+    def switch(self, component: Component) -> None:
+        """Replace the top screen (tab-style), keeping it cached for switching back."""
+        if component is self.root:
+            return
+        if hasattr(self.root, "on_destroy") and callable(self.root.on_destroy):
+            self.root.on_destroy()
+        previous = self.stack[-1]
+        self._parked.pop(component.id, None)
+        self._parked[previous.id] = previous
+        while len(self._parked) > self.max_parked_screens:
+            self._parked.popitem(last=False)
+        self.stack[-1] = component
+        self.root = component
+        self._track(component)
+        if hasattr(component, "on_init") and callable(component.on_init):
+            component.on_init()
+        self.notify_bridge()
 
     def _start_watcher(self, path: str) -> None:
+        from watchdog.observers import Observer
+        from watchdog.events import FileSystemEventHandler
+
+        class _ReloadHandler(FileSystemEventHandler):
+            def __init__(self, callback: Callable[[], None]) -> None:
+                super().__init__()
+                self.callback = callback
+
+            def on_modified(self, event):
+                if event.src_path.endswith(".py"):
+                    print(f"[HotReload] Detected change in {event.src_path}")
+                    self.callback()
+
         path = os.path.abspath(path)
-        handler = self._ReloadHandler(self.notify_bridge)
+        handler = _ReloadHandler(self.notify_bridge)
         observer = Observer()
         observer.schedule(handler, path, recursive=True)
         observer_thread = threading.Thread(target=observer.start, daemon=True)
@@ -244,12 +643,16 @@ class PyNativeApp:
         print("UI Berubah! Mengirim JSON terbaru ke Bridge...")
         print(self.build())
 
-    def handle_event(self, event_id: str, data: Any = None) -> None:
+    def handle_event(self, event_id: str, data: Any = None, client_id: str | None = None) -> None:
         if event_id in self.event_registry:
             callback = self.event_registry[event_id]
-            if data is not None:
-                callback(data)
-            else:
-                callback()
+            token = _current_client.set(client_id)
+            try:
+                if data is not None:
+                    callback(data)
+                else:
+                    callback()
+            finally:
+                _current_client.reset(token)
         else:
             print(f"Error: Event ID {event_id} tidak ditemukan.")
\ No newline at end of file
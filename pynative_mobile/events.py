@@ -0,0 +1,112 @@
+import contextvars
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+_UNSET: Any = object()
+
+
+class RateLimiter:
+    """Wraps an event handler so bursts of calls collapse to the latest value.
+
+    Intervals are in milliseconds, the same unit sent to the client in
+    ``event_policies``.  ``debounce`` waits for a quiet period before calling
+    the handler once; ``throttle`` calls at most once per interval, delivering
+    the most recent arguments at the end of the window.  Delayed calls run
+    in a copy of the caller's context, so context variables such as the
+    requesting client are still set when a timer thread delivers them.
+    """
+
+    def __init__(
+        self,
+        callback: Callable[..., Any],
+        debounce: Optional[float] = None,
+        throttle: Optional[float] = None,
+    ) -> None:
+        if debounce and throttle:
+            raise ValueError("use either debounce or throttle, not both")
+        self.callback = callback
+        self.debounce = debounce
+        self.throttle = throttle
+        self._lock = threading.Lock()
+        self._pending: Any = _UNSET
+        self._context: Optional[contextvars.Context] = None
+        self._timer: Optional[threading.Timer] = None
+        self._last_call = float("-inf")
+
+    def __call__(self, *args: Any) -> None:
+        with self._lock:
+            self._pending = args
+            self._context = contextvars.copy_context()
+            if self.debounce:
+                self._schedule(self.debounce / 1000.0)
+                return
+            wait = self._last_call + (self.throttle or 0) / 1000.0 - time.monotonic()
+            if wait > 0 or self._timer is not None:
+                if self._timer is None:
+                    self._schedule(wait)
+                return
+            self._take()
+        self.callback(*args)
+
+    def _schedule(self, delay: float) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(delay, self._fire)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _take(self) -> Any:
+        call = (self._context, self._pending)
+        self._pending = _UNSET
+        self._context = None
+        self._timer = None
+        self._last_call = time.monotonic()
+        return call
+
+    def _deliver(self, call: Any) -> None:
+        context, args = call
+        context.run(self.callback, *args)
+
+    def _fire(self) -> None:
+        with self._lock:
+            if self._pending is _UNSET:
+                self._timer = None
+                return
+            call = self._take()
+        self._deliver(call)
+
+    @property
+    def pending(self) -> bool:
+        return self._pending is not _UNSET
+
+    def flush(self) -> None:
+        """Deliver a pending call immediately instead of waiting for the timer."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            if self._pending is _UNSET:
+                self._timer = None
+                return
+            call = self._take()
+        self._deliver(call)
+
+    def cancel(self) -> None:
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = None
+            self._pending = _UNSET
+            self._context = None
+
+
+def normalize_policy(value: Any, events: Any) -> Dict[str, float]:
+    """Expand a ``debounce=``/``throttle=`` argument to ``{event_name: ms}``.
+
+    A bare number applies to every event handler passed to the component.
+    """
+    if value is None:
+        return {}
+    if isinstance(value, dict):
+        return {k: v for k, v in value.items() if v and k in events}
+    return {name: value for name in events if value}
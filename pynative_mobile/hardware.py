@@ -1,38 +1,306 @@
 from .engine import PyNativeApp
 from .state import State
 import json
-from typing import Any, Optional
+import threading
+import time
+import uuid
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+_DEFAULT: Any = object()
+
+SENSOR_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "location": ("latitude", "longitude", "accuracy"),
+    "accelerometer": ("x", "y", "z"),
+    "gyroscope": ("x", "y", "z"),
+    "magnetometer": ("x", "y", "z"),
+}
+
+
+class HardwareRequest(State):
+    """``State`` for a single device request that can also be awaited.
+
+    ``await request`` (or ``request.result(timeout)``) yields the device's
+    answer and raises ``TimeoutError`` if it never arrives.  A failed request
+    sets the state to ``{"error": "<message>"}`` so bound props stay
+    publishable; the exception itself is only raised to awaiting callers.
+    """
+
+    def __init__(self, request_id: str, client_id: Optional[str] = None) -> None:
+        super().__init__(None)
+        self.request_id = request_id
+        self.client_id = client_id
+        from concurrent.futures import Future
+
+        self.future: Any = Future()
+
+    def result(self, timeout: Optional[float] = None) -> Any:
+        return self.future.result(timeout)
+
+    def __await__(self) -> Any:
+        import asyncio
+
+        return asyncio.wrap_future(self.future).__await__()
+
+    # the state is set first, so awaiting code wakes up after bound
+    # components were updated
+    def _resolve(self, data: Any) -> None:
+        self.value = data
+        if not self.future.done():
+            self.future.set_result(data)
+
+    def _fail(self, exc: BaseException) -> None:
+        self.value = {"error": str(exc) or type(exc).__name__}
+        if not self.future.done():
+            self.future.set_exception(exc)
+
+
+class RingBuffer:
+    """Fixed-capacity ring of ``width``-wide float samples in one flat ``array('d')``."""
+
+    def __init__(self, width: int, capacity: int) -> None:
+        self.width = width
+        self.capacity = capacity
+        self._data = array("d", bytes(8 * width * capacity))
+        self._next = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, values: Sequence[float]) -> None:
+        start = self._next * self.width
+        self._data[start:start + self.width] = array("d", values)
+        self._next = (self._next + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def latest(self) -> Optional[Tuple[float, ...]]:
+        if not self._size:
+            return None
+        start = ((self._next - 1) % self.capacity) * self.width
+        return tuple(self._data[start:start + self.width])
+
+    def __iter__(self) -> Iterator[Tuple[float, ...]]:
+        first = (self._next - self._size) % self.capacity
+        for i in range(self._size):
+            start = ((first + i) % self.capacity) * self.width
+            yield tuple(self._data[start:start + self.width])
+
+    def to_numpy(self) -> Any:
+        """Samples oldest-first as an ``(n, width)`` array; requires NumPy."""
+        import numpy as np
+
+        rows = np.frombuffer(self._data, dtype="d").reshape(self.capacity, self.width)
+        first = (self._next - self._size) % self.capacity
+        return np.roll(rows, -first, axis=0)[: self._size].copy()
+
+
+class SensorChannel:
+    """Streaming subscription to a device sensor.
+
+    Samples arriving faster than ``rate`` Hz are averaged into a single slot of
+    the ring buffer, and each committed slot is published to ``state``, so
+    bound components update at most ``rate`` times per second.
+    """
+
+    clock = staticmethod(time.monotonic)
+
+    def __init__(
+        self,
+        plugin: "HardwarePlugin",
+        sensor: str,
+        channel_id: str,
+        fields: Sequence[str],
+        rate: float,
+        buffer_size: int,
+        client_id: Optional[str] = None,
+    ) -> None:
+        self.plugin = plugin
+        self.sensor = sensor
+        self.channel_id = channel_id
+        self.fields = tuple(fields)
+        self.interval = 1.0 / rate if rate else 0.0
+        self.client_id = client_id
+        self.state = State(None)
+        self.buffer = RingBuffer(len(self.fields), buffer_size)
+        self._sum = [0.0] * len(self.fields)
+        self._count = 0
+        self._last_commit = float("-inf")
+        self._lock = threading.Lock()
+        self.closed = False
+
+    def _coerce(self, sample: Any) -> List[float]:
+        if isinstance(sample, dict):
+            return [float(sample.get(f) or 0.0) for f in self.fields]
+        return [float(v) for v in list(sample)[: len(self.fields)]]
+
+    def push(self, data: Any) -> None:
+        # devices may batch several readings into one event
+        batch = data if isinstance(data, list) and data and isinstance(data[0], (list, dict)) else [data]
+        for sample in batch:
+            values = self._coerce(sample)
+            with self._lock:
+                for i, v in enumerate(values):
+                    self._sum[i] += v
+                self._count += 1
+                now = self.clock()
+                if now - self._last_commit < self.interval:
+                    continue
+                mean = self._commit(now)
+            self.state.value = dict(zip(self.fields, mean))
+
+    def _commit(self, now: float) -> List[float]:
+        mean = [v / self._count for v in self._sum]
+        self.buffer.append(mean)
+        self._sum = [0.0] * len(self.fields)
+        self._count = 0
+        self._last_commit = now
+        return mean
+
+    def flush(self) -> None:
+        """Publish samples still waiting for the current rate window."""
+        with self._lock:
+            if not self._count:
+                return
+            mean = self._commit(self.clock())
+        self.state.value = dict(zip(self.fields, mean))
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        self.plugin._close_channel(self)
 
 
 class HardwarePlugin:
-    def __init__(self, app: PyNativeApp):
+    def __init__(self, app: PyNativeApp, timeout: Optional[float] = 30.0):
         self.app = app
+        # seconds before an unanswered request fails; None waits forever
+        self.timeout = timeout
+        self._pending: Dict[str, Tuple[HardwareRequest, Optional[threading.Timer]]] = {}
+        self._channels: Dict[str, SensorChannel] = {}
+        self._lock = threading.Lock()
 
-    def _request(self, action: str, payload: Optional[Any] = None) -> State:
-        state = State(None)
-        eid = f"hardware_{action}_{id(state)}"
+    def _send(self, packet: Dict[str, Any], client_id: Optional[str]) -> None:
+        bridge = self.app.bridge
+        if not bridge:
+            print("[Hardware] no bridge available, cannot send request")
+            return
+        message = json.dumps(packet)
+        clients = getattr(bridge, "clients", None)
+        if client_id is not None and clients is not None and client_id in clients():
+            bridge.send(client_id, message)
+        else:
+            bridge.broadcast(message)
+
+    def _request(
+        self,
+        action: str,
+        payload: Optional[Any] = None,
+        timeout: Optional[float] = _DEFAULT,
+        client_id: Optional[str] = None,
+    ) -> HardwareRequest:
+        eid = f"hardware_{action}_{str(uuid.uuid4())[:8]}"
+        # answer on the device whose event triggered this request
+        client_id = client_id or self.app.current_client
+        request = HardwareRequest(eid, client_id)
 
         def _response(data: Any = None) -> None:
-            state.value = data
+            if self._finish(eid):
+                request._resolve(data)
 
+        timeout = self.timeout if timeout is _DEFAULT else timeout
+        timer = None
+        if timeout is not None:
+            timer = threading.Timer(timeout, self._expire, args=(eid,))
+            timer.daemon = True
+        with self._lock:
+            self._pending[eid] = (request, timer)
         self.app.event_registry[eid] = _response
+        if timer is not None:
+            timer.start()
 
-        packet = json.dumps({"type": "hardware", "action": action, "payload": payload, "response_id": eid})
-        if self.app.bridge:
-            self.app.bridge.broadcast(packet)
-        else:
-            print("[Hardware] no bridge available, cannot send request")
+        self._send(
+            {"type": "hardware", "action": action, "payload": payload, "response_id": eid},
+            client_id,
+        )
+        return request
+
+    def _finish(self, eid: str) -> Optional[HardwareRequest]:
+        with self._lock:
+            entry = self._pending.pop(eid, None)
+        self.app.event_registry.pop(eid, None)
+        if entry is None:
+            return None
+        request, timer = entry
+        if timer is not None:
+            timer.cancel()
+        return request
 
-        return state
+    def _expire(self, eid: str) -> None:
+        request = self._finish(eid)
+        if request is not None:
+            request._fail(TimeoutError(f"hardware request {eid} timed out"))
 
-    def request_permission(self, permission: str) -> State:
+    def client_disconnected(self, client_id: str) -> None:
+        """Fail requests and drop channels that belonged to a departed device."""
+        with self._lock:
+            owned = [eid for eid, (req, _) in self._pending.items() if req.client_id == client_id]
+            channels = [c for c in self._channels.values() if c.client_id == client_id]
+        for eid in owned:
+            request = self._finish(eid)
+            if request is not None:
+                request._fail(ConnectionError(f"device {client_id} disconnected"))
+        for channel in channels:
+            channel.close()
+
+    def subscribe(
+        self,
+        sensor: str,
+        rate: float = 10.0,
+        buffer_size: int = 256,
+        fields: Optional[Sequence[str]] = None,
+        client_id: Optional[str] = None,
+    ) -> SensorChannel:
+        """Stream ``sensor`` readings, downsampled to ``rate`` Hz on the server."""
+        fields = fields or SENSOR_FIELDS.get(sensor)
+        if not fields:
+            raise ValueError(f"unknown sensor {sensor!r}; pass fields= explicitly")
+        eid = f"hardware_stream_{sensor}_{str(uuid.uuid4())[:8]}"
+        client_id = client_id or self.app.current_client
+        channel = SensorChannel(self, sensor, eid, fields, rate, buffer_size, client_id)
+        with self._lock:
+            self._channels[eid] = channel
+        self.app.event_registry[eid] = channel.push
+        self._send(
+            {"type": "hardware", "action": "subscribe", "sensor": sensor, "rate": rate, "channel_id": eid},
+            client_id,
+        )
+        return channel
+
+    def _close_channel(self, channel: SensorChannel) -> None:
+        with self._lock:
+            self._channels.pop(channel.channel_id, None)
+        self.app.event_registry.pop(channel.channel_id, None)
+        self._send(
+            {"type": "hardware", "action": "unsubscribe", "channel_id": channel.channel_id},
+            channel.client_id,
+        )
+
+    def request_permission(self, permission: str) -> HardwareRequest:
         return self._request("permission", permission)
 
-    def open_camera(self) -> State:
+    def open_camera(self) -> HardwareRequest:
         return self._request("camera")
 
-    def get_location(self) -> State:
+    def get_location(self) -> HardwareRequest:
         return self._request("location")
 
+    def watch_location(self, rate: float = 1.0, buffer_size: int = 256) -> SensorChannel:
+        return self.subscribe("location", rate=rate, buffer_size=buffer_size)
+
+    def watch_accelerometer(self, rate: float = 20.0, buffer_size: int = 256) -> SensorChannel:
+        return self.subscribe("accelerometer", rate=rate, buffer_size=buffer_size)
+
 def Hardware(app: PyNativeApp) -> HardwarePlugin:
     return HardwarePlugin(app)
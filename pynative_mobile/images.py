@@ -0,0 +1,120 @@
+import importlib.util
+import os
+import threading
+from typing import Any, Dict, Optional, Set, Tuple
+
+Size = Tuple[int, int]
+
+# Pillow format names for the extensions we write
+_FORMATS = {"jpeg": "JPEG", "jpg": "JPEG", "png": "PNG", "webp": "WEBP"}
+
+
+class ImagePipeline:
+    """Produces ``Image`` variants sized to their declared width/height.
+
+    Targets are the declared dimensions times ``pixel_ratio`` (aspect ratio
+    kept, never upscaled), optionally converted to ``format``.  Variants are
+    written to ``cache_dir`` keyed by (content hash, size, format) and
+    rendered on a thread pool.  Pillow is optional: without it, or for files
+    it cannot decode, callers fall back to the original file.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        pixel_ratio: float = 2.0,
+        format: Optional[str] = None,
+        quality: int = 85,
+        workers: Optional[int] = None,
+    ) -> None:
+        if format is not None and format.lower() not in _FORMATS:
+            raise ValueError(f"unsupported image format {format!r}")
+        self.cache_dir = cache_dir
+        self.pixel_ratio = pixel_ratio
+        self.format = format.lower() if format else None
+        self.quality = quality
+        self.workers = workers
+        self._pil: Optional[bool] = None
+        self._executor: Any = None
+        self._pending: Dict[str, Any] = {}
+        # variants that turned out no smaller than the original
+        self._originals: Set[str] = set()
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        if self._pil is None:
+            self._pil = importlib.util.find_spec("PIL") is not None
+        return self._pil
+
+    def target(self, width: Any, height: Any) -> Optional[Size]:
+        """Pixel box for declared dimensions; 0 leaves that side unconstrained."""
+        if not width and not height:
+            return None
+        try:
+            return (int(float(width or 0) * self.pixel_ratio), int(float(height or 0) * self.pixel_ratio))
+        except (TypeError, ValueError):
+            return None
+
+    def _path(self, digest: str, size: Size, fmt: str) -> str:
+        return os.path.join(self.cache_dir, digest[:2], f"{digest}-{size[0]}x{size[1]}.{fmt}")
+
+    def _format(self, source: str) -> str:
+        ext = os.path.splitext(source)[1].lstrip(".").lower()
+        return self.format or (ext if ext in _FORMATS else "png")
+
+    def cached(self, source: str, digest: str, size: Size) -> Optional[str]:
+        path = self._path(digest, size, self._format(source))
+        return path if os.path.isfile(path) else None
+
+    def submit(self, source: str, digest: str, size: Size) -> Any:
+        """Render a variant on the pool; the future yields its path or ``None``."""
+        from concurrent.futures import Future, ThreadPoolExecutor
+
+        dest = self._path(digest, size, self._format(source))
+        with self._lock:
+            future = self._pending.get(dest)
+            if future is not None:
+                return future
+            if not self.available or dest in self._originals or os.path.isfile(dest):
+                future = Future()
+                future.set_result(dest if os.path.isfile(dest) else None)
+                return future
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="pynative-images")
+            future = self._pending[dest] = self._executor.submit(self._render, source, dest, size)
+        future.add_done_callback(lambda _: self._pending.pop(dest, None))
+        return future
+
+    def _render(self, source: str, dest: str, size: Size) -> Optional[str]:
+        from PIL import Image as PILImage
+
+        fmt = _FORMATS[os.path.splitext(dest)[1].lstrip(".")]
+        try:
+            with PILImage.open(source) as img:
+                box = (size[0] or img.width, size[1] or img.height)
+                if img.width <= box[0] and img.height <= box[1] and img.format == fmt:
+                    self._originals.add(dest)  # already small enough: ship the original
+                    return None
+                img.thumbnail(box)
+                out = img.convert("RGB") if fmt == "JPEG" and img.mode not in ("RGB", "L") else img
+                os.makedirs(os.path.dirname(dest), exist_ok=True)
+                tmp = f"{dest}.{threading.get_ident()}.tmp"
+                try:
+                    out.save(tmp, fmt, quality=self.quality)
+                    os.replace(tmp, dest)
+                except BaseException:
+                    # never leave half-written variants in the cache
+                    if os.path.exists(tmp):
+                        os.unlink(tmp)
+                    raise
+        except (OSError, ValueError) as e:
+            print(f"[Images] could not resize {source}: {e}")
+            self._originals.add(dest)
+            return None
+        return dest
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
@@ -0,0 +1,139 @@
+import json
+import threading
+from typing import Any, Dict, List, Optional
+
+from .nodestore import dumps
+from .theme import TOKEN_PREFIX
+
+COMPACT = (",", ":")
+
+
+class StringTable:
+    """Append-only string dictionary shared by every connection of an app.
+
+    Interned nodes replace ``type`` with ``"t": <ref>`` and split ``props``
+    into ``"s"`` (flat ``[key_ref, value_ref, ...]`` for ``theme.*`` token
+    values) and ``"n"`` (flat ``[key_ref, raw_value, ...]`` for everything
+    else).  Only this vocabulary of types, prop keys and tokens is interned:
+    it is bounded by the app's code, whereas user content such as row titles
+    would pile up in a table that never evicts and that every late-joining
+    client receives in full.  Because
+    the table only grows, what a connection knows is always a prefix of it, so
+    an encoded packet can be shared and each client is only sent the entries
+    ``[known:needed]`` it has not seen yet, as a ``"strings": [start, [...]]``
+    header.
+    """
+
+    def __init__(self, max_len: int = 64, capacity: int = 65536) -> None:
+        self.max_len = max_len
+        self.capacity = capacity
+        self.values: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def ref(self, value: str) -> Optional[int]:
+        idx = self._index.get(value)
+        if idx is not None:
+            return idx
+        if len(value) > self.max_len or len(self.values) >= self.capacity:
+            return None
+        with self._lock:
+            idx = self._index.get(value)
+            if idx is None:
+                idx = len(self.values)
+                self.values.append(value)
+                self._index[value] = idx
+        return idx
+
+    def encode_node(self, node: Dict[str, Any]) -> Dict[str, Any]:
+        root = self._encode_one(node)
+        stack = [(node, root)]
+        while stack:
+            src, out = stack.pop()
+            if "children" in src:
+                out["children"] = kids = [self._encode_one(c) for c in src["children"]]
+                stack.extend(zip(src["children"], kids))
+        return root
+
+    def _encode_one(self, node: Dict[str, Any]) -> Dict[str, Any]:
+        out: Dict[str, Any] = {"id": node["id"]}
+        t = self.ref(node["type"])
+        if t is None:
+            out["type"] = node["type"]
+        else:
+            out["t"] = t
+        strings: List[int] = []
+        raw: List[Any] = []
+        for key, value in node.get("props", {}).items():
+            k = self.ref(key)
+            v = self.ref(value) if isinstance(value, str) and value.startswith(TOKEN_PREFIX) else None
+            if k is not None and v is not None:
+                strings.extend((k, v))
+            else:
+                raw.extend((key if k is None else k, value))
+        if strings:
+            out["s"] = strings
+        if raw:
+            out["n"] = raw
+        for extra in ("events", "event_policies"):
+            if node.get(extra):
+                out[extra] = node[extra]
+        return out
+
+    def encode_patch(self, patch: Dict[str, Any]) -> Dict[str, Any]:
+        if patch.get("action") == "add":
+            return dict(patch, component=self.encode_node(patch["component"]))
+        if patch.get("action") == "replace":
+            # the device already holds the old subtree; only its id is needed
+            return {"action": "replace", "id": patch["old"]["id"], "new": self.encode_node(patch["new"])}
+        if "screen" in patch:
+            return dict(patch, screen=self.encode_node(patch["screen"]))
+        if patch.get("action") == "region" and patch["tree"] is not None:
+            return dict(patch, tree=self.encode_node(patch["tree"]))
+        return patch
+
+    def dumps(self, payload: Dict[str, Any]) -> str:
+        """Encode a packet, interning its nodes."""
+        payload = dict(payload)
+        if "tree" in payload:
+            payload["tree"] = self.encode_node(payload["tree"])
+        if "screens" in payload:
+            payload["screens"] = {i: self.encode_node(t) for i, t in payload["screens"].items()}
+        if "regions" in payload:
+            payload["regions"] = {k: t and self.encode_node(t) for k, t in payload["regions"].items()}
+        if "patches" in payload:
+            payload["patches"] = [self.encode_patch(p) for p in payload["patches"]]
+        return dumps(payload, separators=COMPACT)
+
+    def with_header(self, packet: str, known: int, needed: int) -> str:
+        """Prefix ``packet`` with the table entries a client is missing."""
+        if known >= needed:
+            return packet
+        header = json.dumps([known, self.values[known:needed]], separators=COMPACT)
+        return '{"strings":' + header + "," + packet[1:]
+
+
+def decode_node(node: Dict[str, Any], values: List[str]) -> Dict[str, Any]:
+    """Reference decoder: expand an interned node back to the plain format."""
+    props: Dict[str, Any] = {}
+    pairs = node.get("s", [])
+    for i in range(0, len(pairs), 2):
+        props[values[pairs[i]]] = values[pairs[i + 1]]
+    raw = node.get("n", [])
+    for i in range(0, len(raw), 2):
+        key = raw[i]
+        props[key if isinstance(key, str) else values[key]] = raw[i + 1]
+    out = {
+        "id": node["id"],
+        "type": node["type"] if "type" in node else values[node["t"]],
+        "props": props,
+        "events": node.get("events", {}),
+    }
+    if "event_policies" in node:
+        out["event_policies"] = node["event_policies"]
+    if "children" in node:
+        out["children"] = [decode_node(c, values) for c in node["children"]]
+    return out
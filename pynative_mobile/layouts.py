@@ -1,15 +1,57 @@
-from typing import Any, List, Optional
-from .base import Container
+import operator
+from typing import Any, Callable, Dict, List, Optional, Union
+from .base import Component, Container
+from .state import State
 
 
 class Column(Container):
-    def __init__(self, children: Optional[List[Any]] = None, spacing: int = 10) -> None:
-        super().__init__(children=children, spacing=spacing)
+    def __init__(self, children: Optional[List[Any]] = None, spacing: int = 10, **kwargs: Any) -> None:
+        super().__init__(children=children, spacing=spacing, **kwargs)
 
 class Row(Container):
-    def __init__(self, children: Optional[List[Any]] = None, spacing: int = 10) -> None:
-        super().__init__(children=children, spacing=spacing)
+    def __init__(self, children: Optional[List[Any]] = None, spacing: int = 10, **kwargs: Any) -> None:
+        super().__init__(children=children, spacing=spacing, **kwargs)
 
 class Screen(Container):
     def __init__(self, title: str = "PyNative App", children: Optional[List[Any]] = None) -> None:
-        super().__init__(children=children, title=title)
\ No newline at end of file
+        super().__init__(children=children, title=title)
+
+class ListView(Container):
+    """Renders a list-valued ``State`` as one keyed child per row.
+
+    Row components are reused by key across updates, so when rows are
+    appended (e.g. by ``fetch_stream`` or a ``Paginator``) only the new rows
+    are built and the keyed diff sends ``add`` patches for them alone.
+    """
+
+    def __init__(
+        self,
+        items: State,
+        render: Callable[[Any], Component],
+        key: Union[str, Callable[[Any], Any]] = "id",
+        spacing: int = 10,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(children=[], spacing=spacing, **kwargs)
+        self._render = render
+        self._key: Callable[[Any], Any] = key if callable(key) else operator.itemgetter(key)
+        self._rows: Dict[str, Component] = {}
+        # bound before the app binds its own listener, so children are
+        # rebuilt by the time the change is reconciled
+        items.bind(self._sync)
+        self._states.append(items)
+        self._sync(items.value)
+
+    def _sync(self, items: Any) -> None:
+        if not isinstance(items, list):
+            return  # e.g. an exception from a failed fetch
+        rows: Dict[str, Component] = {}
+        for item in items:
+            key = str(self._key(item))
+            row = self._rows.get(key)
+            if row is None:
+                row = self._render(item)
+                row.props["key"] = key
+            rows[key] = row
+        self._rows = rows
+        self.children = list(rows.values())
@@ -0,0 +1,367 @@
+"""Replay recorded event traffic against a running app from simulated devices.
+
+Everything here talks to ``127.0.0.1``/``localhost`` only, using a minimal
+RFC 6455 client on top of ``asyncio`` streams so no extra dependency is needed.
+"""
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from .diff import apply_delta
+from .interning import decode_node
+from .recorder import recorded_events, resolve_locator
+
+LOCAL_HOSTS = ("127.0.0.1", "localhost", "::1")
+_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+def _check_local(host: str) -> None:
+    if host not in LOCAL_HOSTS:
+        raise ValueError(f"loadtest only targets localhost, got {host!r}")
+
+
+class WebSocketClient:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, host: str, port: int, path: str = "/ws") -> "WebSocketClient":
+        _check_local(host)
+        reader, writer = await asyncio.open_connection(host, port)
+        key = base64.b64encode(os.urandom(16)).decode()
+        writer.write(
+            (
+                f"GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\nUpgrade: websocket\r\n"
+                f"Connection: Upgrade\r\nSec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n"
+            ).encode()
+        )
+        head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1")
+        accept = base64.b64encode(hashlib.sha1((key + _GUID).encode()).digest()).decode()
+        if " 101 " not in head.split("\r\n", 1)[0] or accept not in head:
+            writer.close()
+            raise ConnectionError(f"websocket handshake failed: {head.splitlines()[0]}")
+        return cls(reader, writer)
+
+    def _frame(self, opcode: int, payload: bytes) -> bytes:
+        n = len(payload)
+        if n < 126:
+            header = bytes([0x80 | opcode, 0x80 | n])
+        elif n < 65536:
+            header = bytes([0x80 | opcode, 0xFE]) + n.to_bytes(2, "big")
+        else:
+            header = bytes([0x80 | opcode, 0xFF]) + n.to_bytes(8, "big")
+        mask = os.urandom(4)
+        # clients must mask every frame; xor the whole payload as one integer
+        pad = (mask * (n // 4 + 1))[:n]
+        masked = (int.from_bytes(payload, "big") ^ int.from_bytes(pad, "big")).to_bytes(n, "big")
+        return header + mask + masked
+
+    async def send(self, text: str) -> None:
+        self.writer.write(self._frame(0x1, text.encode()))
+        await self.writer.drain()
+
+    async def recv(self) -> str:
+        parts: List[bytes] = []
+        while True:
+            b1, b2 = await self.reader.readexactly(2)
+            n = b2 & 0x7F
+            if n == 126:
+                n = int.from_bytes(await self.reader.readexactly(2), "big")
+            elif n == 127:
+                n = int.from_bytes(await self.reader.readexactly(8), "big")
+            payload = await self.reader.readexactly(n)
+            opcode = b1 & 0x0F
+            if opcode == 0x8:
+                raise ConnectionError("websocket closed by server")
+            if opcode == 0x9:
+                self.writer.write(self._frame(0xA, payload))
+                continue
+            if opcode in (0x0, 0x1, 0x2):
+                parts.append(payload)
+                if b1 & 0x80:
+                    return b"".join(parts).decode()
+
+    async def close(self) -> None:
+        try:
+            self.writer.write(self._frame(0x8, b""))
+            await self.writer.drain()
+        except (ConnectionError, RuntimeError):
+            pass
+        self.writer.close()
+
+
+async def http_get_json(host: str, port: int, path: str) -> Any:
+    _check_local(host)
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\nConnection: close\r\n\r\n".encode())
+    data = await reader.read()
+    writer.close()
+    head, _, body = data.partition(b"\r\n\r\n")
+    if b" 200 " not in head.split(b"\r\n", 1)[0]:
+        return None
+    return json.loads(body)
+
+
+class SimulatedDevice:
+    """A headless client that mirrors the visible tree and acks every packet."""
+
+    def __init__(self, host: str, port: int) -> None:
+        self.host = host
+        self.port = port
+        self.ws: Optional[WebSocketClient] = None
+        self.tree: Optional[Dict[str, Any]] = None
+        self.screens: Dict[str, Dict[str, Any]] = {}
+        self.strings: List[str] = []
+        self.version = 0
+        self.packets = 0
+        self.bytes = 0
+        self._index: Optional[Dict[str, Any]] = None
+        self._update = asyncio.Event()
+        self._reader: Optional[asyncio.Task] = None
+        # events in flight by sequence number, resolved by "handled" replies
+        self._seq = 0
+        self._handled: Dict[int, asyncio.Future] = {}
+
+    async def connect(self, timeout: float = 10.0) -> None:
+        self.ws = await WebSocketClient.connect(self.host, self.port)
+        self._reader = asyncio.ensure_future(self._read())
+        await asyncio.wait_for(self._update.wait(), timeout)
+
+    def _decode(self, node: Dict[str, Any]) -> Dict[str, Any]:
+        return node if "props" in node else decode_node(node, self.strings)
+
+    def _find(self, node_id: str) -> Any:
+        # id index rebuilt only after structural changes, so the generator
+        # does not compete with the server for CPU on prop updates
+        if self._index is None:
+            index: Dict[str, Any] = {}
+            stack: List[Tuple[Dict[str, Any], Any]] = [(self.tree, None)] if self.tree else []
+            while stack:
+                node, parent = stack.pop()
+                index[node["id"]] = (node, parent)
+                stack.extend((c, node) for c in node.get("children", []))
+            self._index = index
+        return self._index.get(node_id, (None, None))
+
+    def _apply(self, patch: Dict[str, Any]) -> None:
+        action = patch.get("action")
+        if action not in ("update", "delta", "remove_prop", "theme"):
+            self._index = None
+        if action in ("push", "switch", "pop"):
+            if self.tree is not None:
+                self.screens[self.tree["id"]] = self.tree
+            if "screen" in patch:
+                self.tree = self._decode(patch["screen"])
+            else:
+                shown = patch["to"] if patch.get("to") else patch.get("id", "")
+                self.tree = self.screens.get(shown, self.tree)
+        elif action == "drop":
+            for i in patch["ids"]:
+                self.screens.pop(i, None)
+        elif action == "add":
+            parent, _ = self._find(patch["parent"])
+            if parent is not None:
+                parent.setdefault("children", []).append(self._decode(patch["component"]))
+        elif action in ("remove", "replace"):
+            target = patch["old"]["id"] if "old" in patch else patch["id"]
+            node, parent = self._find(target)
+            if node is None:
+                return
+            if parent is None:
+                self.tree = self._decode(patch["new"]) if action == "replace" else None
+                return
+            children = parent["children"]
+            at = next(i for i, c in enumerate(children) if c is node)
+            if action == "remove":
+                del children[at]
+            else:
+                children[at] = self._decode(patch["new"])
+        elif action in ("update", "delta", "remove_prop"):
+            node, _ = self._find(patch["id"])
+            if node is not None:
+                if action == "update":
+                    node.setdefault("props", {})[patch["prop"]] = patch["value"]
+                elif action == "delta":
+                    props = node.setdefault("props", {})
+                    props[patch["prop"]] = apply_delta(props.get(patch["prop"]), patch["ops"])
+                else:
+                    node.get("props", {}).pop(patch["prop"], None)
+
+    async def _read(self) -> None:
+        assert self.ws is not None
+        try:
+            while True:
+                text = await self.ws.recv()
+                packet = json.loads(text)
+                if not isinstance(packet, dict):
+                    continue
+                if packet.get("type") == "handled":
+                    waiter = self._handled.pop(packet.get("seq", 0), None)
+                    if waiter is not None and not waiter.done():
+                        waiter.set_result(packet.get("version"))
+                    continue
+                self.packets += 1
+                self.bytes += len(text)
+                if "strings" in packet:
+                    start, values = packet["strings"]
+                    del self.strings[start:]
+                    self.strings.extend(values)
+                if "tree" in packet:
+                    self._index = None
+                    self.tree = self._decode(packet["tree"])
+                    self.screens = {i: self._decode(t) for i, t in packet.get("screens", {}).items()}
+                for patch in packet.get("patches", []):
+                    self._apply(patch)
+                if "version" in packet:
+                    self.version = packet["version"]
+                    await self.ws.send(json.dumps({"type": "ack", "version": self.version}))
+                    self._update.set()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+
+    async def _reach(self, version: int) -> None:
+        while self.version < version:
+            self._update.clear()
+            await self._update.wait()
+
+    async def _outcome(self, waiter: "asyncio.Future[Optional[int]]") -> bool:
+        version = await waiter
+        if version is None:
+            return False
+        await self._reach(version)
+        return True
+
+    async def fire(self, event: Dict[str, Any], timeout: float) -> Optional[float]:
+        """Send a recorded event; returns seconds until the packet showing its
+        effect was applied, or ``None`` if the event could not be mapped or
+        produced no update.
+
+        The event carries a ``seq`` that the app echoes in a ``handled``
+        message naming the first version that includes the event, so updates
+        caused by other devices do not end the wait.
+        """
+        if self.tree is None or self.ws is None:
+            return None
+        event_id = resolve_locator(self.tree, event["locator"])
+        if event_id is None:
+            return None
+        self._seq += 1
+        waiter: "asyncio.Future[Optional[int]]" = asyncio.get_running_loop().create_future()
+        self._handled[self._seq] = waiter
+        message = dict(event["message"], event=event_id, seq=self._seq)
+        started = time.perf_counter()
+        await self.ws.send(json.dumps(message))
+        try:
+            updated = await asyncio.wait_for(self._outcome(waiter), timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            self._handled.pop(message["seq"], None)
+        return time.perf_counter() - started if updated else None
+
+    async def close(self) -> None:
+        if self.ws is not None:
+            await self.ws.close()
+        if self._reader is not None:
+            self._reader.cancel()
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+async def run_loadtest(
+    recording: str,
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    devices: int = 10,
+    rate: float = 5.0,
+    duration: Optional[float] = None,
+    timeout: float = 2.0,
+) -> Dict[str, Any]:
+    """Replay ``recording`` from ``devices`` clients, each sending ``rate``
+    events per second (``0`` keeps the recorded timing).  Without ``duration``
+    every device replays the recording once."""
+    _check_local(host)
+    events = recorded_events(recording)
+    if not events:
+        raise ValueError(f"{recording} contains no replayable events")
+    memory_before = await http_get_json(host, port, "/stats")
+    clients = [SimulatedDevice(host, port) for _ in range(devices)]
+    await asyncio.gather(*(c.connect() for c in clients))
+    latencies: List[float] = []
+    counts = {"sent": 0, "unanswered": 0}
+
+    async def replay(device: SimulatedDevice) -> None:
+        deadline = time.monotonic() + duration if duration else None
+        i = 0
+        while True:
+            if deadline is None and i >= len(events):
+                return
+            if deadline is not None and time.monotonic() >= deadline:
+                return
+            event = events[i % len(events)]
+            tick = time.monotonic()
+            took = await device.fire(event, timeout)
+            counts["sent"] += 1
+            if took is None:
+                counts["unanswered"] += 1
+            else:
+                latencies.append(took)
+            i += 1
+            if rate:
+                wait = 1.0 / rate
+            else:
+                nxt = events[i % len(events)]
+                wait = max(0.0, (nxt["ms"] - event["ms"]) / 1000) if i % len(events) else 0.0
+            await asyncio.sleep(max(0.0, wait - (time.monotonic() - tick)))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(replay(c) for c in clients))
+    elapsed = time.perf_counter() - started
+    memory_after = await http_get_json(host, port, "/stats")
+    packets = sum(c.packets for c in clients)
+    received = sum(c.bytes for c in clients)
+    await asyncio.gather(*(c.close() for c in clients))
+    return {
+        "devices": devices,
+        "seconds": elapsed,
+        "events": counts["sent"],
+        "unanswered": counts["unanswered"],
+        "events_per_second": counts["sent"] / elapsed if elapsed else 0.0,
+        "packets": packets,
+        "bytes_received": received,
+        "latency_ms": {
+            name: percentile(latencies, pct) * 1000
+            for name, pct in (("p50", 50), ("p90", 90), ("p99", 99), ("max", 100))
+        },
+        "server_memory": {"before": memory_before, "after": memory_after},
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lat = report["latency_ms"]
+    lines = [
+        f"devices     {report['devices']}",
+        f"events      {report['events']} ({report['unanswered']} without update)"
+        f" in {report['seconds']:.2f}s, {report['events_per_second']:.1f}/s",
+        f"packets     {report['packets']} ({report['bytes_received'] / 1024:.1f} KiB received)",
+        f"latency     p50 {lat['p50']:.2f}ms  p90 {lat['p90']:.2f}ms  p99 {lat['p99']:.2f}ms  max {lat['max']:.2f}ms",
+    ]
+    mem = report["server_memory"]
+    if mem["before"] and mem["after"] and "rss_bytes" in mem["after"]:
+        lines.append(
+            f"server rss  {mem['before'].get('rss_bytes', 0) / 2**20:.1f} -> "
+            f"{mem['after']['rss_bytes'] / 2**20:.1f} MiB"
+            f" (peak {mem['after'].get('peak_rss_bytes', 0) / 2**20:.1f} MiB)"
+        )
+    return "\n".join(lines)
@@ -1,11 +1,12 @@
 from .state import State
-import httpx
-import asyncio
-from typing import Any
+import json
+from typing import Any, Callable, Dict, List, Optional
 
 
 async def _fetch_json(url: str, state: State) -> None:
     try:
+        import httpx
+
         async with httpx.AsyncClient() as client:
             resp = await client.get(url)
             resp.raise_for_status()
@@ -14,19 +15,241 @@ async def _fetch_json(url: str, state: State) -> None:
     except Exception as exc:
         state.value = exc
 
-def fetch(url: str) -> State:
-    state = State(None)
-    async def runner():
-        await _fetch_json(url, state)
+
+def _run(coro_factory: Callable[[], Any]) -> None:
+    """Run a coroutine on the current loop, or on a private loop in a thread."""
+    import asyncio
+
     try:
         loop = asyncio.get_running_loop()
-        loop.create_task(runner())
+        loop.create_task(coro_factory())
     except RuntimeError:
         import threading
         def _thread_target():
             new_loop = asyncio.new_event_loop()
             asyncio.set_event_loop(new_loop)
-            new_loop.run_until_complete(runner())
+            new_loop.run_until_complete(coro_factory())
         thread = threading.Thread(target=_thread_target, daemon=True)
         thread.start()
-    return state
\ No newline at end of file
+
+
+def fetch(url: str) -> State:
+    state = State(None)
+
+    async def runner():
+        await _fetch_json(url, state)
+    _run(runner)
+    return state
+
+
+class JSONStreamParser:
+    """Incremental parser for NDJSON or a top-level JSON array.
+
+    ``feed(text)`` returns the items completed by ``text``; only the
+    unfinished tail of the document is buffered.
+    """
+
+    def __init__(self, format: Optional[str] = None) -> None:
+        if format not in (None, "ndjson", "array"):
+            raise ValueError(f"unknown stream format {format!r}")
+        self.format = format
+        self._buf = ""
+        self._decoder = json.JSONDecoder()
+        self._started = False
+        self.done = False
+
+    def feed(self, text: str, final: bool = False) -> List[Any]:
+        self._buf += text
+        if self.format is None:
+            head = self._buf.lstrip()
+            if not head:
+                return []
+            self.format = "array" if head[0] == "[" else "ndjson"
+        if self.format == "ndjson":
+            lines = self._buf.split("\n")
+            self._buf = "" if final else lines.pop()
+            return [json.loads(line) for line in lines if line.strip()]
+        return self._feed_array(final)
+
+    def _feed_array(self, final: bool) -> List[Any]:
+        buf, pos, items = self._buf, 0, []
+        while not self.done:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(buf):
+                break
+            if not self._started:
+                if buf[pos] != "[":
+                    raise ValueError("expected a JSON array")
+                self._started = True
+                pos += 1
+                continue
+            if buf[pos] == "]":
+                self.done = True
+                pos += 1
+                break
+            try:
+                item, end = self._decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                break  # item not complete yet
+            if end == len(buf) and not final:
+                break  # a number at the end of the buffer may still grow
+            items.append(item)
+            pos = end
+        self._buf = buf[pos:]
+        return items
+
+
+async def stream_json(
+    url: str,
+    state: State,
+    chunk_size: int = 50,
+    format: Optional[str] = None,
+    client: Any = None,
+) -> None:
+    """Append the items of a streamed list response to ``state`` in chunks.
+
+    ``state.value`` is replaced by a new list for every chunk, so bound
+    components see each chunk as a change without waiting for the whole body.
+    """
+    import httpx
+
+    parser = JSONStreamParser(format)
+    pending: List[Any] = []
+
+    def publish() -> None:
+        state.value = list(state.value or []) + pending
+        pending.clear()
+
+    try:
+        owned = client is None
+        client = client or httpx.AsyncClient()
+        try:
+            async with client.stream("GET", url) as resp:
+                resp.raise_for_status()
+                async for text in resp.aiter_text():
+                    pending.extend(parser.feed(text))
+                    if len(pending) >= chunk_size:
+                        publish()
+                pending.extend(parser.feed("", final=True))
+        finally:
+            if owned:
+                await client.aclose()
+        if pending or state.value is None:
+            publish()
+    except Exception as exc:
+        state.value = exc
+
+
+def fetch_stream(url: str, chunk_size: int = 50, format: Optional[str] = None, client: Any = None) -> State:
+    """Like ``fetch`` for large list endpoints: rows arrive in chunks of ``chunk_size``."""
+    state = State([])
+    _run(lambda: stream_json(url, state, chunk_size, format, client))
+    return state
+
+
+class Paginator:
+    """Loads a paged list endpoint into ``state`` and prefetches the next page.
+
+    Pages are requested as ``?<page_param>=n`` starting at ``start``, or, with
+    ``cursor_field``, by passing the cursor from the previous response as
+    ``?<cursor_param>=...`` (the first request carries no cursor).  Responses may be a bare list or an object with
+    the rows under ``items_field``.  ``has_more`` turns false on an empty page
+    or a missing cursor.  A failed request leaves ``state`` as it was and sets
+    ``error`` to its message (``None`` again after the next success); the
+    next ``load_next()`` retries the same page.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        page_param: str = "page",
+        start: int = 1,
+        cursor_field: Optional[str] = None,
+        cursor_param: str = "cursor",
+        items_field: str = "items",
+        prefetch: bool = True,
+        client: Any = None,
+    ) -> None:
+        self.url = url
+        self.page_param = page_param
+        self.cursor_field = cursor_field
+        self.cursor_param = cursor_param
+        self.items_field = items_field
+        self.prefetch = prefetch
+        self.client = client
+        self.state = State([])
+        self.error = State(None)
+        self.has_more = True
+        self._next: Any = None if cursor_field else start
+        self._prefetched: Any = None
+        self._lock: Any = None
+        self._loop: Any = None
+
+    def _params(self, position: Any) -> Dict[str, Any]:
+        if self.cursor_field:
+            return {} if position is None else {self.cursor_param: position}
+        return {self.page_param: position}
+
+    async def _get(self, position: Any) -> Any:
+        import httpx
+
+        client = self.client or httpx.AsyncClient()
+        try:
+            resp = await client.get(self.url, params=self._params(position))
+            resp.raise_for_status()
+            return resp.json()
+        finally:
+            if self.client is None:
+                await client.aclose()
+
+    def _advance(self, body: Any) -> List[Any]:
+        items = body if isinstance(body, list) else body.get(self.items_field, [])
+        if self.cursor_field:
+            self._next = None if isinstance(body, list) else body.get(self.cursor_field)
+            self.has_more = bool(items) and self._next is not None
+        else:
+            self._next += 1
+            self.has_more = bool(items)
+        return items
+
+    async def load_next(self) -> List[Any]:
+        """Append the next page to ``state`` and return its rows."""
+        import asyncio
+
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:  # overlapping calls must not fetch a page twice
+            return await self._load_next()
+
+    async def _load_next(self) -> List[Any]:
+        import asyncio
+
+        if not self.has_more:
+            return []
+        task, self._prefetched = self._prefetched, None
+        try:
+            body = await task if task is not None else await self._get(self._next)
+        except Exception as exc:
+            self.error.value = str(exc) or type(exc).__name__
+            return []
+        self.error.value = None
+        items = self._advance(body)
+        if items:
+            self.state.value = list(self.state.value) + items
+        if self.prefetch and self.has_more:
+            self._prefetched = asyncio.ensure_future(self._get(self._next))
+        return items
+
+    def next(self) -> Any:
+        """Schedule ``load_next()`` from synchronous code such as an on_press
+        handler.  Pages load on one background loop so prefetches carry over
+        between calls; returns a ``concurrent.futures.Future``."""
+        import asyncio
+
+        if self._loop is None:
+            import threading
+
+            self._loop = asyncio.new_event_loop()
+            threading.Thread(target=self._loop.run_forever, name="pynative-paginator", daemon=True).start()
+        return asyncio.run_coroutine_threadsafe(self.load_next(), self._loop)
@@ -0,0 +1,308 @@
+import json
+import uuid
+import weakref
+from functools import partial
+from array import array
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set
+
+from .base import Component, Container
+from .state import State
+
+NO_NODE = -1
+# parent value of removed nodes; their slots are not reused
+REMOVED = -2
+
+
+def dumps(payload: Any, **kwargs: Any) -> str:
+    """``json.dumps`` that also encodes trees nested past the recursion limit.
+
+    Packets go through ``json.dumps(payload, **kwargs)`` as usual; only if
+    that hits the recursion limit is the payload encoded again with an
+    explicit stack, as compact JSON (``kwargs`` are then ignored).
+    """
+    try:
+        return json.dumps(payload, **kwargs)
+    except RecursionError:
+        return _dumps_deep(payload)
+
+
+def _dumps_deep(payload: Any) -> str:
+    out: List[str] = []
+    # (literal, None) entries are written as-is, (None, value) are encoded
+    stack: List[Any] = [(None, payload)]
+    while stack:
+        literal, value = stack.pop()
+        if literal is not None:
+            out.append(literal)
+        elif isinstance(value, dict):
+            out.append("{")
+            stack.append(("}", None))
+            items = list(value.items())
+            for i in range(len(items) - 1, -1, -1):
+                key, item = items[i]
+                if not isinstance(key, str):
+                    key = json.dumps(key)
+                stack.append((None, item))
+                stack.append((("," if i else "") + json.dumps(key) + ":", None))
+        elif isinstance(value, (list, tuple)):
+            out.append("[")
+            stack.append(("]", None))
+            for i in range(len(value) - 1, -1, -1):
+                stack.append((None, value[i]))
+                if i:
+                    stack.append((",", None))
+        else:
+            out.append(json.dumps(value))
+    return "".join(out)
+
+
+class NodeStore:
+    """Flat, array-backed component tree for very large UIs.
+
+    Each node is a slot in parallel ``array`` columns: parent, first/last
+    child, next sibling, interned type id, interned ``key``, a container flag
+    and a reference into a side list of props dicts (``-1`` for nodes without
+    props).  There is no per-node Python object, so 100k-node trees cost a
+    fraction of the equivalent ``Component`` objects and create far less work
+    for the GC.  Serialization walks the sibling links with an explicit stack
+    and never recurses.  ``view(index)`` returns a ``NodeView`` that behaves like a
+    ``Container`` so the store can be used as an app's root.
+    """
+
+    def __init__(self) -> None:
+        self.parent = array("i")
+        self.first_child = array("i")
+        self.last_child = array("i")
+        self.next_sibling = array("i")
+        self.type_id = array("I")
+        self.key = array("i")
+        self.props_ref = array("i")
+        # 1 for nodes serialized with a "children" list, like Containers
+        self.container = array("b")
+        self.ids: List[str] = []
+        self.types: List[str] = []
+        self.keys: List[str] = []
+        self._type_index: Dict[str, int] = {}
+        self._key_index: Dict[str, int] = {}
+        self._props: List[Dict[str, Any]] = []
+        self._events: Dict[int, Dict[str, str]] = {}
+        self._by_id: Dict[str, int] = {}
+        self._views: "weakref.WeakValueDictionary[int, NodeView]" = weakref.WeakValueDictionary()
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def _intern(self, value: str, values: List[str], index: Dict[str, int]) -> int:
+        idx = index.get(value)
+        if idx is None:
+            idx = index[value] = len(values)
+            values.append(value)
+        return idx
+
+    def add(
+        self,
+        type: str,
+        props: Optional[Dict[str, Any]] = None,
+        parent: int = NO_NODE,
+        events: Optional[Dict[str, Callable[..., Any]]] = None,
+        id: Optional[str] = None,
+        container: bool = False,
+    ) -> int:
+        """Append a node (as the last child of ``parent``) and return its index.
+
+        ``events`` maps handler names to callables, registered like the
+        keyword handlers of ``Component``.
+        """
+        index = len(self.ids)
+        node_id = id or str(uuid.uuid4())[:8]
+        self.ids.append(node_id)
+        self._by_id[node_id] = index
+        self.parent.append(parent)
+        self.first_child.append(NO_NODE)
+        self.last_child.append(NO_NODE)
+        self.next_sibling.append(NO_NODE)
+        self.container.append(1 if container else 0)
+        self.type_id.append(self._intern(type, self.types, self._type_index))
+        key = props.get("key") if props else None
+        self.key.append(NO_NODE if key is None else self._intern(str(key), self.keys, self._key_index))
+        if props:
+            self.props_ref.append(len(self._props))
+            self._props.append(dict(props))
+        else:
+            self.props_ref.append(NO_NODE)
+        if events:
+            ids = self._events[index] = {}
+            for name, callback in events.items():
+                event_id = f"event_{str(uuid.uuid4())[:8]}"
+                Component._event_registry[event_id] = callback
+                ids[name] = event_id
+        if parent != NO_NODE:
+            self.container[parent] = 1
+            last = self.last_child[parent]
+            if last == NO_NODE:
+                self.first_child[parent] = index
+            else:
+                self.next_sibling[last] = index
+            self.last_child[parent] = index
+        return index
+
+    @classmethod
+    def from_component(cls, component: Component) -> "NodeStore":
+        """Copy a ``Component`` tree into a new store, keeping ids and event ids."""
+        store = cls()
+        stack = [(component, NO_NODE)]
+        while stack:
+            comp, parent = stack.pop()
+            index = store.add(comp.type, comp.props, parent, id=comp.id, container=isinstance(comp, Container))
+            if comp.events:
+                store._events[index] = dict(comp.events)
+            children = getattr(comp, "children", None) or []
+            # reversed so siblings are appended in their original order
+            stack.extend((child, index) for child in reversed(children))
+        return store
+
+    def index_of(self, node_id: str) -> int:
+        return self._by_id[node_id]
+
+    def children(self, index: int) -> Iterator[int]:
+        child = self.first_child[index]
+        while child != NO_NODE:
+            yield child
+            child = self.next_sibling[child]
+
+    def props(self, index: int) -> Dict[str, Any]:
+        """The node's props dict, created on first use so it can be mutated."""
+        ref = self.props_ref[index]
+        if ref == NO_NODE:
+            ref = self.props_ref[index] = len(self._props)
+            self._props.append({})
+        return self._props[ref]
+
+    def set_prop(self, index: int, key: str, value: Any) -> None:
+        self.props(index)[key] = value
+        if key == "key":
+            self.key[index] = self._intern(str(value), self.keys, self._key_index)
+
+    def remove(self, index: int) -> None:
+        """Unlink ``index`` and its subtree; the slots are left unused."""
+        parent = self.parent[index]
+        if parent >= 0:
+            prev = NO_NODE
+            for child in self.children(parent):
+                if child == index:
+                    break
+                prev = child
+            nxt = self.next_sibling[index]
+            if prev == NO_NODE:
+                self.first_child[parent] = nxt
+            else:
+                self.next_sibling[prev] = nxt
+            if self.last_child[parent] == index:
+                self.last_child[parent] = prev
+        stack = [index]
+        while stack:
+            i = stack.pop()
+            stack.extend(self.children(i))
+            self.parent[i] = REMOVED
+            self._by_id.pop(self.ids[i], None)
+            for event_id in self._events.pop(i, {}).values():
+                Component._event_registry.pop(event_id, None)
+
+    def _node_dict(self, index: int) -> Dict[str, Any]:
+        ref = self.props_ref[index]
+        return {
+            "id": self.ids[index],
+            "type": self.types[self.type_id[index]],
+            "props": dict(self._props[ref]) if ref != NO_NODE else {},
+            "events": dict(self._events.get(index, {})),
+        }
+
+    def to_dict(self, index: int = 0) -> Dict[str, Any]:
+        """Serialize the subtree at ``index`` in the ``Component.to_dict`` format."""
+        root = self._node_dict(index)
+        stack = [(index, root)]
+        while stack:
+            i, out = stack.pop()
+            if not self.container[i]:
+                continue
+            kids = out["children"] = []
+            for child in self.children(i):
+                node = self._node_dict(child)
+                kids.append(node)
+                stack.append((child, node))
+        return root
+
+    def view(self, index: int = 0) -> "NodeView":
+        view = self._views.get(index)
+        if view is None:
+            view = self._views[index] = NodeView(self, index)
+        return view
+
+    def nbytes(self) -> int:
+        """Memory held by the array columns (props dicts and strings excluded)."""
+        columns = (self.parent, self.first_child, self.last_child, self.next_sibling,
+                   self.type_id, self.key, self.props_ref, self.container)
+        return sum(c.itemsize * len(c) for c in columns)
+
+
+class NodeView(Container):
+    """``Component``-compatible handle on one node of a ``NodeStore``.
+
+    Props, ids and events live in the store; the view only carries what
+    cannot be stored in columns (bound states and listeners).  Views are
+    cached weakly, so a view that is bound to a ``State`` stays the same
+    object for as long as the binding exists.
+    """
+
+    def __init__(self, store: NodeStore, index: int) -> None:
+        # Component.__init__ is skipped on purpose: nothing is copied here
+        self.store = store
+        self.index = index
+        self.event_policies: Dict[str, Dict[str, float]] = {}
+        self._states: List[State] = []
+        self._bound_props: Set[str] = set()
+        self._prop_listeners: List[Callable[[str, Any], None]] = []
+        self.on_init: Any = None
+        self.on_destroy: Any = None
+
+    @property
+    def id(self) -> str:
+        return self.store.ids[self.index]
+
+    @id.setter
+    def id(self, value: str) -> None:
+        store = self.store
+        store._by_id.pop(store.ids[self.index], None)
+        store.ids[self.index] = value
+        store._by_id[value] = self.index
+
+    @property
+    def type(self) -> str:  # type: ignore[override]
+        return self.store.types[self.store.type_id[self.index]]
+
+    @property
+    def props(self) -> Dict[str, Any]:  # type: ignore[override]
+        return self.store.props(self.index)
+
+    @property
+    def events(self) -> Dict[str, str]:  # type: ignore[override]
+        return self.store._events.setdefault(self.index, {})
+
+    @property
+    def children(self) -> List[Component]:  # type: ignore[override]
+        return [self.store.view(i) for i in self.store.children(self.index)]
+
+    def _update_prop(self, key: str, value: Any) -> None:
+        if key == "key":
+            self.store.set_prop(self.index, key, value)
+        super()._update_prop(key, value)
+
+    def bind_state(self, key: str, state: State) -> None:
+        """Bind ``state`` to prop ``key``, like passing a State to a component."""
+        self.props[key] = state.value
+        self._states.append(state)
+        self._bound_props.add(key)
+        state.bind(partial(self._update_prop, key))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self.store.to_dict(self.index)
@@ -0,0 +1,143 @@
+import threading
+import weakref
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .diff import diff_views
+from .nodestore import dumps
+
+MODES = ("thread", "process")
+
+
+def diff_and_encode(old: Dict[str, Any], new: Dict[str, Any], extra: Optional[Dict[str, Any]] = None) -> Optional[str]:
+    """Diff two navigation views and encode the patch packet (``None`` if unchanged)."""
+    patches = diff_views(old, new)
+    if not patches:
+        return None
+    return dumps({"patches": patches, **(extra or {})}, indent=4)
+
+
+def _bound(component: Any) -> Dict[str, Any]:
+    props = component.props
+    return {k: props[k] for k in component._bound_props if k in props}
+
+
+class ReconcilePipeline:
+    """Moves reconciliation off the thread that changed the state.
+
+    ``submit()`` only bumps a request counter, so event handlers return as soon
+    as their own code has run.  A single worker thread drains the requests,
+    coalescing bursts into one pass, and publishes packets in order.  In
+    ``"process"`` mode the diff and JSON encoding of each pass additionally run
+    in a child process, which pays off only for very large trees.
+
+    ``submit(component)`` also copies the State-bound props of the component
+    whose bound prop changed, on the handler's thread; ``track()`` takes the
+    first copies when a screen is shown.  Each pass takes all copies at once
+    and serializes them instead of the live values, so a handler that keeps
+    changing components while the worker runs cannot leak a half-applied
+    update into the frame; its next change submits a new request.  Only the
+    changed component is copied per change, so handler latency does not grow
+    with tree size.  ``close()`` (also called by ``PyNativeApp.close()``)
+    drains pending requests and stops the worker and the child process.
+    """
+
+    def __init__(self, app: Any, mode: str = "thread") -> None:
+        if mode not in MODES:
+            raise ValueError(f"pipeline must be one of {MODES}, got {mode!r}")
+        self.app = app
+        self.mode = mode
+        self._cond = threading.Condition()
+        self._requested = 0
+        self._done = 0
+        self._closed = False
+        # bound props of components as of their last submit()
+        self._props: "weakref.WeakKeyDictionary[Any, Dict[str, Any]]" = weakref.WeakKeyDictionary()
+        # (request number, callback) run once that request has been published
+        self._waiting: List[Tuple[int, Callable[[], None]]] = []
+        self._executor: Any = None
+        if mode == "process":
+            from concurrent.futures import ProcessPoolExecutor
+
+            self._executor = ProcessPoolExecutor(max_workers=1)
+        self._thread = threading.Thread(target=self._run, name="pynative-reconcile", daemon=True)
+        self._thread.start()
+
+    def track(self, root: Any) -> None:
+        """Copy the bound props of every component under ``root``."""
+        copies = []
+        stack = [root]
+        while stack:
+            component = stack.pop()
+            if component._bound_props:
+                copies.append((component, _bound(component)))
+            stack.extend(getattr(component, "children", None) or [])
+        with self._cond:
+            for component, props in copies:
+                self._props.setdefault(component, props)
+
+    def submit(self, component: Any = None) -> None:
+        props = _bound(component) if component is not None else None
+        with self._cond:
+            if props is not None:
+                self._props[component] = props
+            self._requested += 1
+            self._cond.notify_all()
+
+    @property
+    def requested(self) -> int:
+        return self._requested
+
+    def then(self, callback: Callable[[], None]) -> None:
+        """Call ``callback`` on the worker once every submitted change is published."""
+        with self._cond:
+            if self._done < self._requested:
+                self._waiting.append((self._requested, callback))
+                return
+        callback()
+
+    def diff_and_encode(self, old: Dict[str, Any], new: Dict[str, Any], extra: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        if self._executor is not None:
+            return self._executor.submit(diff_and_encode, old, new, extra).result()
+        return diff_and_encode(old, new, extra)
+
+    def diff(self, old: Dict[str, Any], new: Dict[str, Any]) -> Any:
+        if self._executor is not None:
+            return self._executor.submit(diff_views, old, new).result()
+        return diff_views(old, new)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while self._done >= self._requested and not self._closed:
+                    self._cond.wait()
+                if self._done >= self._requested:
+                    return
+                target = self._requested
+                props = {component.id: copy for component, copy in self._props.items()}
+            try:
+                self.app._reconcile(props)
+            except Exception as e:
+                print(f"[Pipeline error] {e}")
+            with self._cond:
+                self._done = target
+                ready = [cb for n, cb in self._waiting if n <= target]
+                self._waiting = [(n, cb) for n, cb in self._waiting if n > target]
+                self._cond.notify_all()
+            for callback in ready:
+                try:
+                    callback()
+                except Exception as e:
+                    print(f"[Pipeline error] {e}")
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until every submitted change has been published."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._done >= self._requested, timeout)
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        if self._executor is not None:
+            self._executor.shutdown()
@@ -0,0 +1,287 @@
+"""Scripted interaction profiling for ``pynative profile``.
+
+A script is a JSON list of steps run against a loaded app, with an
+in-process client attached so every change goes through the full
+reconcile path (serialize, diff, encode) without a device:
+
+* ``{"target": "save", "event": "on_press", "data": ...}`` – fire an event
+  of the first component whose id, ``key``, ``name``, ``label`` or
+  ``region`` prop equals ``target`` (``event`` defaults to its only event);
+  ``{"path": [0, 2], ...}`` selects it by child indexes instead.
+* ``{"state": "counter", "value": 3}`` – set a ``State`` found in the app
+  module's globals or ``app.store``.
+* ``{"navigate": "/inbox", "params": {...}}`` – navigate with the router.
+
+Any step may carry ``"repeat": n``.
+"""
+import cProfile
+import io
+import json
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+from .base import Component, Container
+from .state import State
+
+PHASES = ("script", "handlers", "middleware", "to_dict", "diff", "encode")
+
+
+class PhaseTimer:
+    """Exclusive wall time per phase: a nested phase pauses its parent."""
+
+    def __init__(self) -> None:
+        self.totals: Dict[str, float] = dict.fromkeys(PHASES, 0.0)
+        self.calls: Counter = Counter()
+        self._stack: List[List[Any]] = []
+        self._tid = threading.get_ident()
+
+    def enter(self, phase: str) -> None:
+        now = time.perf_counter()
+        if self._stack:
+            top = self._stack[-1]
+            self.totals[top[0]] += now - top[1]
+        self._stack.append([phase, now])
+        self.calls[phase] += 1
+
+    def leave(self) -> None:
+        now = time.perf_counter()
+        phase, since = self._stack.pop()
+        self.totals[phase] += now - since
+        if self._stack:
+            self._stack[-1][1] = now
+
+    def wrap(self, phase: str, func: Callable[..., Any]) -> Callable[..., Any]:
+        def timed(*args: Any, **kwargs: Any) -> Any:
+            if threading.get_ident() != self._tid:
+                return func(*args, **kwargs)  # pipeline workers are not timed
+            self.enter(phase)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.leave()
+        return timed
+
+
+class _ProfileBridge:
+    """Stands in for a connected device; counts what would have been sent."""
+
+    def __init__(self) -> None:
+        self.packets = 0
+        self.bytes = 0
+        self.handler: Any = None
+
+    def clients(self) -> List[str]:
+        return ["profile"]
+
+    def send(self, client_id: str, message: str) -> None:
+        self.packets += 1
+        self.bytes += len(message)
+
+    def broadcast(self, message: str) -> None:
+        self.send("*", message)
+
+
+class Sampler:
+    """Samples one thread's Python stack every ``interval`` seconds."""
+
+    def __init__(self, thread_id: int, interval: float = 0.001) -> None:
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="pynative-sampler", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if names:
+                self.stacks[";".join(reversed(names))] += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self) -> str:
+        """Samples in the collapsed-stack format read by flamegraph.pl/speedscope."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def _walk(root: Component) -> Iterator[Component]:
+    stack = [root]
+    while stack:
+        comp = stack.pop()
+        yield comp
+        stack.extend(reversed(getattr(comp, "children", None) or []))
+
+
+def _find(app: Any, step: Dict[str, Any]) -> Component:
+    if "path" in step:
+        comp: Any = app.root
+        for i in step["path"]:
+            children = getattr(comp, "children", None) or []
+            if i >= len(children):
+                raise ValueError(f"no component at path {step['path']}")
+            comp = children[i]
+        return comp
+    target = step["target"]
+    for comp in _walk(app.root):
+        if comp.id == target or target in (comp.props.get(k) for k in ("key", "name", "label", "region")):
+            return comp
+    raise ValueError(f"no component matches {target!r}")
+
+
+def _find_state(app: Any, name: str) -> State:
+    module = sys.modules.get("pynative_main")
+    value = getattr(module, name, None) if module else None
+    if value is None:
+        value = app.store.get(name)
+    if not isinstance(value, State):
+        raise ValueError(f"no State named {name!r} in the app module or app.store")
+    return value
+
+
+def run_step(app: Any, step: Dict[str, Any]) -> None:
+    if "state" in step:
+        _find_state(app, step["state"]).value = step.get("value")
+    elif "navigate" in step:
+        app.router.navigate(app, step["navigate"], **step.get("params", {}))
+    else:
+        comp = _find(app, step)
+        name = step.get("event") or next(iter(comp.events), None)
+        if name not in comp.events:
+            raise ValueError(f"{comp.type} ({comp.id}) has no event {name!r}")
+        app.handle_event(comp.events[name], step.get("data"), client_id="profile")
+    app.flush()
+
+
+def component_costs(root: Component, rounds: int = 5) -> List[Dict[str, Any]]:
+    """Serialization time and size of every node's own ``to_dict``, per type."""
+    by_type: Dict[str, Dict[str, Any]] = {}
+    for comp in _walk(root):
+        # containers are measured without their children, which are counted
+        # as nodes of their own; custom to_dict() output is counted whole
+        serialize = Component.to_dict if isinstance(comp, Container) and type(comp).to_dict is Container.to_dict else type(comp).to_dict
+        started = time.perf_counter()
+        for _ in range(rounds):
+            data = serialize(comp)
+        took = (time.perf_counter() - started) / rounds
+        size = len(json.dumps(data, separators=(",", ":"), default=str))
+        entry = by_type.setdefault(comp.type, {"type": comp.type, "nodes": 0, "seconds": 0.0, "bytes": 0, "largest": None})
+        entry["nodes"] += 1
+        entry["seconds"] += took
+        entry["bytes"] += size
+        if entry["largest"] is None or size > entry["largest"][1]:
+            entry["largest"] = (comp.id, size)
+    return sorted(by_type.values(), key=lambda e: e["seconds"], reverse=True)
+
+
+def profile_app(app: Any, steps: List[Dict[str, Any]], interval: float = 0.001, memory: bool = True) -> Dict[str, Any]:
+    """Run ``steps`` against ``app`` and collect timings, allocations and samples."""
+    from . import engine
+
+    timer = PhaseTimer()
+    bridge = _ProfileBridge()
+    app.attach_bridge(bridge)
+    app.client_connected("profile")
+
+    # instance attributes shadow the methods; module globals are restored below
+    app.handle_event = timer.wrap("handlers", app.handle_event)
+    app._middleware[:] = [timer.wrap("middleware", mw) for mw in app._middleware]
+    app._view = timer.wrap("to_dict", app._view)
+    app._encode_full = timer.wrap("encode", app._encode_full)
+    app._encode_patches = timer.wrap("encode", app._encode_patches)
+    patched = {name: getattr(engine, name) for name in ("diff_views", "diff_regions")}
+    for name, func in patched.items():
+        setattr(engine, name, timer.wrap("diff", func))
+
+    profiler = cProfile.Profile()
+    sampler = Sampler(threading.get_ident(), interval)
+    if memory:
+        tracemalloc.start()
+    sampler.start()
+    started = time.perf_counter()
+    timer.enter("script")
+    profiler.enable()
+    try:
+        for step in steps:
+            for _ in range(int(step.get("repeat", 1))):
+                run_step(app, step)
+    finally:
+        profiler.disable()
+        timer.leave()
+        wall = time.perf_counter() - started
+        sampler.stop()
+        for name, func in patched.items():
+            setattr(engine, name, func)
+        allocations: List[Tuple[str, int, int]] = []
+        peak = 0
+        if memory:
+            snapshot = tracemalloc.take_snapshot()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            for stat in snapshot.statistics("lineno")[:25]:
+                frame = stat.traceback[0]
+                allocations.append((f"{frame.filename}:{frame.lineno}", stat.size, stat.count))
+
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(25)
+    return {
+        "steps": sum(int(s.get("repeat", 1)) for s in steps),
+        "wall": wall,
+        "phases": timer.totals,
+        "calls": dict(timer.calls),
+        "packets": bridge.packets,
+        "bytes": bridge.bytes,
+        "allocations": allocations,
+        "peak": peak,
+        "components": component_costs(app.root),
+        "cprofile": out.getvalue(),
+        "collapsed": sampler.collapsed(),
+    }
+
+
+def format_report(report: Dict[str, Any], top: int = 10) -> str:
+    lines = [
+        f"{report['steps']} steps in {report['wall'] * 1000:.1f}ms, "
+        f"{report['packets']} packets / {report['bytes']:,d} bytes",
+        "",
+        "Phase        exclusive ms   share  calls",
+    ]
+    wall = report["wall"] or 1.0
+    for phase in PHASES:
+        seconds = report["phases"][phase]
+        lines.append(f"  {phase:10s} {seconds * 1000:12.2f} {seconds / wall:7.1%} {report['calls'].get(phase, 0):6d}")
+    lines += ["", "Components by serialization cost (own to_dict, per type)"]
+    for entry in report["components"][:top]:
+        node_id, size = entry["largest"]
+        lines.append(
+            f"  {entry['type']:16s} {entry['nodes']:6d} nodes {entry['seconds'] * 1e6:9.1f}us "
+            f"{entry['bytes']:9,d} B  largest {node_id} ({size:,d} B)"
+        )
+    if report["allocations"]:
+        lines += ["", f"Allocations still held (peak {report['peak'] / 1024:.1f} KiB)"]
+        for where, size, count in report["allocations"][:top]:
+            lines.append(f"  {size / 1024:9.1f} KiB {count:7d} blocks  {where}")
+    lines += ["", "cProfile (cumulative)", report["cprofile"].strip()]
+    return "\n".join(lines)
+
+
+def load_script(path: str) -> List[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        steps = json.load(f)
+    if not isinstance(steps, list):
+        raise ValueError("a profile script is a JSON list of steps")
+    return steps
@@ -0,0 +1,88 @@
+import json
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+COMPACT = (",", ":")
+
+Locator = Tuple[List[int], str]
+
+
+class Recorder:
+    """Append-only log of a bridge's traffic, one compact JSON array per line.
+
+    Each line is ``[ms, "in"|"out", client_id, message]``.  Outgoing packets
+    are stored as the exact text that was sent; inbound events additionally
+    carry a locator (child-index path plus event name) so they can be replayed
+    against a fresh process, where every id is different.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+        self._start = time.monotonic()
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def record(self, direction: str, client_id: str, message: Any, locator: Optional[Locator] = None) -> None:
+        entry: List[Any] = [round((time.monotonic() - self._start) * 1000, 1), direction, client_id, message]
+        if locator is not None:
+            entry.append(list(locator))
+        line = json.dumps(entry, separators=COMPACT)
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(line + "\n")
+            self.count += 1
+
+    def flush(self) -> None:
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+def read_recording(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            yield {
+                "ms": entry[0],
+                "direction": entry[1],
+                "client": entry[2],
+                "message": entry[3],
+                "locator": entry[4] if len(entry) > 4 else None,
+            }
+
+
+def recorded_events(path: str) -> List[Dict[str, Any]]:
+    """Inbound events of a recording that can be replayed, in order."""
+    return [e for e in read_recording(path) if e["direction"] == "in" and e["locator"] is not None]
+
+
+def locate_event(tree: Dict[str, Any], event_id: str) -> Optional[Locator]:
+    stack: List[Tuple[Dict[str, Any], List[int]]] = [(tree, [])]
+    while stack:
+        node, path = stack.pop()
+        for name, eid in node.get("events", {}).items():
+            if eid == event_id:
+                return path, name
+        for i, child in enumerate(node.get("children", [])):
+            stack.append((child, path + [i]))
+    return None
+
+
+def resolve_locator(tree: Dict[str, Any], locator: Any) -> Optional[str]:
+    path, name = locator
+    node = tree
+    for i in path:
+        children = node.get("children", [])
+        if i >= len(children):
+            return None
+        node = children[i]
+    return node.get("events", {}).get(name)
@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .recorder import locate_event
+
+# directories never searched for sources
+_SKIP_DIRS = {"__pycache__", "node_modules", "build", "dist"}
+
+
+class SnapshotCache:
+    """Last published snapshot of an app, reused for instant cold starts.
+
+    Stored as ``.pynative_cache/snapshot.json`` next to the app together with
+    the asset digest index.  The cache key hashes the path, size and mtime of
+    every ``.py`` file under the app directory plus the asset files the
+    snapshot references, so editing a source or replacing an image
+    invalidates it while logs or databases written next to the app do not.
+    """
+
+    def __init__(self, app_dir: str, path: Optional[str] = None) -> None:
+        self.app_dir = os.path.abspath(app_dir)
+        self.path = path or os.path.join(self.app_dir, ".pynative_cache", "snapshot.json")
+
+    def key(self, assets: Iterable[str] = ()) -> str:
+        paths: List[str] = []
+        for root, dirs, files in os.walk(self.app_dir):
+            dirs[:] = [d for d in dirs if not d.startswith(".") and d not in _SKIP_DIRS]
+            paths.extend(os.path.join(root, name) for name in files if name.endswith(".py"))
+        paths.extend(os.path.join(self.app_dir, a) for a in assets)
+        h = hashlib.sha256()
+        for path in sorted(paths):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue  # a missing file still changes the hash
+            h.update(f"{os.path.relpath(path, self.app_dir)}\0{st.st_size}\0{st.st_mtime_ns}\n".encode())
+        return h.hexdigest()
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """The cached snapshot, or ``None`` if missing or stale."""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("key") != self.key(data.get("files", [])):
+            return None
+        return data
+
+    def save(self, app: Any) -> None:
+        snapshot = app.export_snapshot()
+        files = sorted(_asset_files(snapshot["view"], app.assets, self.app_dir))
+        data = {"key": self.key(files), "files": files, "assets": app.assets.index(), **snapshot}
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp, self.path)
+
+
+def _asset_files(view: Dict[str, Any], assets: Any, app_dir: str) -> Set[str]:
+    found: Set[str] = set()
+    stack = list(view.get("screens", {}).values()) + [view["tree"]]
+    while stack:
+        node = stack.pop()
+        path = assets.locate(node.get("props", {}).get("src"))
+        if path is not None:
+            found.add(os.path.relpath(path, app_dir))
+        stack.extend(node.get("children", []))
+    return found
+
+
+class SnapshotHandler:
+    """Bridge handler that serves a cached snapshot until the app is loaded.
+
+    Devices connecting before ``hand_over`` get the cached packet right away.
+    Their acks are remembered and other messages (events, subscriptions)
+    are queued, then replayed to the app once it has taken over.
+    """
+
+    def __init__(self, snapshot: Dict[str, Any], started: Optional[float] = None) -> None:
+        self.snapshot = snapshot
+        self.started = time.perf_counter() if started is None else started
+        self.bridge: Any = None
+        self.app: Any = None
+        self._clients: Dict[str, bool] = {}
+        self._queue: List[Tuple[str, Dict[str, Any]]] = []
+        self._lock = threading.RLock()
+
+    def client_connected(self, client_id: str) -> None:
+        with self._lock:
+            if self.app is not None:
+                return self.app.client_connected(client_id)
+            self._clients[client_id] = False
+            self.bridge.send(client_id, self.snapshot["packet"])
+        took = (time.perf_counter() - self.started) * 1000
+        print(f"[PyNative Bridge] Device {client_id}: first paint from snapshot cache after {took:.0f}ms")
+
+    def client_message(self, client_id: str, msg: Dict[str, Any]) -> None:
+        with self._lock:
+            if self.app is not None:
+                return self.app.client_message(client_id, msg)
+            if msg.get("type") == "ack":
+                self._clients[client_id] = True
+            else:
+                self._queue.append((client_id, msg))
+
+    def client_disconnected(self, client_id: str) -> None:
+        with self._lock:
+            if self.app is not None:
+                return self.app.client_disconnected(client_id)
+            self._clients.pop(client_id, None)
+            self._queue = [(c, m) for c, m in self._queue if c != client_id]
+
+    def locate_event(self, event_id: str) -> Any:
+        if self.app is not None:
+            return self.app.locate_event(event_id)
+        return locate_event(self.snapshot["view"]["tree"], event_id)
+
+    def hand_over(self, app: Any) -> None:
+        """Attach ``app`` to the bridge and bring every device up to date."""
+        with self._lock:
+            app.assets.load_index(self.snapshot.get("assets", {}))
+            self.app = app
+            app.attach_bridge(self.bridge)
+            app.resume(self.snapshot, dict(self._clients))
+            queued, self._queue = self._queue, []
+        for client_id, msg in queued:
+            app.client_message(client_id, msg)
+        took = (time.perf_counter() - self.started) * 1000
+        print(f"[PyNative Bridge] App siap setelah {took:.0f}ms, {len(self._clients)} device disinkronkan")
+
+    def start(self, host: str = "0.0.0.0", port: int = 8000) -> Any:
+        from .transport import BridgeServer
+
+        self.bridge = BridgeServer(host=host, port=port)
+        self.bridge.handler = self
+        self.bridge.start()
+        return self.bridge
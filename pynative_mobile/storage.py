@@ -1,26 +1,92 @@
 import os
 import json
+import re
 import sqlite3
 import threading
-from typing import Any, Optional
+import time
+from typing import Any, Dict, Iterable, Optional, Set
+
+from .events import RateLimiter
+from .state import State
+
+_MISSING: Any = object()
+# stay below SQLite's default limit of 999 bound parameters per statement
+_CHUNK = 900
 
 
 class Storage:
-    def __init__(self, path: Optional[str] = None) -> None:
-        self.path = path or os.path.join(os.getcwd(), "pynative_storage.db")
+    def __init__(self, path: Optional[str] = None, write_delay: float = 500) -> None:
+        self.path = path or os.environ.get("PYNATIVE_STORAGE") or os.path.join(os.getcwd(), "pynative_storage.db")
         self.conn = sqlite3.connect(self.path, check_same_thread=False)
         self._lock = threading.Lock()
         self.conn.execute("CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value TEXT)")
         self.conn.commit()
+        # write-behind buffer for save_later(), written in one transaction
+        # once no new value arrived for write_delay ms
+        self._pending: Dict[str, Any] = {}
+        self._writer = RateLimiter(self._write_pending, debounce=write_delay) if write_delay else None
+        # values read by warm(); keys named with register() are loaded
+        # together by the first call, other keys one query each
+        self._registered: Set[str] = set()
+        self._warmed: Set[str] = set()
+        self._warm: Dict[str, Any] = {}
+        self._closed = False
+        self._atexit = False
+        self._namespaces: Dict[str, "Namespace"] = {}
+        self._sweeper: Optional[threading.Thread] = None
 
     def save(self, key: str, value: Any) -> None:
         with self._lock:
+            self._pending.pop(key, None)
             self.conn.execute(
                 "REPLACE INTO kv (key,value) VALUES (?,?)", (key, json.dumps(value))
             )
             self.conn.commit()
+            if key in self._warmed:
+                self._warm[key] = value
+
+    def save_many(self, items: Dict[str, Any]) -> None:
+        with self._lock:
+            self._save_rows(items)
+
+    def _save_rows(self, items: Dict[str, Any]) -> None:
+        self.conn.executemany(
+            "REPLACE INTO kv (key,value) VALUES (?,?)",
+            [(k, json.dumps(v)) for k, v in items.items()],
+        )
+        self.conn.commit()
+        self._warm.update((k, v) for k, v in items.items() if k in self._warmed)
+
+    def save_later(self, key: str, value: Any) -> None:
+        """Queue a write; bursts for any keys are coalesced into one transaction."""
+        with self._lock:
+            self._pending[key] = value
+            if not self._atexit:
+                import atexit
+
+                atexit.register(self.flush)
+                self._atexit = True
+        if self._writer is None:
+            self.flush()
+        else:
+            self._writer()
+
+    def _write_pending(self) -> None:
+        with self._lock:
+            if self._pending and not self._closed:
+                self._save_rows(self._pending)
+            self._pending = {}
+
+    def flush(self) -> None:
+        """Write queued values now (also runs at interpreter exit)."""
+        if self._writer is not None:
+            self._writer.cancel()
+        self._write_pending()
 
     def load(self, key: str) -> Any:
+        pending = self._pending.get(key, _MISSING)
+        if pending is not _MISSING:
+            return pending
         cur = self.conn.cursor()
         cur.execute("SELECT value FROM kv WHERE key=?", (key,))
         row = cur.fetchone()
@@ -28,7 +94,263 @@ class Storage:
             return None
         return json.loads(row[0])
 
+    def load_many(self, keys: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Values for ``keys`` (every stored key if ``None``) in as few queries as possible."""
+        cur = self.conn.cursor()
+        if keys is None:
+            rows = cur.execute("SELECT key, value FROM kv").fetchall()
+        else:
+            keys = list(keys)
+            rows = []
+            for i in range(0, len(keys), _CHUNK):
+                chunk = keys[i:i + _CHUNK]
+                marks = ",".join("?" * len(chunk))
+                rows.extend(cur.execute(f"SELECT key, value FROM kv WHERE key IN ({marks})", chunk).fetchall())
+        values = {k: json.loads(v) for k, v in rows}
+        values.update(self._pending)
+        return values
+
+    def register(self, *keys: str) -> None:
+        """Name keys read at startup, so the next ``warm()`` loads them in one query."""
+        self._registered.update(keys)
+
+    def warm(self, key: str, default: Any = None) -> Any:
+        """Startup read: the first call bulk-loads the registered keys, later calls are dict hits.
+
+        The warm copy is kept in step with writes made through this object.
+        """
+        pending = self._pending.get(key, _MISSING)
+        if pending is not _MISSING:
+            return pending
+        if key not in self._warmed:
+            keys = (self._registered | {key}) - self._warmed
+            values = self.load_many(keys)
+            self._warm.update((k, values[k]) for k in keys if k in values)
+            self._warmed.update(keys)
+        return self._warm.get(key, default)
+
     def delete(self, key: str) -> None:
         with self._lock:
+            self._pending.pop(key, None)
             self.conn.execute("DELETE FROM kv WHERE key=?", (key,))
             self.conn.commit()
+            self._warm.pop(key, None)
+
+    def namespace(
+        self,
+        name: str,
+        ttl: Optional[float] = _MISSING,
+        max_entries: Optional[int] = _MISSING,
+    ) -> "Namespace":
+        """A separate table for cache-like data, see ``Namespace``.
+
+        Repeated calls return the same object; ``ttl``/``max_entries`` passed
+        later replace the earlier settings, omitted ones are kept.
+        """
+        ns = self._namespaces.get(name)
+        if ns is None:
+            ns = self._namespaces[name] = Namespace(
+                self,
+                name,
+                None if ttl is _MISSING else ttl,
+                None if max_entries is _MISSING else max_entries,
+            )
+        else:
+            if ttl is not _MISSING:
+                ns.ttl = ttl
+            if max_entries is not _MISSING:
+                ns.max_entries = max_entries
+        return ns
+
+    def sweep(self) -> int:
+        """Drop expired rows and persist access stamps in every namespace."""
+        return sum(ns.sweep() for ns in list(self._namespaces.values()))
+
+    def start_sweeper(self, interval: float = 60.0) -> None:
+        """Sweep namespaces every ``interval`` seconds on a daemon thread."""
+        if self._sweeper is not None:
+            return
+
+        def run() -> None:
+            while not self._closed:
+                time.sleep(interval)
+                if not self._closed:
+                    self.sweep()
+
+        self._sweeper = threading.Thread(target=run, name="pynative-storage-sweeper", daemon=True)
+        self._sweeper.start()
+
+    def close(self) -> None:
+        self.flush()
+        for ns in list(self._namespaces.values()):
+            ns.flush()
+        self._closed = True
+        self.conn.close()
+
+
+class Namespace:
+    """Key/value table with per-entry expiry and an optional LRU size cap.
+
+    Rows live in their own ``ns_<name>`` table with indexed ``expires`` and
+    ``accessed`` columns.  Expired rows are never returned; they are deleted
+    when read, by a sweep at most every ``sweep_interval`` seconds during
+    writes, or by ``Storage.start_sweeper()``.  Reads do not write: access
+    times are collected in memory and stored in one batch before evictions
+    and sweeps, or once ``_STAMP_BATCH`` keys were read, so least recently used
+    order is approximate.  With ``max_entries`` a write that takes the table
+    past the cap first deletes expired rows, then evicts the oldest-accessed
+    ones.
+    """
+
+    _STAMP_BATCH = 256
+
+    def __init__(
+        self,
+        storage: Storage,
+        name: str,
+        ttl: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        sweep_interval: float = 60.0,
+    ) -> None:
+        if not re.fullmatch(r"[A-Za-z0-9_]+", name):
+            raise ValueError(f"namespace names may only use letters, digits and _, got {name!r}")
+        self.storage = storage
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.sweep_interval = sweep_interval
+        self.table = f"ns_{name}"
+        self._stamps: Dict[str, float] = {}
+        self._next_sweep = 0.0
+        with storage._lock:
+            conn = storage.conn
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} "
+                "(key TEXT PRIMARY KEY, value TEXT, expires REAL, accessed REAL)"
+            )
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {self.table}_expires ON {self.table} (expires)")
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {self.table}_accessed ON {self.table} (accessed)")
+            conn.commit()
+            self._size = conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def __len__(self) -> int:
+        return self._size
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = _MISSING) -> None:
+        """Store ``value``; ``ttl`` seconds overrides the namespace default (``None``: never)."""
+        ttl = self.ttl if ttl is _MISSING else ttl
+        now = time.time()
+        with self.storage._lock:
+            conn = self.storage.conn
+            if conn.execute(f"SELECT 1 FROM {self.table} WHERE key=?", (key,)).fetchone() is None:
+                self._size += 1
+            conn.execute(
+                f"REPLACE INTO {self.table} (key, value, expires, accessed) VALUES (?,?,?,?)",
+                (key, json.dumps(value), None if ttl is None else now + ttl, now),
+            )
+            self._stamps.pop(key, None)
+            if now >= self._next_sweep:
+                self._sweep(now)
+            if self.max_entries is not None and self._size > self.max_entries:
+                self._evict(now)
+            conn.commit()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        now = time.time()
+        with self.storage._lock:
+            conn = self.storage.conn
+            row = conn.execute(f"SELECT value, expires FROM {self.table} WHERE key=?", (key,)).fetchone()
+            if row is None:
+                return default
+            if row[1] is not None and row[1] <= now:
+                self._size -= conn.execute(f"DELETE FROM {self.table} WHERE key=?", (key,)).rowcount
+                self._stamps.pop(key, None)
+                conn.commit()
+                return default
+            self._stamps[key] = now
+            if len(self._stamps) >= self._STAMP_BATCH:
+                self._write_stamps()
+                conn.commit()
+        return json.loads(row[0])
+
+    def delete(self, key: str) -> None:
+        with self.storage._lock:
+            cur = self.storage.conn.execute(f"DELETE FROM {self.table} WHERE key=?", (key,))
+            self._size -= cur.rowcount
+            self._stamps.pop(key, None)
+            self.storage.conn.commit()
+
+    def clear(self) -> None:
+        with self.storage._lock:
+            self.storage.conn.execute(f"DELETE FROM {self.table}")
+            self.storage.conn.commit()
+            self._size = 0
+            self._stamps = {}
+
+    def flush(self) -> None:
+        """Store the access times collected by ``get``."""
+        with self.storage._lock:
+            self._write_stamps()
+            self.storage.conn.commit()
+
+    def sweep(self) -> int:
+        """Delete expired rows now; returns how many were removed."""
+        with self.storage._lock:
+            removed = self._sweep(time.time())
+            self.storage.conn.commit()
+            return removed
+
+    def _write_stamps(self) -> None:
+        if self._stamps and not self.storage._closed:
+            stamps, self._stamps = self._stamps, {}
+            self.storage.conn.executemany(
+                f"UPDATE {self.table} SET accessed=? WHERE key=?",
+                [(t, k) for k, t in stamps.items()],
+            )
+
+    def _sweep(self, now: float) -> int:
+        self._next_sweep = now + self.sweep_interval
+        self._write_stamps()
+        cur = self.storage.conn.execute(f"DELETE FROM {self.table} WHERE expires <= ?", (now,))
+        self._size -= cur.rowcount
+        return cur.rowcount
+
+    def _evict(self, now: float) -> None:
+        # expired rows go first, so they never push live ones out
+        self._sweep(now)
+        excess = self._size - self.max_entries
+        if excess <= 0:
+            return
+        cur = self.storage.conn.execute(
+            f"DELETE FROM {self.table} WHERE key IN "
+            f"(SELECT key FROM {self.table} ORDER BY accessed LIMIT ?)",
+            (excess,),
+        )
+        self._size -= cur.rowcount
+
+
+_default: Optional[Storage] = None
+
+
+def default_storage() -> Storage:
+    """The process-wide ``Storage`` used by ``PersistentState`` by default."""
+    global _default
+    if _default is None:
+        _default = Storage()
+    return _default
+
+
+class PersistentState(State):
+    """``State`` whose value survives restarts.
+
+    The value is read from ``storage`` on creation (keys named with
+    ``storage.register()`` beforehand are loaded in one query) and every change is written behind: bursts such
+    as keystrokes end up as a single write once the storage's ``write_delay``
+    has passed without a change, and pending writes are flushed at exit.
+    """
+
+    def __init__(self, key: str, default: Any = None, storage: Optional[Storage] = None) -> None:
+        self.key = key
+        self.storage = storage or default_storage()
+        super().__init__(self.storage.warm(key, default))
+        self.bind(lambda value: self.storage.save_later(self.key, value))
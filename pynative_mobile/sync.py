@@ -0,0 +1,133 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+from .interning import StringTable
+
+
+class ClientState:
+    def __init__(self) -> None:
+        # last version sent to / acknowledged by the client
+        self.sent: Optional[int] = None
+        self.acked: Optional[int] = None
+        # clients that never ack get every version as it is produced
+        self.acking = False
+        # number of string-table entries the client has been sent
+        self.strings = 0
+        self.interned = False
+        # subtree ids / region names the client renders; None means everything
+        self.regions: Optional[Tuple[str, ...]] = None
+
+
+class ClientSync:
+    """Versioned tree history plus per-client delivery state.
+
+    Each reconcile commits a new tree version.  A client that acknowledges
+    versions (``{"type": "ack", "version": n}``) has at most one packet in
+    flight; once it acks, it receives a single diff squashed from its acked
+    version to the newest one instead of every intermediate frame.  Encoded
+    packets are cached per ``(base, version)`` so clients at the same version
+    share one encoding.  With a ``StringTable`` the shared body is interned
+    and each client only gets the table entries it is missing.  Clients
+    subscribed to the same regions share encodings restricted to those
+    subtrees, so regions nobody renders are never diffed.
+    """
+
+    def __init__(self, history: int = 32, strings: Optional[StringTable] = None) -> None:
+        self.history = history
+        self.strings = strings
+        self.version = 0
+        self.clients: Dict[str, ClientState] = {}
+        self._trees: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._packets: Dict[Tuple[Any, ...], Tuple[Optional[str], int]] = {}
+        self._lock = threading.RLock()
+
+    def commit(self, tree: Dict[str, Any]) -> int:
+        with self._lock:
+            self.version += 1
+            self._trees[self.version] = tree
+            while len(self._trees) > self.history:
+                self._trees.popitem(last=False)
+            self._packets.clear()
+            return self.version
+
+    def tree(self, version: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        return self._trees.get(self.version if version is None else version)
+
+    def connect(self, client_id: str, interned: bool = False) -> ClientState:
+        with self._lock:
+            client = self.clients.get(client_id)
+            if client is None:
+                client = self.clients[client_id] = ClientState()
+                client.interned = interned and self.strings is not None
+            return client
+
+    def disconnect(self, client_id: str) -> None:
+        with self._lock:
+            self.clients.pop(client_id, None)
+
+    def subscribe(self, client_id: str, regions: Optional[Sequence[str]]) -> None:
+        """Restrict ``client_id`` to ``regions`` (``None`` or empty: whole tree).
+
+        The client is sent a full packet for its new selection next.
+        """
+        with self._lock:
+            client = self.clients.get(client_id)
+            if client is None:
+                return
+            client.regions = tuple(sorted(set(regions))) if regions else None
+            client.sent = client.acked = None
+
+    def ack(self, client_id: str, version: int) -> None:
+        with self._lock:
+            client = self.clients.get(client_id)
+            if client is None:
+                return
+            client.acking = True
+            if client.acked is None or version > client.acked:
+                client.acked = version
+
+    def packet_for(
+        self,
+        client_id: str,
+        encode_full: Callable[..., str],
+        encode_patches: Callable[..., Optional[str]],
+    ) -> Optional[str]:
+        """Return the packet that brings ``client_id`` up to date, if one is due.
+
+        Encoders are called as ``encode_full(view, version, table, regions)``
+        and ``encode_patches(old, new, base, version, table, regions)``.
+        """
+        with self._lock:
+            client = self.clients.get(client_id)
+            version = self.version
+            if client is None or not version or client.sent == version:
+                return None
+            if client.acking:
+                if client.sent is not None and (client.acked or 0) < client.sent:
+                    return None  # previous packet not acknowledged yet
+                base = client.acked
+            else:
+                base = client.sent
+            if base not in self._trees:
+                base = None
+            table = self.strings if client.interned else None
+            key = (base, version, table is not None, client.regions)
+            packet: Optional[str]
+            if key not in self._packets:
+                new = self._trees[version]
+                if base is None:
+                    packet = encode_full(new, version, table, client.regions)
+                else:
+                    packet = encode_patches(self._trees[base], new, base, version, table, client.regions)
+                self._packets[key] = (packet, len(table) if table is not None else 0)
+            packet, needed = self._packets[key]
+            client.sent = version
+            if packet is None:
+                if client.acking:
+                    client.acked = version  # nothing changed, nothing to wait for
+                return None
+            if table is not None:
+                packet = table.with_header(packet, client.strings, needed)
+                client.strings = max(client.strings, needed)
+            return packet
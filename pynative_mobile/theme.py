@@ -1,6 +1,18 @@
-from typing import Dict
+from typing import Callable, Dict, List, Optional
+
+TOKEN_PREFIX = "theme."
+
 
 class Theme:
+    """Theme colors, referenced from props as ``"theme.<name>"`` tokens.
+
+    Change colors at runtime with ``set()``: bound listeners (every app
+    using the theme) are told which colors changed, and devices receive a
+    ``theme`` patch with just the new token values.  ``tokens()`` is the
+    token → value table sent in full packets, built once per change so
+    clients resolve a token with a single lookup.
+    """
+
     def __init__(
         self,
         primary: str = "#6200EE",
@@ -12,8 +24,37 @@ class Theme:
             "background": background,
             "on_background": on_background,
         }
+        self._tokens: Optional[Dict[str, str]] = None
+        self._tokens_for: Dict[str, str] = {}
+        self._listeners: List[Callable[[Dict[str, str]], None]] = []
+
+    def bind(self, callback: Callable[[Dict[str, str]], None]) -> Callable[[], None]:
+        """Call ``callback(changed_colors)`` after every ``set()`` that changes something."""
+        self._listeners.append(callback)
+        def _unbind() -> None:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+        return _unbind
+
+    def set(self, colors: Optional[Dict[str, str]] = None, **kwargs: str) -> None:
+        """Update several colors at once, e.g. ``theme.set(background="#121212")``."""
+        changes = {**(colors or {}), **kwargs}
+        changed = {k: v for k, v in changes.items() if self.colors.get(k) != v}
+        if not changed:
+            return
+        self.colors.update(changed)
+        for callback in list(self._listeners):
+            callback(changed)
+
+    def tokens(self) -> Dict[str, str]:
+        # rebuilt after changes (also direct edits of ``colors``) rather than
+        # mutated, so serialized views can share it
+        if self._tokens is None or self._tokens_for != self.colors:
+            self._tokens_for = dict(self.colors)
+            self._tokens = {TOKEN_PREFIX + k: v for k, v in self.colors.items()}
+        return self._tokens
 
     def to_dict(self) -> Dict[str, Dict[str, str]]:
-        return {"colors": self.colors}
+        return {"colors": dict(self.colors), "tokens": self.tokens()}
 
-default_theme = Theme()
\ No newline at end of file
+default_theme = Theme()
@@ -1,13 +1,43 @@
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
-from typing import List, Any
+from fastapi.responses import HTMLResponse
+from typing import Any, Dict, List
+import os
 import threading
 import asyncio
+import json
+import uuid
 import uvicorn
 
-try:
-    import socketio
-except ImportError:
-    socketio = None
+PREVIEW_HTML = os.path.join(os.path.dirname(__file__), "preview.html")
+
+
+def memory_usage() -> Dict[str, int]:
+    """Current and peak resident set size of this process, in bytes."""
+    usage: Dict[str, int] = {}
+    try:
+        with open("/proc/self/statm") as f:
+            usage["rss_bytes"] = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+
+        # ru_maxrss is in KiB on Linux
+        usage["peak_rss_bytes"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except ImportError:
+        pass
+    return usage
+
+
+def _notify(handler: Any, name: str, *args: Any) -> None:
+    """Forward a client lifecycle/message callback to the attached app, if any."""
+    callback = getattr(handler, name, None)
+    if callback is None:
+        return
+    try:
+        callback(*args)
+    except Exception as e:
+        print(f"[Bridge] {name} error: {e}")
 
 
 class BridgeServer:
@@ -17,30 +47,79 @@ class BridgeServer:
         self.host = host
         self.port = port
         self.auth_token = auth_token
-        self._connections: List[WebSocket] = []
+        # receives client_connected / client_message / client_disconnected
+        self.handler: Any = None
+        self._clients: Dict[str, WebSocket] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        # optional recorder.Recorder logging every packet in and out
+        self.recorder: Any = None
+
+        @self.app.get("/", response_class=HTMLResponse)
+        @self.app.get("/preview", response_class=HTMLResponse)
+        async def preview():
+            # patch-applying browser client that connects back to /ws
+            with open(PREVIEW_HTML, encoding="utf-8") as f:
+                return f.read()
+
+        @self.app.get("/stats")
+        async def stats():
+            return {"clients": len(self._clients), **memory_usage()}
 
         @self.app.websocket("/ws")
         async def websocket_endpoint(ws: WebSocket):
             await ws.accept()
-            self._connections.append(ws)
+            self._loop = asyncio.get_running_loop()
+            client_id = str(uuid.uuid4())[:8]
+            self._clients[client_id] = ws
+            _notify(self.handler, "client_connected", client_id)
             try:
                 while True:
                     text = await ws.receive_text()
                     try:
-                        import json
-
                         msg = json.loads(text)
-                        if isinstance(msg, dict) and msg.get("type") == "log":
-                            print(f"[Device] {msg.get('message')}")
-                    except Exception:
-                        pass
+                    except ValueError:
+                        continue
+                    if not isinstance(msg, dict):
+                        continue
+                    if self.recorder is not None:
+                        self._record_in(client_id, msg)
+                    if msg.get("type") == "log":
+                        print(f"[Device] {msg.get('message')}")
+                        continue
+                    _notify(self.handler, "client_message", client_id, msg)
             except WebSocketDisconnect:
-                self._connections.remove(ws)
+                self._clients.pop(client_id, None)
+                _notify(self.handler, "client_disconnected", client_id)
+
+    def clients(self) -> List[str]:
+        return list(self._clients)
+
+    def _record_in(self, client_id: str, msg: Dict[str, Any]) -> None:
+        locator = None
+        locate = getattr(self.handler, "locate_event", None)
+        if "event" in msg and locate is not None:
+            locator = locate(msg["event"])
+        self.recorder.record("in", client_id, msg, locator)
+
+    def _submit(self, coro: Any) -> None:
+        # safe from the server loop as well as from handler/worker threads
+        if self._loop is None:
+            coro.close()
+            return
+        asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def send(self, client_id: str, message: str) -> None:
+        ws = self._clients.get(client_id)
+        if ws is not None:
+            if self.recorder is not None:
+                self.recorder.record("out", client_id, message)
+            self._submit(ws.send_text(message))
 
     def broadcast(self, message: str) -> None:
-        loop = asyncio.get_event_loop()
-        for ws in list(self._connections):
-            asyncio.run_coroutine_threadsafe(ws.send_text(message), loop)
+        if self.recorder is not None:
+            self.recorder.record("out", "*", message)
+        for ws in list(self._clients.values()):
+            self._submit(ws.send_text(message))
 
     def start(self, log_level: str = "info") -> None:
         thread = threading.Thread(
@@ -54,7 +133,9 @@ class BridgeServer:
 
 class SocketIOBridge:
     def __init__(self, host: str = "0.0.0.0", port: int = 8000, auth_token: str | None = None) -> None:
-        if socketio is None: 
+        try:
+            import socketio
+        except ImportError:
             raise RuntimeError("python-socketio is required for SocketIOBridge")
 
         self.auth_token = auth_token
@@ -62,6 +143,9 @@ class SocketIOBridge:
         self.app = FastAPI()
         self.host = host
         self.port = port
+        self.handler: Any = None
+        self._clients: List[str] = []
+        self._loop: asyncio.AbstractEventLoop | None = None
 
         self.app.mount("/", socketio.ASGIApp(self.sio))
 
@@ -74,17 +158,46 @@ class SocketIOBridge:
                 token = params.get("token")
                 if token != self.auth_token:
                     await self.sio.disconnect(sid)
+                    return
+            self._loop = asyncio.get_running_loop()
+            self._clients.append(sid)
+            _notify(self.handler, "client_connected", sid)
 
         @self.sio.event
         async def disconnect(sid):
             print(f"SocketIO client disconnected: {sid}")
+            if sid in self._clients:
+                self._clients.remove(sid)
+                _notify(self.handler, "client_disconnected", sid)
 
         @self.sio.on("log")
         async def on_log(sid, message):
             print(f"[Device] {message}")
 
+        @self.sio.on("message")
+        async def on_message(sid, message):
+            if isinstance(message, str):
+                try:
+                    message = json.loads(message)
+                except ValueError:
+                    return
+            if isinstance(message, dict):
+                _notify(self.handler, "client_message", sid, message)
+
+    def clients(self) -> List[str]:
+        return list(self._clients)
+
+    def _submit(self, coro: Any) -> None:
+        if self._loop is None:
+            coro.close()
+            return
+        asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def send(self, client_id: str, message: Any) -> None:
+        self._submit(self.sio.emit("update", message, to=client_id))
+
     def broadcast(self, message: Any) -> None:
-        asyncio.create_task(self.sio.emit("update", message))
+        self._submit(self.sio.emit("update", message))
 
     def start(self, log_level: str = "info") -> None:
         thread = threading.Thread(
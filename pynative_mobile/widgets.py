@@ -1,4 +1,5 @@
-from typing import Any, Callable, Optional
+from collections import OrderedDict
+from typing import Any, Callable, Iterable, List, Optional, Tuple
 from .base import Component
 
 class Text(Component):
@@ -26,46 +27,142 @@ class TextInput(Component):
         value: str = "",
         placeholder: str = "",
         on_change: Optional[Callable[[str], Any]] = None,
+        debounce: Optional[int] = None,
+        throttle: Optional[int] = None,
     ) -> None:
-        super().__init__(name=name, value=value, placeholder=placeholder, on_change=on_change)
+        super().__init__(
+            name=name,
+            value=value,
+            placeholder=placeholder,
+            on_change=on_change,
+            debounce=debounce,
+            throttle=throttle,
+        )
         # no return value
 
 
 class Form(Component):
+    _CACHE_SIZE = 256
+
     def __init__(
         self,
         children: Optional[list] = None,
         validators: Optional[dict] = None,
         on_submit: Optional[Callable[[dict], Any]] = None,
+        timeout: Optional[float] = None,
+        validate_on_change: bool = False,
     ) -> None:
         super().__init__(children=children or [], validators=validators or {}, on_submit=on_submit)
         self.children = children or []
         self.validators = validators or {}
         self.on_submit = on_submit
+        # seconds each async validator may take before it counts as failed
+        self.timeout = timeout
+        self.errors: dict = {}
+        self._results: "OrderedDict[Tuple[str, Any], Any]" = OrderedDict()
+        self._tasks: set = set()
+        if validate_on_change:
+            for child in self.children:
+                if isinstance(child, Component) and "name" in child.props:
+                    child.bind_props(self._on_field_change(child.props["name"]))
+
+    def _on_field_change(self, name: str) -> Callable[[str, Any], None]:
+        def changed(key: str, value: Any) -> None:
+            if key != "value":
+                return
+            import asyncio
+
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                self.validate_field(name)
+                return
+            # changed by an event handled on the bridge's loop: validate in
+            # the background instead of blocking the loop for the validator
+            task = loop.create_task(self._revalidate(name, value))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return changed
 
-    def validate(self) -> dict:
-        errors: dict = {}
+    async def _revalidate(self, name: str, value: Any) -> None:
+        err = (await self.validate_async([name])).get(name)
+        if dict(self._fields([name])).get(name) == value:
+            # a newer value has its own validation scheduled
+            self._set_error(name, err)
+
+    def _fields(self, names: Optional[Iterable[str]] = None) -> List[Tuple[str, Any]]:
+        wanted = set(names) if names is not None else None
+        fields = []
         for child in self.children:
             if hasattr(child, "props") and "name" in child.props:
                 name = child.props["name"]
-                val = child.props.get("value")
-                if name in self.validators:
-                    validator = self.validators[name]
-                    if callable(validator):
-                        try:
-                            if hasattr(validator, "__call__") and hasattr(validator, "__code__") and validator.__code__.co_flags & 0x80:
-                                # coroutine function
-                                import asyncio
-                                err = asyncio.get_event_loop().run_until_complete(validator(val))
-                            else:
-                                err = validator(val)
-                        except RuntimeError:
-                            # no running loop, create temporary
-                            import asyncio
-                            err = asyncio.run(validator(val))
-                        if err:
-                            errors[name] = err
-        return errors
+                if wanted is None or name in wanted:
+                    fields.append((name, child.props.get("value")))
+        return fields
+
+    async def _check(self, validator: Callable[..., Any], value: Any) -> Tuple[Any, bool]:
+        import asyncio
+        import inspect
+
+        result = validator(value)
+        if inspect.isawaitable(result):
+            try:
+                result = await asyncio.wait_for(result, self.timeout)
+            except asyncio.TimeoutError:
+                # not cached, so the next validation retries the check
+                return "validation timed out", False
+        return result, True
+
+    async def validate_async(self, names: Optional[Iterable[str]] = None) -> dict:
+        """Validate fields concurrently, reusing cached results for unchanged values."""
+        fields = self._fields(names)
+        results: dict = {}
+        pending: List[Tuple[str, Optional[Tuple[str, Any]], Callable[..., Any], Any]] = []
+        for name, val in fields:
+            validator = self.validators.get(name)
+            if not callable(validator):
+                continue
+            key = (name, val)
+            try:
+                cached = key in self._results
+            except TypeError:
+                # unhashable value, validate every time
+                pending.append((name, None, validator, val))
+                continue
+            if cached:
+                self._results.move_to_end(key)
+                results[name] = self._results[key]
+                continue
+            pending.append((name, key, validator, val))
+
+        import asyncio
+
+        checked = await asyncio.gather(*(self._check(v, val) for _, _, v, val in pending))
+        for (name, cache_key, _, _), (err, cacheable) in zip(pending, checked):
+            results[name] = err
+            if cacheable and cache_key is not None:
+                self._results[cache_key] = err
+                if len(self._results) > self._CACHE_SIZE:
+                    self._results.popitem(last=False)
+
+        return {name: results[name] for name, _ in fields if results.get(name)}
+
+    def validate(self, names: Optional[Iterable[str]] = None) -> dict:
+        return _run_sync(self.validate_async(names))
+
+    def validate_field(self, name: str) -> Any:
+        """Re-validate a single field, e.g. after its ``TextInput`` changed."""
+        err = self.validate([name]).get(name)
+        self._set_error(name, err)
+        return err
+
+    def _set_error(self, name: str, err: Any) -> None:
+        errors = {k: v for k, v in self.errors.items() if k != name}
+        if err:
+            errors[name] = err
+        if errors != self.errors:
+            self.errors = errors
+            self._update_prop("errors", dict(errors))
 
     def submit(self) -> None:
         errs = self.validate()
@@ -75,3 +172,23 @@ class Form(Component):
             data = {c.props.get("name"): c.props.get("value") for c in self.children if "name" in c.props}
             self.on_submit(data)
         return {}
+
+
+def _run_sync(coro: Any) -> Any:
+    # asyncio is imported lazily to keep ``import pynative_mobile`` cheap
+    import asyncio
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        # private loop so the caller's current event loop is left untouched
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(coro)
+        finally:
+            loop.close()
+    # already inside a loop: finish the validation on a helper thread
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(_run_sync, coro).result()
@@ -4,9 +4,14 @@ import tempfile
 import textwrap
 import unittest
 
+from pynative_mobile.base import Component
 from pynative_mobile.cli import load_app
 from pynative_mobile.engine import PyNativeApp
 
+def setUpModule():
+    # keep the process-wide Storage out of the working directory
+    os.environ.setdefault("PYNATIVE_STORAGE", os.path.join(tempfile.mkdtemp(), "pynative_storage.db"))
+
 class Dummy(PyNativeApp):
     pass
 
@@ -95,6 +100,40 @@ class CLITests(unittest.TestCase):
             sys.argv = sys_argv
             os.unlink(path)
 
+    def test_build_release_bundle(self):
+        import gzip
+        import json
+        tmpdir = tempfile.mkdtemp()
+        with open(os.path.join(tmpdir, "logo.png"), "wb") as f:
+            f.write(b"\x89PNG" * 100)
+        path = os.path.join(tmpdir, "main.py")
+        with open(path, "w") as f:
+            f.write(textwrap.dedent(
+                """
+                import os
+                from pynative_mobile import PyNativeApp, Screen, Image
+                logo = os.path.join(os.path.dirname(__file__), "logo.png")
+                app = PyNativeApp(root=Screen(children=[Image(logo), Image(logo, width=10)]))
+                """
+            ))
+        sys_argv = sys.argv
+        try:
+            sys.argv = ["pynative", "build", path, "--release", "--compress", "gzip"]
+            from pynative_mobile.cli import main
+            main()
+        finally:
+            sys.argv = sys_argv
+        out = os.path.join(tmpdir, "main.bundle.json.gz")
+        with gzip.open(out, "rt") as f:
+            text = f.read()
+        self.assertNotIn("\n", text)
+        bundle = json.loads(text)
+        self.assertEqual(len(bundle["assets"]), 1)
+        name = next(iter(bundle["assets"]))
+        srcs = [c["props"]["src"] for c in bundle["tree"]["children"]]
+        self.assertEqual(srcs, [f"asset:{name}"] * 2)
+        self.assertTrue(os.path.isfile(os.path.join(tmpdir, "main.assets", name)))
+
     def test_init_command(self):
         import tempfile
         tmpdir = tempfile.mkdtemp()
@@ -108,3 +147,47 @@ class CLITests(unittest.TestCase):
         finally:
             sys.argv = sys_argv
 
+
+    def test_profile_command_reports_phases(self):
+        import contextlib
+        import io
+        import json
+        tmpdir = tempfile.mkdtemp()
+        path = os.path.join(tmpdir, "main.py")
+        with open(path, "w") as f:
+            f.write(textwrap.dedent(
+                """
+                from pynative_mobile import PyNativeApp, Screen, Text, Button
+                from pynative_mobile.state import State
+                count = State(0)
+                log = State("")
+                def press():
+                    count.value += 1
+                    log.value += f"pressed {count.value}\\n"
+                app = PyNativeApp(root=Screen(children=[Text(count), Text(log), Button(label="add", on_press=press)]))
+                """
+            ))
+        script = os.path.join(tmpdir, "script.json")
+        with open(script, "w") as f:
+            json.dump([{"target": "add", "repeat": 50}, {"state": "count", "value": -1}], f)
+        stacks = os.path.join(tmpdir, "stacks.txt")
+        sys_argv = sys.argv
+        buf = io.StringIO()
+        try:
+            sys.argv = ["pynative", "profile", script, path, "--collapsed", stacks, "--interval", "0.2"]
+            from pynative_mobile.cli import main
+            with contextlib.redirect_stdout(buf):
+                main()
+        finally:
+            sys.argv = sys_argv
+            # the profiled app's handlers would leak into later apps' registries
+            Component._event_registry = {}
+        out = buf.getvalue()
+        self.assertIn("51 steps", out)
+        for phase in ("handlers", "to_dict", "diff", "encode"):
+            self.assertRegex(out, rf"\n  {phase} +\d+\.\d+ +\d+\.\d+% +\d+")
+        self.assertIn("Text", out.split("Components by serialization cost")[1])
+        self.assertIn("cProfile", out)
+        with open(stacks) as f:
+            lines = f.read().splitlines()
+        self.assertTrue(all(line.rsplit(" ", 1)[1].isdigit() for line in lines))
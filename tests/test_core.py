@@ -1,17 +1,43 @@
 import io
+import json
+import os
 import sys
+import tempfile
 import unittest
 
 from pynative_mobile.base import Component, PROP_UPDATE_LISTENERS
 from pynative_mobile.engine import PyNativeApp
 from pynative_mobile.state import State
-from pynative_mobile.widgets import Button, Text, TextInput, Form
+from pynative_mobile.widgets import Button, Image, Text, TextInput, Form
 from pynative_mobile.network import fetch
 from pynative_mobile.ai import generate_ui
+from pynative_mobile.layouts import Column
+
+def setUpModule():
+    # keep the process-wide Storage out of the working directory
+    os.environ.setdefault("PYNATIVE_STORAGE", os.path.join(tempfile.mkdtemp(), "pynative_storage.db"))
 
 class Dummy(Component):
     pass
 
+class FakeBridge:
+    """Per-client bridge that records the packets sent to each connected client."""
+
+    def __init__(self, *clients):
+        self.sent = {client_id: [] for client_id in clients}
+
+    def clients(self):
+        return list(self.sent)
+
+    def send(self, client_id, message):
+        self.sent.setdefault(client_id, []).append(message)
+
+    def broadcast(self, message):
+        self.send("*", message)
+
+    def packets(self, client_id):
+        return [json.loads(m) for m in self.sent[client_id]]
+
 class CoreTests(unittest.TestCase):
     def test_state_bind_and_unbind(self):
         s = State(10)
@@ -56,6 +82,44 @@ class CoreTests(unittest.TestCase):
         app.handle_event(event_id)
         self.assertEqual(triggered, [True])
 
+    def test_event_policies_serialized_and_enforced(self):
+        seen = []
+        ti = TextInput(name="q", on_change=seen.append, debounce=300)
+        self.assertEqual(ti.to_dict()["event_policies"], {"on_change": {"debounce": 300}})
+        app = PyNativeApp(root=ti)
+        eid = ti.events["on_change"]
+        for text in ("h", "he", "hel"):
+            app.handle_event(eid, text)
+        self.assertEqual(seen, [])
+        app.event_registry[eid].flush()
+        self.assertEqual(seen, ["hel"])
+
+        hits = []
+        btn = Button(label="x", on_press=lambda: hits.append(1))
+        self.assertNotIn("event_policies", btn.to_dict())
+        throttled = Dummy(on_scroll=hits.append, throttle={"on_scroll": 1000})
+        app = PyNativeApp(root=throttled)
+        eid = throttled.events["on_scroll"]
+        app.handle_event(eid, 1)
+        app.handle_event(eid, 2)
+        app.handle_event(eid, 3)
+        self.assertEqual(hits, [1])
+        app.event_registry[eid].flush()
+        self.assertEqual(hits, [1, 3])
+
+    def test_delayed_event_keeps_requesting_client(self):
+        import threading
+
+        seen = []
+        done = threading.Event()
+        ti = TextInput(name="q", on_change=lambda _: (seen.append(app.current_client), done.set()), debounce=5)
+        app = PyNativeApp(root=ti)
+        app.handle_event(ti.events["on_change"], "a", client_id="phone-1")
+        self.assertTrue(done.wait(2))
+        app.handle_event(ti.events["on_change"], "b", client_id="phone-2")
+        app.event_registry[ti.events["on_change"]].flush()
+        self.assertEqual(seen, ["phone-1", "phone-2"])
+
     def test_prop_update_listener_notifies_engine(self):
         buf = io.StringIO()
         old = sys.stdout
@@ -65,8 +129,17 @@ class CoreTests(unittest.TestCase):
             c = Dummy(count=s)
             app = PyNativeApp(root=c)
             s.value = 2
+            # nobody connected: the change is only remembered
+            self.assertTrue(app._dirty)
+            self.assertEqual(app._sync.version, 0)
+
+            bridge = FakeBridge("phone")
+            app.attach_bridge(bridge)
+            app.client_connected("phone")
+            s.value = 3
             out = buf.getvalue()
             self.assertIn("Sinyal Perubahan", out)
+            self.assertEqual(bridge.packets("phone")[-1]["patches"][0]["value"], 3)
         finally:
             sys.stdout = old
 
@@ -119,6 +192,547 @@ class CoreTests(unittest.TestCase):
         patches = app._diff_trees(old, new)
         self.assertEqual(patches[0]["action"], "remove_prop")
 
+    def test_large_props_are_patched_with_deltas(self):
+        import copy
+        from pynative_mobile.diff import apply_delta, diff_trees, prop_delta
+
+        log = "".join(f"line {i}\n" for i in range(100))
+        items = [{"id": i, "title": f"Item {i}", "tags": ["a"]} for i in range(30)]
+        old = {"id": "n", "type": "Text", "props": {"value": log, "items": items, "size": 16}}
+        new_items = copy.deepcopy(items)
+        new_items[3]["tags"].append("b")
+        del new_items[5]["title"]
+        new_items.append({"id": 30})
+        new = {"id": "n", "type": "Text", "props": {"value": log + "line 100\n", "items": new_items, "size": 18}}
+
+        patches = {p["prop"]: p for p in diff_trees(old, new)}
+        self.assertEqual(patches["size"]["action"], "update")  # small values go whole
+        self.assertEqual(patches["value"]["ops"], [{"op": "splice", "path": [], "at": len(log), "delete": 0, "insert": "line 100\n"}])
+        self.assertEqual([op["path"] for op in patches["items"]["ops"]], [[3, "tags"], [5, "title"], []])
+        for prop in ("value", "items"):
+            self.assertEqual(patches[prop]["action"], "delta")
+            self.assertEqual(apply_delta(copy.deepcopy(old["props"][prop]), patches[prop]["ops"]), new["props"][prop])
+
+        # offsets count UTF-16 code units, like the JS client: each emoji is 2
+        emoji = "\U0001f600" * 200
+        ops = prop_delta(emoji + "a", emoji + "b")
+        self.assertEqual(ops, [{"op": "splice", "path": [], "at": 400, "delete": 1, "insert": "b"}])
+        self.assertEqual(apply_delta(emoji + "a", ops), emoji + "b")
+
+        # a rewrite that shares nothing is cheaper as a plain update
+        patches = diff_trees(old, {"id": "n", "type": "Text", "props": {"value": "x" * 600}})
+        self.assertEqual(patches[0]["action"], "update")
+
+    def test_pipeline_reconciles_off_the_handler_thread(self):
+        import threading
+        release = threading.Event()
+
+        for mode in ("thread", "process"):
+            release.clear()
+            s = State(0)
+            comp = Dummy(count=s)
+            app = PyNativeApp(root=comp, pipeline=mode)
+            bridge = FakeBridge("phone")
+            app.attach_bridge(bridge)
+            app.client_connected("phone")
+            sent = bridge.sent["phone"]
+            app.use_middleware(lambda a: release.wait(5))
+            for i in range(1, 4):
+                s.value = i
+            self.assertFalse(app.flush(timeout=0.05))
+            release.set()
+            self.assertTrue(app.flush(timeout=10))
+            self.assertIn("tree", sent[0])
+            last = [m for m in sent[1:] if "patches" in m]
+            self.assertIn('"value": 3', last[-1])
+            self.assertLessEqual(len(sent), 3)
+            app.close()
+            s.value = 4
+            self.assertIsNone(app._pipeline)
+            self.assertNotIn('"value": 4', sent[-1])
+
+    def test_pipeline_serializes_props_as_submitted(self):
+        import threading
+        started, release = threading.Event(), threading.Event()
+        first, second = State(0), State(0)
+        app = PyNativeApp(root=Column(children=[Dummy(count=first), Dummy(count=second)]), pipeline="thread")
+        bridge = FakeBridge("phone")
+        app.attach_bridge(bridge)
+        app.client_connected("phone")
+
+        def middleware(_):
+            started.set()
+            release.wait(5)
+
+        app.use_middleware(middleware)
+        first.value = 1
+        self.assertTrue(started.wait(5))
+        second.value = 1  # changed while the worker is serializing the first change
+        release.set()
+        self.assertTrue(app.flush(timeout=5))
+        app.close()
+        frames = [[(p["prop"], p["value"]) for p in packet["patches"]] for packet in bridge.packets("phone")[1:]]
+        self.assertEqual(frames, [[("count", 1)], [("count", 1)]])
+
+    def test_background_threads_publish_one_reconcile_at_a_time(self):
+        import threading
+        import time
+
+        states = [State(0) for _ in range(4)]
+        app = PyNativeApp(root=Column(children=[Dummy(count=s) for s in states]))
+        bridge = FakeBridge("phone")
+        app.attach_bridge(bridge)
+        app.client_connected("phone")
+        running = []
+        overlaps = []
+
+        def middleware(_):
+            overlaps.append(len(running))
+            running.append(1)
+            time.sleep(0.001)
+            running.pop()
+
+        app.use_middleware(middleware)
+
+        def work(state):
+            for i in range(1, 21):
+                state.value = i
+
+        threads = [threading.Thread(target=work, args=(s,)) for s in states]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(max(overlaps), 0)
+        # the last commit saw every change, although no thread published last on its own
+        self.assertEqual(app._sync.tree()["tree"], app.get_tree())
+        versions = [p["version"] for p in bridge.packets("phone")]
+        self.assertEqual(versions, sorted(versions))
+
+    def test_per_client_acks_squash_intermediate_versions(self):
+        s = State(0)
+        app = PyNativeApp(root=Dummy(count=s))
+        bridge = FakeBridge()
+        app.attach_bridge(bridge)
+        for cid in ("slow", "fast", "legacy"):
+            bridge.sent[cid] = []
+            app.client_connected(cid)
+        first = json.loads(bridge.sent["slow"][0])
+        self.assertIn("tree", first)
+        self.assertIs(bridge.sent["slow"][0], bridge.sent["fast"][0])
+        app.client_message("slow", {"type": "ack", "version": first["version"]})
+        app.client_message("fast", {"type": "ack", "version": first["version"]})
+
+        s.value = 1
+        self.assertIs(bridge.sent["slow"][1], bridge.sent["fast"][1])
+        app.client_message("fast", {"type": "ack", "version": json.loads(bridge.sent["fast"][1])["version"]})
+        s.value = 2
+        s.value = 3
+        self.assertEqual(len(bridge.sent["slow"]), 2)
+        self.assertGreater(len(bridge.sent["legacy"]), 2)
+
+        app.client_message("slow", {"type": "ack", "version": json.loads(bridge.sent["slow"][1])["version"]})
+        catch_up = json.loads(bridge.sent["slow"][2])
+        self.assertEqual(catch_up["version"], app._sync.version)
+        self.assertEqual([p["value"] for p in catch_up["patches"]], [3])
+        self.assertNotIn("*", bridge.sent)  # per-client bridges are never broadcast to
+
+    def test_region_subscribers_only_get_their_subtree(self):
+        from pynative_mobile import diff
+
+        title, visits = State("home"), State(0)
+        stats = Column(region="stats", children=[Dummy(visits=visits)])
+        app = PyNativeApp(root=Column(children=[Dummy(title=title), stats]))
+        bridge = FakeBridge("kiosk", "phone")
+        app.attach_bridge(bridge)
+        for cid in bridge.clients():
+            app.client_connected(cid)
+        app.client_message("kiosk", {"type": "subscribe", "regions": ["stats"]})
+        self.assertEqual(bridge.packets("kiosk")[-1]["regions"]["stats"]["id"], stats.id)
+        self.assertNotIn("tree", bridge.packets("kiosk")[-1])
+
+        title.value = "away"
+        self.assertEqual(len(bridge.sent["kiosk"]), 2)  # nothing for the kiosk
+        self.assertEqual(bridge.packets("phone")[-1]["patches"][0]["value"], "away")
+
+        # with only region subscribers left, the rest of the tree is never diffed
+        del bridge.sent["phone"]
+        app.client_disconnected("phone")
+        diffed = []
+        orig = diff.diff_trees
+        diff.diff_trees = lambda o, n: diffed.append(o["id"]) or orig(o, n)
+        try:
+            title.value = "back"
+        finally:
+            diff.diff_trees = orig
+        self.assertNotIn(app.root.id, diffed)
+        self.assertIn(stats.id, diffed)
+
+        visits.value = 1
+        self.assertEqual(bridge.packets("kiosk")[-1]["patches"], [
+            {"action": "update", "id": stats.children[0].id, "prop": "visits", "value": 1},
+        ])
+        app.client_message("kiosk", {"type": "subscribe"})
+        self.assertIn("tree", bridge.packets("kiosk")[-1])
+
+    def test_reconcile_is_deferred_until_a_client_connects(self):
+        s = State(0)
+        app = PyNativeApp(root=Dummy(count=s))
+        builds, calls = [], []
+        get_tree = app.get_tree
+        app.get_tree = lambda: builds.append(1) or get_tree()
+        app.use_middleware(lambda a: calls.append(1))
+        bridge = FakeBridge()
+        app.attach_bridge(bridge)
+        for i in range(1, 4):
+            s.value = i
+        self.assertEqual((builds, calls), ([], []))  # only the dirty flag is set
+
+        bridge.sent["c1"] = []
+        app.client_connected("c1")
+        self.assertEqual((len(builds), len(calls)), (1, 1))
+        self.assertEqual(bridge.packets("c1")[0]["tree"]["props"]["count"], 3)
+
+    def test_node_store_serializes_and_diffs_deep_trees(self):
+        from pynative_mobile.diff import diff_trees
+        from pynative_mobile.nodestore import NodeStore
+
+        screen = Column(children=[Text("a", size=12), Column(children=[Dummy(key="k")])])
+        self.assertEqual(NodeStore.from_component(screen).to_dict(), screen.to_dict())
+
+        # far deeper than the recursion limit, for the store and for Components
+        store = NodeStore()
+        leaf = store.add("Column", container=True)
+        nested = root = Column()
+        for _ in range(sys.getrecursionlimit() * 3):
+            leaf = store.add("Column", parent=leaf, container=True)
+            nested.children.append(Column())
+            nested = nested.children[0]
+        before = store.to_dict()
+        store.set_prop(leaf, "value", 1)
+        self.assertEqual(diff_trees(before, store.to_dict()),
+                         [{"action": "update", "id": store.ids[leaf], "prop": "value", "value": 1}])
+        self.assertEqual(diff_trees(root.to_dict(), root.to_dict()), [])
+
+        store = NodeStore()
+        top = store.add("Column", container=True)
+        label = store.add("Text", {"value": "0"}, top)
+        count = State("0")
+        store.view(label).bind_state("value", count)
+        app = PyNativeApp(root=store.view())
+        bridge = FakeBridge("c1")
+        app.attach_bridge(bridge)
+        app.client_connected("c1")
+        self.assertEqual(bridge.packets("c1")[0]["tree"]["children"][0]["props"]["value"], "0")
+        count.value = "1"
+        self.assertEqual(bridge.packets("c1")[-1]["patches"],
+                         [{"action": "update", "id": store.ids[label], "prop": "value", "value": "1"}])
+
+        # a deep store is published end to end, full packet and patches
+        depth = sys.getrecursionlimit() * 3
+        store = NodeStore()
+        leaf = store.add("Column", container=True)
+        for _ in range(depth):
+            leaf = store.add("Column", parent=leaf, container=True)
+        deep = State(0)
+        store.view(leaf).bind_state("value", deep)
+        for strings in (False, True):
+            app = PyNativeApp(root=store.view(), intern_strings=strings)
+            bridge = FakeBridge("c1")
+            app.attach_bridge(bridge)
+            app.client_connected("c1")
+            self.assertEqual(bridge.sent["c1"][0].count('"id":'), depth + 1)
+            self.assertEqual(app._encode_full(app._sync.tree(), 1), app._encode_full(app._view(), 1))
+            deep.value += 1
+            self.assertEqual(json.loads(bridge.sent["c1"][-1])["patches"][0]["value"], deep.value)
+            app.close()
+
+    def test_image_variants_fall_back_to_the_original_without_pillow(self):
+        import base64
+        import os
+        import tempfile
+        from pynative_mobile.assets import AssetManager
+        base = tempfile.mkdtemp()
+        with open(os.path.join(base, "photo.png"), "wb") as f:
+            f.write(b"not really a png")
+        assets = AssetManager(base)
+        assets.images._pil = False
+        self.assertIsNone(assets.variant(os.path.join(base, "photo.png"), 120, 80, wait=True))
+        src = assets.resolve("photo.png", 120, 80)
+        self.assertEqual(base64.b64decode(src.split(",", 1)[1]), b"not really a png")
+        self.assertEqual(assets.images.target(120, None), (240, 0))
+
+    @unittest.skipUnless(__import__("importlib").util.find_spec("PIL"), "Pillow not installed")
+    def test_image_variants_are_resized_and_cached_on_disk(self):
+        import os
+        import tempfile
+        from PIL import Image as PILImage
+        from pynative_mobile.assets import AssetManager
+        from pynative_mobile.images import ImagePipeline
+        base = tempfile.mkdtemp()
+        PILImage.new("RGB", (4000, 2000), "red").save(os.path.join(base, "photo.jpg"))
+        pipeline = ImagePipeline(os.path.join(base, "cache"), pixel_ratio=2.0, format="webp")
+        assets = AssetManager(base, images=pipeline)
+        tree = Column(children=[Image("photo.jpg", width=120, height=120), Image("photo.jpg", width=60)]).to_dict()
+        assets.walk_tree(tree)
+        self.assertTrue(tree["children"][0]["props"]["src"].startswith("data:image/webp;base64,"))
+        path = assets.variant(os.path.join(base, "photo.jpg"), 120, 120)
+        with PILImage.open(path) as img:
+            self.assertEqual(img.size, (240, 120))
+        self.assertEqual(len(os.listdir(os.path.dirname(path))), 2)  # one file per size
+
+        def broken_save(img, fp, *args, **kwargs):
+            with open(fp, "wb") as f:
+                f.write(b"partial")
+            raise OSError("disk full")
+
+        from unittest import mock
+        with mock.patch.object(PILImage.Image, "save", broken_save):
+            failed = os.path.join(os.path.dirname(path), "failed.webp")
+            self.assertIsNone(pipeline._render(os.path.join(base, "photo.jpg"), failed, (50, 50)))
+        self.assertEqual(len(os.listdir(os.path.dirname(path))), 2)  # no .tmp left behind
+
+    def test_persistent_state_writes_behind_and_warm_loads(self):
+        import os
+        import tempfile
+        from pynative_mobile.storage import PersistentState, Storage
+        path = os.path.join(tempfile.mkdtemp(), "kv.db")
+        storage = Storage(path, write_delay=10_000)
+        writes = []
+        save_rows = storage._save_rows
+        storage._save_rows = lambda items: writes.append(dict(items)) or save_rows(items)
+        draft = PersistentState("draft", "", storage=storage)
+        for text in ("h", "he", "hel", "hello"):
+            draft.value = text
+        self.assertEqual(writes, [])
+        self.assertEqual(storage.load("draft"), "hello")  # reads see queued writes
+        storage.flush()
+        self.assertEqual(writes, [{"draft": "hello"}])
+        storage.save("theme", "dark")
+        storage.close()
+
+        storage = Storage(path)
+        storage.save("other", "x" * 1000)
+        storage.register("draft", "theme", "missing")
+        queries = []
+        storage.conn.set_trace_callback(queries.append)
+        self.assertEqual(PersistentState("draft", storage=storage).value, "hello")
+        self.assertEqual(PersistentState("theme", storage=storage).value, "dark")
+        self.assertEqual(PersistentState("missing", 3, storage=storage).value, 3)
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("other", storage._warm)  # unregistered keys are not loaded
+        storage.close()
+
+    def test_storage_namespaces_expire_and_evict_least_recently_used(self):
+        import os
+        import tempfile
+        from unittest import mock
+        from pynative_mobile.storage import Storage
+        path = os.path.join(tempfile.mkdtemp(), "kv.db")
+        storage = Storage(path)
+        clock = [1000.0]
+        with mock.patch("pynative_mobile.storage.time.time", lambda: clock[0]):
+            http = storage.namespace("http", max_entries=3)
+            self.assertIs(storage.namespace("http"), http)
+            self.assertEqual(http.max_entries, 3)  # a bare lookup keeps the settings
+            for key in ("a", "b", "c"):
+                http.set(key, {"body": key})
+                clock[0] += 1
+            queries = []
+            storage.conn.set_trace_callback(queries.append)
+            self.assertEqual(http.get("a"), {"body": "a"})
+            storage.conn.set_trace_callback(None)
+            self.assertTrue(all(q.lstrip().startswith("SELECT") for q in queries))  # reads never write
+            clock[0] += 1
+            http.set("d", {"body": "d"})  # "b" is now the least recently used
+            self.assertEqual(len(http), 3)
+            self.assertIsNone(http.get("b"))
+            self.assertEqual(http.get("a"), {"body": "a"})
+
+            computed = storage.namespace("computed", ttl=10)
+            computed.set("x", 1)
+            computed.set("y", 2, ttl=None)
+            computed.set("z", 3, ttl=5)
+            clock[0] += 6
+            self.assertIsNone(computed.get("z"))  # expired rows are never returned
+            self.assertEqual(len(computed), 2)
+            clock[0] += 5
+            self.assertEqual(storage.sweep(), 1)
+            self.assertEqual(computed.get("y"), 2)
+
+            capped = storage.namespace("capped", max_entries=2)
+            capped.set("keep", 1)
+            capped.set("stale", 2, ttl=1)
+            clock[0] += 2
+            capped.set("new", 3)  # the expired row goes, not the least recently used one
+            self.assertEqual((capped.get("keep"), capped.get("new"), len(capped)), (1, 3, 2))
+
+        import threading
+        reader = threading.Thread(target=http.get, args=("a",))
+        with storage._lock:  # reads share the connection, so they wait for writers
+            reader.start()
+            reader.join(0.1)
+            self.assertTrue(reader.is_alive())
+        reader.join()
+        indexes = {row[0] for row in storage.conn.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+        self.assertIn("ns_computed_expires", indexes)
+        storage.close()
+        reopened = Storage(path)
+        self.assertEqual(len(reopened.namespace("http")), 3)
+        self.assertIsNone(reopened.load("a"))  # namespaces do not share the kv table
+        reopened.close()
+
+    def test_streamed_and_paged_lists_only_send_new_rows(self):
+        import asyncio
+        import json
+        import httpx
+        from pynative_mobile.diff import diff_trees
+        from pynative_mobile.layouts import ListView
+        from pynative_mobile.network import JSONStreamParser, Paginator, stream_json
+
+        parser = JSONStreamParser()
+        chunks = ['[{"id": 1}, {"i', 'd": 2}, 3', '4, {"id": 5}]']
+        self.assertEqual([parser.feed(c) for c in chunks], [[{"id": 1}], [{"id": 2}], [34, {"id": 5}]])
+
+        requests = []
+
+        def handler(request):
+            requests.append(str(request.url))
+            if request.url.path == "/feed":
+                body = "".join(json.dumps({"id": i}) + "\n" for i in range(5))
+                return httpx.Response(200, content=body)
+            if request.url.path == "/cursor":
+                after = request.url.params.get("cursor")
+                return httpx.Response(200, json={"items": [{"id": 1 if after is None else 2}], "next": None if after else "c1"})
+            page = int(request.url.params["page"])
+            return httpx.Response(200, json={"items": [{"id": page * 10 + i} for i in range(2)] if page < 3 else []})
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        rows = State([])
+        seen = []
+        rows.bind(lambda v: seen.append(len(v)))
+        pages = Paginator("http://api/items", client=client)
+        view = ListView(pages.state, lambda item: Text(str(item["id"])))
+        cursors = Paginator("http://api/cursor", cursor_field="next", prefetch=False, client=client)
+
+        async def scenario():
+            await cursors.load_next()
+            await cursors.load_next()
+            await stream_json("http://api/feed", rows, chunk_size=2, client=client)
+            first = await pages.load_next()
+            await pages._prefetched  # page 2 is fetched before anyone asks
+            before = view.to_dict()
+            await pages.load_next()
+            after = view.to_dict()
+            await pages.load_next()
+            return first, before, after
+
+        loop = asyncio.new_event_loop()
+        try:
+            first, before, after = loop.run_until_complete(scenario())
+        finally:
+            loop.close()
+        self.assertEqual(seen[-1], 5)
+        self.assertTrue(all(n % 2 == 0 for n in seen[:-1]))  # chunks, not one final value
+        self.assertEqual(first, [{"id": 10}, {"id": 11}])
+        self.assertEqual([p["action"] for p in diff_trees(before, after)], ["add", "add"])
+        self.assertFalse(pages.has_more)
+        self.assertEqual(len(pages.state.value), 4)
+        self.assertEqual(requests[:2], ["http://api/cursor", "http://api/cursor?cursor=c1"])
+        self.assertEqual(cursors.state.value, [{"id": 1}, {"id": 2}])
+        self.assertFalse(cursors.has_more)
+
+    def test_failed_page_keeps_rows_and_retries(self):
+        import asyncio
+        import httpx
+        from pynative_mobile.network import Paginator
+
+        failures = [500]
+
+        def handler(request):
+            page = int(request.url.params["page"])
+            if page == 2 and failures:
+                return httpx.Response(failures.pop())
+            return httpx.Response(200, json=[{"id": page}])
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        pages = Paginator("http://api/items", prefetch=False, client=client)
+
+        async def scenario():
+            await pages.load_next()
+            failed = await pages.load_next()
+            error = pages.error.value
+            retried = await pages.load_next()
+            return failed, error, retried
+
+        loop = asyncio.new_event_loop()
+        try:
+            failed, error, retried = loop.run_until_complete(scenario())
+        finally:
+            loop.close()
+        self.assertEqual(failed, [])
+        self.assertIn("500", error)
+        self.assertEqual(retried, [{"id": 2}])
+        self.assertEqual(pages.state.value, [{"id": 1}, {"id": 2}])
+        self.assertIsNone(pages.error.value)
+
+    def test_interned_packets_send_each_string_once_per_client(self):
+        from pynative_mobile.interning import decode_node
+
+        col = Column(children=[Text("a"), Text("b")])
+        app = PyNativeApp(root=col, intern_strings=True)
+        bridge = FakeBridge()
+        app.attach_bridge(bridge)
+        bridge.sent["one"] = []
+        app.client_connected("one")
+        packet = json.loads(bridge.sent["one"][0])
+        start, values = packet["strings"]
+        self.assertEqual(start, 0)
+        self.assertEqual(decode_node(packet["tree"], values), col.to_dict())
+        self.assertEqual(values.count("theme.on_background"), 1)
+        self.assertNotIn("a", values)  # user content is never interned
+
+        col.children.append(Text("a"))
+        app.notify_bridge()
+        add = json.loads(bridge.sent["one"][1])
+        self.assertNotIn("strings", add)
+        self.assertEqual(decode_node(add["patches"][0]["component"], values)["props"]["value"], "a")
+
+        bridge.sent["two"] = []
+        app.client_connected("two")
+        late = json.loads(bridge.sent["two"][0])
+        self.assertEqual(late["strings"][0], 0)
+        self.assertEqual(len(decode_node(late["tree"], late["strings"][1])["children"]), 3)
+
+    def test_navigation_patches_reuse_cached_screens(self):
+        home_title = State("home")
+        home = Dummy(title=home_title)
+        detail = Dummy(title="detail")
+        tab = Dummy(title="tab")
+        app = PyNativeApp(root=home)
+        bridge = FakeBridge("phone")
+        app.attach_bridge(bridge)
+        app.client_connected("phone")
+
+        app.push(detail)
+        self.assertEqual(bridge.packets("phone")[-1]["patches"][0]["action"], "push")
+        self.assertEqual(bridge.packets("phone")[-1]["patches"][0]["screen"]["id"], detail.id)
+
+        home.props["title"] = "home*"
+        app.pop()
+        pop = bridge.packets("phone")[-1]["patches"]
+        self.assertEqual(pop[0], {"action": "pop", "to": home.id})
+        self.assertEqual(pop[1]["action"], "update")
+        self.assertEqual(len(pop), 2)
+        self.assertNotIn("replace", json.dumps(pop))
+
+        app.switch(tab)
+        self.assertEqual(bridge.packets("phone")[-1]["patches"][0]["action"], "switch")
+        self.assertIn("screen", bridge.packets("phone")[-1]["patches"][0])
+        app.switch(home)
+        self.assertEqual(bridge.packets("phone")[-1]["patches"], [{"action": "switch", "id": home.id}])
+        self.assertIs(app.root, home)
+
     def test_ai_generate_ui(self):
         screen = generate_ui("login page")
         self.assertEqual(screen.type, "Screen")
@@ -151,6 +765,83 @@ class CoreTests(unittest.TestCase):
         af.props["value"] = "ok"
         self.assertEqual(form.validate(), {})
 
+    def test_form_validation_concurrent_cached_incremental(self):
+        import asyncio
+        import time
+        calls = []
+
+        async def remote(v):
+            calls.append(v)
+            await asyncio.sleep(0.2)
+            return None if v else "required"
+
+        async def hangs(v):
+            await asyncio.sleep(5)
+
+        fields = [TextInput(name=n, value="x") for n in ("a", "b", "c")]
+        form = Form(children=fields, validators={"a": remote, "b": remote, "c": remote})
+        started = time.perf_counter()
+        self.assertEqual(form.validate(), {})
+        self.assertLess(time.perf_counter() - started, 0.5)
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(form.submit(), {})
+        self.assertEqual(len(calls), 3)
+
+        slow = Form(children=[TextInput(name="s")], validators={"s": hangs}, timeout=0.05)
+        self.assertEqual(slow.validate(), {"s": "validation timed out"})
+
+        value = State("ok")
+        field = TextInput(name="email", value=value)
+        checked = []
+        def check(v):
+            checked.append(v)
+            return None if "@" in v else "bad"
+        form = Form(children=[field], validators={"email": check}, validate_on_change=True)
+        value.value = "nope"
+        self.assertEqual(form.errors, {"email": "bad"})
+        value.value = "me@x"
+        self.assertEqual(form.errors, {})
+        form.submit()
+        self.assertEqual(checked, ["nope", "me@x"])
+
+        # changed from an event on the bridge's loop: the loop is not blocked
+        typed = State("")
+        form = Form(children=[TextInput(name="user", value=typed)], validators={"user": remote},
+                    validate_on_change=True)
+
+        async def keystrokes():
+            started = time.perf_counter()
+            typed.value = "a"
+            typed.value = ""
+            self.assertLess(time.perf_counter() - started, 0.1)
+            self.assertEqual(form.errors, {})
+            await asyncio.gather(*form._tasks)
+            return form.errors
+
+        loop = asyncio.new_event_loop()
+        try:
+            self.assertEqual(loop.run_until_complete(keystrokes()), {"user": "required"})
+        finally:
+            loop.close()
+
+    def test_import_is_lazy_and_within_budget(self):
+        import subprocess
+        heavy = ("fastapi", "uvicorn", "watchdog", "socketio", "qrcode", "httpx")
+        code = (
+            "import sys, pynative_mobile, pynative_mobile.cli;"
+            f"print([m for m in {heavy!r} if m in sys.modules])"
+        )
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                              capture_output=True, text=True, check=True)
+        self.assertEqual(proc.stdout.strip(), "[]")
+        cumulative = {}
+        for line in proc.stderr.splitlines():
+            parts = line.split("|")
+            if len(parts) == 3 and parts[1].strip().isdigit():
+                cumulative[parts[2].strip()] = int(parts[1])
+        # microseconds; the web stack alone costs several times this
+        self.assertLess(cumulative["pynative_mobile"], 150_000)
+
     def test_lifecycle_hooks(self):
         called = []
         def init_fn():
@@ -169,6 +860,7 @@ class CoreTests(unittest.TestCase):
         def mw(a):
             a.store['called'] = True
         app.use_middleware(mw)
+        app.attach_bridge(FakeBridge("phone"))
         app.notify_bridge()
         self.assertTrue(app.store.get('called', False))
 
@@ -206,6 +898,122 @@ class CoreTests(unittest.TestCase):
         self.assertTrue(asyncio.get_event_loop().run_until_complete(auth(ws2)))
         self.assertFalse(asyncio.get_event_loop().run_until_complete(auth(ws3)))
 
+    def test_theme_changes_are_sent_as_a_token_patch(self):
+        from pynative_mobile.theme import Theme
+
+        theme = Theme()
+        app = PyNativeApp(root=Column(children=[Text(f"row {i}") for i in range(200)]), theme=theme)
+        bridge = FakeBridge("phone")
+        app.attach_bridge(bridge)
+        app.client_connected("phone")
+        sent = bridge.sent["phone"]
+        full = json.loads(sent[0])
+        self.assertEqual(full["theme"]["tokens"]["theme.on_background"], "#000000")
+
+        theme.set(background="#121212", on_background="#FFFFFF")
+        self.assertEqual(len(sent), 2)
+        packet = json.loads(sent[1])
+        self.assertEqual(packet["patches"], [{"action": "theme", "tokens": {
+            "theme.background": "#121212", "theme.on_background": "#FFFFFF"}}])
+        self.assertLess(len(sent[1]), len(sent[0]) / 50)
+        theme.set(background="#121212")  # no change, nothing sent
+        self.assertEqual(len(sent), 2)
+
+    def test_websocket_bridge_dispatches_client_events(self):
+        from fastapi.testclient import TestClient
+        from pynative_mobile.transport import BridgeServer
+        hits = []
+        btn = Button(label="x", on_press=lambda: hits.append(True))
+        app = PyNativeApp(root=btn)
+        bs = BridgeServer()
+        app.attach_bridge(bs)
+        with TestClient(bs.app).websocket_connect("/ws") as ws:
+            self.assertEqual(len(bs.clients()), 1)
+            ws.send_json({"event": btn.events["on_press"]})
+            ws.send_json({"type": "log", "message": "ping"})
+            import time
+            time.sleep(0.1)
+        self.assertEqual(hits, [True])
+
+    def test_websocket_bridge_serves_preview_client(self):
+        from fastapi.testclient import TestClient
+        from pynative_mobile.transport import BridgeServer
+        client = TestClient(BridgeServer().app)
+        for path in ("/", "/preview"):
+            res = client.get(path)
+            self.assertEqual(res.status_code, 200)
+            self.assertIn("text/html", res.headers["content-type"])
+        # applies patches in place instead of re-rendering the tree
+        for action in ("update", "remove_prop", "add", "remove", "replace"):
+            self.assertIn(f"case '{action}'", res.text)
+        self.assertIn("requestAnimationFrame", res.text)
+
+    def test_websocket_bridge_records_and_replays_traffic(self):
+        import asyncio
+        import json
+        import os
+        import socket
+        import tempfile
+        import threading
+        import time
+        import uvicorn
+        from fastapi.testclient import TestClient
+        from pynative_mobile.transport import BridgeServer
+        from pynative_mobile.recorder import Recorder, read_recording
+        from pynative_mobile.loadtest import run_loadtest
+
+        def make_app():
+            count = State(0)
+            btn = Button(label="+", on_press=lambda: setattr(count, "value", count.value + 1))
+            app = PyNativeApp(root=Column(children=[Dummy(count=count), btn]))
+            bridge = BridgeServer()
+            app.attach_bridge(bridge)
+            return bridge, btn
+
+        path = os.path.join(tempfile.mkdtemp(), "traffic.ndjson")
+        bridge, btn = make_app()
+        bridge.recorder = Recorder(path)
+        with TestClient(bridge.app).websocket_connect("/ws") as ws:
+            version = json.loads(ws.receive_text())["version"]
+            ws.send_json({"type": "ack", "version": version})
+            ws.send_json({"event": btn.events["on_press"]})
+            self.assertIn("patches", json.loads(ws.receive_text()))
+        bridge.recorder.close()
+        entries = list(read_recording(path))
+        self.assertEqual([e["direction"] for e in entries], ["out", "in", "in", "out"])
+        self.assertEqual(entries[2]["locator"], [[1], "on_press"])
+
+        # events carrying a seq are answered with the version that shows them
+        bridge, btn = make_app()
+        with TestClient(bridge.app).websocket_connect("/ws") as ws:
+            ws.receive_text()
+            ws.send_json({"event": btn.events["on_press"], "seq": 1})
+            patch = json.loads(ws.receive_text())
+            handled = json.loads(ws.receive_text())
+            self.assertEqual(handled, {"type": "handled", "seq": 1, "version": patch["version"]})
+
+        # replay against a fresh process-like app whose ids all differ
+        bridge, _ = make_app()
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        server = uvicorn.Server(uvicorn.Config(bridge.app, host="127.0.0.1", port=port, log_level="error"))
+        threading.Thread(target=server.run, daemon=True).start()
+        while not server.started:
+            time.sleep(0.01)
+        loop = asyncio.new_event_loop()
+        try:
+            report = loop.run_until_complete(run_loadtest(path, port=port, devices=3, rate=50))
+            with self.assertRaises(ValueError):
+                loop.run_until_complete(run_loadtest(path, host="10.0.0.1"))
+        finally:
+            loop.close()
+            server.should_exit = True
+        self.assertEqual(report["events"], 3)
+        self.assertEqual(report["unanswered"], 0)
+        self.assertGreater(report["latency_ms"]["p50"], 0)
+        self.assertIn("rss_bytes", report["server_memory"]["after"])
+
     def test_router(self):
         app = PyNativeApp(root=Dummy())
         screen1 = Dummy()
@@ -217,6 +1025,105 @@ class CoreTests(unittest.TestCase):
         app.router.navigate(app, '/two')
         self.assertIs(app.root, screen2)
 
+    def test_router_factories_prefetch_and_bounded_stack(self):
+        built = []
+        count = State(0)
+
+        def screen(name):
+            def factory(**params):
+                built.append(name)
+                return Dummy(title=name, count=count, on_tap=lambda: None, **params)
+            return factory
+
+        app = PyNativeApp(root=Dummy())
+        app.router.add("/list", screen("list"), prefetch=["/detail"])
+        app.router.add("/detail", screen("detail"))
+        app.router.add("/edit", screen("edit"))
+        self.assertEqual(built, [])
+
+        app.router.navigate(app, "/list")
+        app.router._ready["/detail"].result(timeout=5)
+        self.assertEqual(built, ["list", "detail"])
+        app.router.navigate(app, "/detail")
+        self.assertEqual(built, ["list", "detail"])
+
+        app.max_live_screens = 2
+        listing = app.stack[1]
+        list_id, list_event = listing.id, listing.events["on_tap"]
+        listing.props["scroll"] = 120
+        app.router.navigate(app, "/edit", mode="full")
+        self.assertEqual(app.root.props["mode"], "full")
+        self.assertNotIsInstance(app.stack[1], Component)
+        self.assertNotIn(list_event, app.event_registry)
+        count.value = 5
+
+        app.pop()
+        app.pop()
+        self.assertEqual(built, ["list", "detail", "edit", "list"])
+        self.assertIsNot(app.root, listing)
+        self.assertEqual(app.root.id, list_id)
+        self.assertEqual(app.root.events["on_tap"], list_event)
+        self.assertIn(list_event, app.event_registry)
+        self.assertEqual(app.root.props["scroll"], 120)
+        self.assertEqual(app.root.props["count"], 5)
+
+        app.router.add("/home", screen("home"), prefetch=["/detail", "/edit"])
+        app.router.navigate(app, "/home")
+        detail = app.router._ready["/detail"].result(timeout=5)[0]
+        app.router._ready["/edit"].result(timeout=5)
+        self.assertIn(detail.events["on_tap"], app.event_registry)
+        app.router.navigate(app, "/detail", id=7)  # bypasses the prefetched screen
+        self.assertNotIn(detail.events["on_tap"], app.event_registry)
+        self.assertEqual(app.router._ready, {})  # "/edit" was only a hint of "/home"
+        app.router.max_prefetched = 1
+        app.router.navigate(app, "/home")
+        self.assertEqual(list(app.router._ready), ["/edit"])
+
+    def test_generated_ui_is_cached_and_streamed_as_add_patches(self):
+        import json
+        import tempfile
+        from pynative_mobile.ai import LocalGenerator, UICache, stream_ui
+        from pynative_mobile.theme import Theme
+
+        class CountingGenerator(LocalGenerator):
+            name = "counting"
+            cache = True
+            calls = 0
+            def generate(self, prompt, theme):
+                CountingGenerator.calls += 1
+                yield from super().generate(prompt, theme)
+
+        cache = UICache(tempfile.mkdtemp())
+        pressed = []
+        first = generate_ui("login page", CountingGenerator(), cache=cache, actions={"ok": lambda: pressed.append(1)})
+        again = generate_ui("login page", CountingGenerator(), cache=cache)
+        self.assertEqual(CountingGenerator.calls, 1)
+
+        def strip(tree):
+            return [(c["type"], c["props"]) for c in tree["children"]]
+
+        self.assertEqual(strip(first.to_dict()), strip(again.to_dict()))
+        self.assertEqual([c.type for c in first.children], ["Text", "TextInput", "TextInput", "Button"])
+        themed = generate_ui("login page", CountingGenerator(), theme=Theme(primary="#000000"), cache=cache)
+        self.assertEqual(CountingGenerator.calls, 2)  # the theme is part of the key
+        self.assertEqual(themed.children[-1].props["color"], "theme.primary")  # the client resolves tokens
+
+        app = PyNativeApp(root=Column(children=[Text("home")]))
+        bridge = FakeBridge("phone")
+        app.attach_bridge(bridge)
+        app.client_connected("phone")
+        screen = stream_ui(app, "login page", actions={"ok": lambda: pressed.append(2)}).result(timeout=5)
+        self.assertIs(app.root, screen)
+        patches = [p for packet in bridge.packets("phone")[1:] for p in packet.get("patches", [])]
+        self.assertEqual(patches[0]["action"], "push")
+        self.assertEqual(patches[0]["screen"]["children"], [])
+        adds = [p for p in patches if p["action"] == "add"]
+        self.assertEqual([p["component"]["type"] for p in adds], ["Text", "TextInput", "TextInput", "Button"])
+        self.assertEqual(len(bridge.sent["phone"]), 7)  # snapshot, push, one packet per component, done
+        self.assertEqual(patches[-1], {"action": "update", "id": screen.id, "prop": "generating", "value": False})
+        app.handle_event(screen.children[-1].events["on_press"])
+        self.assertEqual(pressed, [2])
+
     def test_hardware_request_and_response(self):
         app = PyNativeApp(root=Dummy())
         state = app.hardware.request_permission("camera")
@@ -225,6 +1132,108 @@ class CoreTests(unittest.TestCase):
         app.handle_event(eid, data=True)
         self.assertEqual(state.value, True)
 
+    def test_hardware_request_timeout_and_routing(self):
+        app = PyNativeApp(root=Dummy())
+        bridge = FakeBridge("dev1", "dev2")
+        app.attach_bridge(bridge)
+        requests = []
+        btn = Button(label="loc", on_press=lambda: requests.append(app.hardware.get_location()))
+        app.root = btn
+        app.client_message("dev2", {"event": btn.events["on_press"]})
+        self.assertEqual(len(bridge.sent["dev2"]), 1)
+        self.assertEqual((bridge.sent["dev1"], bridge.sent.get("*")), ([], None))
+        req = requests[0]
+        app.client_message("dev2", {"event": req.request_id, "data": {"lat": 1}})
+        self.assertEqual(req.result(timeout=1), {"lat": 1})
+        self.assertNotIn(req.request_id, app.event_registry)
+
+        late = app.hardware._request("camera", timeout=0.05)
+        app.root = Text(late)  # a bound prop must stay publishable after a failure
+        app.client_connected("dev1")
+        import asyncio
+        async def wait():
+            return await late
+        with self.assertRaises(TimeoutError):
+            asyncio.new_event_loop().run_until_complete(wait())
+        self.assertNotIn(late.request_id, app.event_registry)
+        self.assertIn("error", late.value)
+        self.assertEqual(bridge.packets("dev1")[-1]["patches"][0]["value"], late.value)
+
+        pending = app.hardware._request("camera", client_id="dev1")
+        app.client_disconnected("dev1")
+        self.assertIsInstance(pending.future.exception(), ConnectionError)
+        self.assertIn("error", pending.value)
+
+    def test_snapshot_cache_paints_devices_before_the_app_loads(self):
+        import json
+        import os
+        import tempfile
+        from pynative_mobile.snapshot import SnapshotCache, SnapshotHandler
+
+        def make_app(title, presses):
+            root = Column(children=[Text(title), Button(label="go", on_press=lambda: presses.append(title))])
+            return PyNativeApp(root=root)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            main = os.path.join(tmp, "main.py")
+            with open(main, "w") as f:
+                f.write("app = None\n")
+            cache = SnapshotCache(tmp)
+            self.assertIsNone(cache.load())
+            presses = []
+            cache.save(make_app("old", presses))
+            cached = cache.load()
+            self.assertIsNotNone(cached)
+
+            bridge = FakeBridge()
+            early = SnapshotHandler(cached)
+            early.bridge = bridge
+            early.client_connected("phone")
+            first = bridge.packets("phone")[0]
+            self.assertEqual(first["version"], 1)
+            self.assertEqual(first["tree"]["children"][0]["props"]["value"], "old")
+            early.client_message("phone", {"type": "ack", "version": 1})
+            button = first["tree"]["children"][1]
+            early.client_message("phone", {"event": button["events"]["on_press"]})
+            self.assertEqual(presses, [])  # queued until the app takes over
+
+            app = make_app("new", presses)
+            early.hand_over(app)
+            self.assertIs(bridge.handler, app)
+            patch = bridge.packets("phone")[1]
+            self.assertEqual((patch["base"], patch["version"]), (1, 2))
+            self.assertEqual(patch["patches"], [{"action": "update", "id": first["tree"]["children"][0]["id"], "prop": "value", "value": "new"}])
+            self.assertEqual(presses, ["new"])
+
+            with open(main, "a") as f:
+                f.write("# edited\n")
+            os.utime(main, ns=(0, 0))
+            self.assertIsNone(cache.load())
+
+    def test_sensor_channel_downsamples_into_ring_buffer(self):
+        app = PyNativeApp(root=Dummy())
+        channel = app.hardware.subscribe("accelerometer", rate=10, buffer_size=3)
+        now = [0.0]
+        channel.clock = lambda: now[0]
+        published = []
+        channel.state.bind(published.append)
+        app.handle_event(channel.channel_id, [1, 2, 3])
+        for t, x in ((0.02, 2.0), (0.05, 4.0), (0.1, 6.0)):
+            now[0] = t
+            app.handle_event(channel.channel_id, {"x": x, "y": 0, "z": 0})
+        self.assertEqual(len(published), 2)
+        self.assertEqual(published[1]["x"], 4.0)
+        now[0] = 0.15
+        app.handle_event(channel.channel_id, [[8, 0, 0], [10, 0, 0]])
+        channel.flush()
+        self.assertEqual([s[0] for s in channel.buffer], [1.0, 4.0, 9.0])
+        now[0] = 0.3
+        app.handle_event(channel.channel_id, [12, 0, 0])
+        self.assertEqual([s[0] for s in channel.buffer], [4.0, 9.0, 12.0])
+        self.assertEqual(channel.buffer.latest(), (12.0, 0.0, 0.0))
+        channel.close()
+        self.assertNotIn(channel.channel_id, app.event_registry)
+
     def test_network_fetch_mock(self):
         import httpx
 